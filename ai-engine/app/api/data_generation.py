@@ -4,9 +4,12 @@ from app.schemas.data_generation import (
     GenerationResponse,
     TaskStatusResponse
 )
-from app.services.data_generator import data_generator_service
+from app.core.lazy import lazy_service
+from app.core.responses import FastJSONResponse
 from app.core.logger import logger
 
+data_generator_service = lazy_service("app.services.data_generator", "data_generator_service")
+
 router = APIRouter(prefix="/data-generation", tags=["Data Generation"])
 
 
@@ -37,9 +40,12 @@ async def get_task_status(task_id: str):
     if not result:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    return TaskStatusResponse(
-        task_id=task_id,
-        status=result.get("status"),
-        result=result.get("data") if result.get("status") == "completed" else None,
-        error=result.get("error")
-    )
+    # Results hold up to 10k records; render them directly instead of
+    # validating each one through TaskStatusResponse.
+    return FastJSONResponse({
+        "task_id": task_id,
+        "status": result.get("status"),
+        "progress": None,
+        "result": result.get("data") if result.get("status") == "completed" else None,
+        "error": result.get("error")
+    })
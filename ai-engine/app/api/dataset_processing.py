@@ -1,48 +1,79 @@
-from fastapi import APIRouter, HTTPException
+import uuid
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from starlette.concurrency import run_in_threadpool
 from app.schemas.dataset_processing import (
     AnalyzeSchemaRequest,
     AnalyzeSchemaResponse,
+    AnalysisCacheStatsResponse,
     TrainModelRequest,
     TrainModelResponse,
     JobStatusResponse
 )
-from app.services.schema_analyzer import schema_analyzer_service
-from app.services.model_trainer_v2 import model_trainer_v2_service
+from app.services.task_profiler import task_profiler, profiling_requested
+from app.core.lazy import lazy_service
 from app.core.logger import logger
 
+schema_analyzer_service = lazy_service("app.services.schema_analyzer", "schema_analyzer_service")
+analysis_cache_service = lazy_service("app.services.analysis_cache", "analysis_cache_service")
+model_trainer_v2_service = lazy_service("app.services.model_trainer_v2", "model_trainer_v2_service")
+
 router = APIRouter(tags=["Dataset Processing"])
 
 
+def _analyze_file(file_path: str, sheet_name: Optional[str], profile_id: Optional[str]):
+    # The profiler samples the calling thread, so it is entered on the worker thread that does the work.
+    with task_profiler.capture(profile_id, "analysis", enabled=profile_id is not None):
+        return schema_analyzer_service.analyze_file(file_path, sheet_name)
+
+
 @router.post("/analyze_schema", response_model=AnalyzeSchemaResponse)
-async def analyze_schema(request: AnalyzeSchemaRequest):
+async def analyze_schema(request: AnalyzeSchemaRequest, x_profile: Optional[str] = Header(None)):
     try:
         logger.info(f"Analyzing schema for file: {request.filePath}")
 
-        result = schema_analyzer_service.analyze_file(request.filePath)
+        profile_id = str(uuid.uuid4()) if request.profile or profiling_requested(x_profile) else None
+        # Hashing, parsing and analyzing the upload would otherwise block the event loop
+        result = await run_in_threadpool(_analyze_file, request.filePath, request.sheetName, profile_id)
 
         return AnalyzeSchemaResponse(
             columnTypes=result["columnTypes"],
             dataDistribution=result["dataDistribution"],
             rowCount=result["rowCount"],
-            recommendations=result["recommendations"]
+            recommendations=result["recommendations"],
+            profileId=profile_id
         )
     except FileNotFoundError as e:
         logger.error(f"File not found: {request.filePath}")
         raise HTTPException(status_code=404, detail=f"File not found: {str(e)}")
+    except ValueError as e:
+        # Unknown worksheet or unsupported file format
+        logger.error(f"Cannot analyze {request.filePath}: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error analyzing schema: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Schema analysis failed: {str(e)}")
 
 
+@router.get("/analyze_schema/cache", response_model=AnalysisCacheStatsResponse)
+async def get_analysis_cache_stats():
+    return AnalysisCacheStatsResponse(**analysis_cache_service.stats())
+
+
 @router.post("/train_model", response_model=TrainModelResponse)
-async def train_model(request: TrainModelRequest):
+async def train_model(request: TrainModelRequest, x_profile: Optional[str] = Header(None)):
     try:
         logger.info(f"Starting model training for job: {request.jobId}")
 
+        model_config = request.modelConfig.model_dump() if request.modelConfig else {}
+        if request.profile or profiling_requested(x_profile):
+            model_config["profile"] = True
+
         result = model_trainer_v2_service.start_training(
             job_id=request.jobId,
             file_path=request.filePath,
-            model_config=request.modelConfig or {}
+            model_config=model_config,
+            sheet_name=request.sheetName
         )
 
         return TrainModelResponse(
@@ -68,6 +99,9 @@ async def get_job_status(task_id: str):
             status=result["status"],
             progress=result.get("progress", 0),
             modelPath=result.get("modelPath"),
+            memoryReport=result.get("memoryReport"),
+            preemptions=result.get("preemptions", 0),
+            fidelity=result.get("fidelity"),
             error=result.get("error")
         )
     except HTTPException:
@@ -75,3 +109,23 @@ async def get_job_status(task_id: str):
     except Exception as e:
         logger.error(f"Error retrieving job status: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get job status: {str(e)}")
+
+
+@router.delete("/job_status/{task_id}", response_model=JobStatusResponse)
+async def cancel_job(task_id: str):
+    result = model_trainer_v2_service.get_task_status(task_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if result["status"] in ("completed", "failed", "cancelled"):
+        raise HTTPException(status_code=409, detail=f"Task already {result['status']}")
+
+    result = model_trainer_v2_service.cancel_task(task_id)
+    logger.info(f"Cancellation requested for training task {task_id}")
+
+    return JobStatusResponse(
+        taskId=task_id,
+        status=result["status"],
+        progress=result.get("progress", 0),
+        preemptions=result.get("preemptions", 0),
+        error=result.get("error")
+    )
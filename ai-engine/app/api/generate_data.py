@@ -1,18 +1,25 @@
 import uuid
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from starlette.concurrency import run_in_threadpool
 from app.schemas.data_generation_v2 import (
     GenerateDataRequest,
     GenerateDataResponse,
-    GenerationStatusResponse
+    GenerationStatusResponse,
+    OutputStoreStatsResponse
 )
-from app.services.synthetic_data_generator import synthetic_data_generator
+from app.services.task_profiler import profiling_requested
+from app.services.output_store import OutputStoreFull, output_store
+from app.core.lazy import lazy_service
 from app.core.logger import logger
 
+synthetic_data_generator = lazy_service("app.services.synthetic_data_generator", "synthetic_data_generator")
+
 router = APIRouter(tags=["Synthetic Data Generation"])
 
 
 @router.post("/generate_data", response_model=GenerateDataResponse)
-async def generate_synthetic_data(request: GenerateDataRequest):
+async def generate_synthetic_data(request: GenerateDataRequest, x_profile: Optional[str] = Header(None)):
     """
     Generate synthetic data with chunked processing and decentralized storage.
 
@@ -36,17 +43,36 @@ async def generate_synthetic_data(request: GenerateDataRequest):
         if not request.modelId:
             raise HTTPException(status_code=400, detail="Model ID is required")
 
+        constraints = [constraint.model_dump(exclude_none=True) for constraint in request.constraints or []]
+        try:
+            # Reject unsatisfiable or malformed constraints before queueing
+            await run_in_threadpool(synthetic_data_generator.validate_constraints, request.modelId, constraints)
+            await run_in_threadpool(synthetic_data_generator.validate_partition_column, request.modelId, request.partitionBy)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
         # Generate unique task ID
         task_id = str(uuid.uuid4())
 
-        # Start generation process
-        result = synthetic_data_generator.start_generation(
-            task_id=task_id,
-            job_id=request.jobId,
-            model_id=request.modelId,
-            num_rows=request.numberOfRows,
-            output_format=request.outputFormat.value
-        )
+        # Start generation process; reserving output space samples the model, so keep it off the event loop
+        try:
+            result = await run_in_threadpool(
+                synthetic_data_generator.start_generation,
+                task_id=task_id,
+                job_id=request.jobId,
+                model_id=request.modelId,
+                num_rows=request.numberOfRows,
+                output_format=request.outputFormat.value,
+                priority=request.priority,
+                constraints=constraints,
+                profile=request.profile or profiling_requested(x_profile),
+                partitions=request.partitions,
+                partition_by=request.partitionBy
+            )
+        except OutputStoreFull as e:
+            raise HTTPException(status_code=507, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         return GenerateDataResponse(
             status="success",
@@ -68,7 +94,7 @@ async def get_generation_status(task_id: str):
     Get the status of a data generation task.
 
     Returns real-time progress including:
-    - Current status (queued, processing, completed, failed)
+    - Current status (queued, processing, cancelling, completed, failed, cancelled)
     - Progress percentage
     - Current and total row counts
     - Storage link (when completed)
@@ -94,6 +120,9 @@ async def get_generation_status(task_id: str):
             totalRows=task.get("totalRows"),
             storageLink=task.get("storageLink"),
             outputFormat=task.get("outputFormat"),
+            parts=task.get("parts"),
+            preemptions=task.get("preemptions", 0),
+            fidelity=task.get("fidelity"),
             error=task.get("error")
         )
 
@@ -102,3 +131,46 @@ async def get_generation_status(task_id: str):
     except Exception as e:
         logger.error(f"Error getting task status: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get status: {str(e)}")
+
+
+@router.delete("/generation_status/{task_id}", response_model=GenerationStatusResponse)
+async def cancel_generation(task_id: str):
+    """
+    Cancel a queued or running data generation task.
+
+    Queued tasks are cancelled immediately. Running tasks move to
+    ``cancelling`` and stop before their next chunk; partial output is
+    deleted and the status becomes ``cancelled``.
+
+    Args:
+        task_id: The unique task identifier
+
+    Returns:
+        Task status after the cancellation request
+    """
+    task = synthetic_data_generator.get_task_status(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task["status"] in ("completed", "failed", "cancelled"):
+        raise HTTPException(status_code=409, detail=f"Task already {task['status']}")
+
+    task = synthetic_data_generator.cancel_task(task_id)
+    logger.info(f"Cancellation requested for generation task {task_id}")
+
+    return GenerationStatusResponse(
+        taskId=task_id,
+        status=task.get("status"),
+        progress=task.get("progress", 0),
+        currentRows=task.get("currentRows"),
+        totalRows=task.get("totalRows"),
+        outputFormat=task.get("outputFormat"),
+        parts=task.get("parts"),
+        preemptions=task.get("preemptions", 0),
+        error=task.get("error")
+    )
+
+
+@router.get("/output_store/stats", response_model=OutputStoreStatsResponse)
+async def get_output_store_stats():
+    """Disk usage, reservations and evictions of the generated-output store."""
+    return OutputStoreStatsResponse(**output_store.stats())
@@ -1,24 +1,33 @@
 from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
 from typing import List
 from app.schemas.model_training import (
     TrainingRequest,
     TrainingResponse,
-    ModelInfo
+    ModelInfo,
+    ModelRegistryStatsResponse
 )
-from app.services.model_trainer import model_trainer_service
+from app.core.lazy import lazy_service
 from app.core.logger import logger
 
+model_trainer_service = lazy_service("app.services.model_trainer", "model_trainer_service")
+model_registry_service = lazy_service("app.services.model_registry", "model_registry_service")
+
 router = APIRouter(prefix="/models", tags=["Model Training"])
 
 
 @router.post("/train", response_model=TrainingResponse)
 async def train_model(request: TrainingRequest):
     try:
-        result = model_trainer_service.train_model(
+        # Searches can run for minutes; keep them off the event loop.
+        result = await run_in_threadpool(
+            model_trainer_service.train_model,
             model_type=request.model_type,
             dataset_config=request.dataset_config,
             hyperparameters=request.hyperparameters,
-            epochs=request.epochs
+            epochs=request.epochs,
+            dataset_path=request.dataset_path,
+            search=request.search.model_dump(mode="json") if request.search else None
         )
 
         return TrainingResponse(
@@ -27,14 +36,21 @@ async def train_model(request: TrainingRequest):
             message=f"Model training completed successfully",
             model_id=result["model_id"]
         )
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in model training endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/registry/stats", response_model=ModelRegistryStatsResponse)
+async def get_registry_stats():
+    return ModelRegistryStatsResponse(**model_registry_service.stats())
+
+
 @router.get("/{model_id}", response_model=ModelInfo)
 async def get_model_info(model_id: str):
-    model_info = model_trainer_service.get_model_info(model_id)
+    model_info = model_trainer_service.get_model_info(model_id) or model_registry_service.get_model_info(model_id)
 
     if not model_info:
         raise HTTPException(status_code=404, detail="Model not found")
@@ -44,5 +60,5 @@ async def get_model_info(model_id: str):
 
 @router.get("/", response_model=List[ModelInfo])
 async def list_models():
-    models = model_trainer_service.list_models()
+    models = model_trainer_service.list_models() + model_registry_service.list_models()
     return [ModelInfo(**model) for model in models]
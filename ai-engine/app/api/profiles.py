@@ -0,0 +1,40 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from app.schemas.profiling import TaskProfileResponse
+from app.services.task_profiler import ARTIFACTS, task_profiler
+
+router = APIRouter(tags=["Profiling"])
+
+
+@router.get("/profiles/{task_id}", response_model=TaskProfileResponse)
+async def get_task_profile(task_id: str):
+    """
+    Get the profile captured for a task started with ``profile`` set or an
+    ``X-Profile: 1`` header.
+
+    Args:
+        task_id: Generation or training task id, or the ``profileId`` of an analysis
+
+    Returns:
+        Profile metadata and the names of its downloadable artifacts
+    """
+    profile = task_profiler.get_profile(task_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No profile for this task (not profiled, or still running)")
+    return TaskProfileResponse(**profile)
+
+
+@router.get("/profiles/{task_id}/{artifact}")
+async def download_task_profile(task_id: str, artifact: str):
+    """
+    Download one profile artifact.
+
+    ``cpu.folded`` holds collapsed stacks for flame graph tools (speedscope,
+    flamegraph.pl), ``cpu.txt`` the hottest functions, ``allocations.txt``
+    the largest allocations, and ``allocations.snapshot`` the raw
+    ``tracemalloc`` snapshot for ``tracemalloc.Snapshot.load``.
+    """
+    path = task_profiler.artifact_path(task_id, artifact)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile artifact not found")
+    return FileResponse(path, media_type=ARTIFACTS[artifact], filename=f"{task_id}-{artifact}")
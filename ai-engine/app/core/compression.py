@@ -0,0 +1,164 @@
+import zlib
+from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core import metrics
+
+try:
+    import zstandard
+except ImportError:  # zstd is offered only when the zstandard package is installed
+    zstandard = None
+
+# Bodies at least this large are compressed on a worker thread instead of the event loop.
+OFFLOAD_BYTES = 256 * 1024
+
+
+def available_encodings(encodings: List[str]) -> List[str]:
+    return [encoding for encoding in encodings if encoding == "gzip" or (encoding == "zstd" and zstandard is not None)]
+
+
+def negotiate(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """
+    Pick the encoding to answer with.
+
+    Args:
+        accept_encoding: The request's Accept-Encoding header
+        encodings: Encodings the server offers, most preferred first
+
+    Returns:
+        The offered encoding with the highest client q-value (ties go to the
+        server's preference), or None to send the body uncompressed
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compressible(content_type: str) -> bool:
+    content_type = content_type.split(";")[0].strip().lower()
+    return content_type.startswith("text/") or content_type.endswith(("/json", "+json"))
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, zstd_level: int):
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush() if final else out
+
+
+class CompressionMiddleware:
+    """
+    Compress text and JSON responses with gzip or zstd, negotiated from Accept-Encoding.
+
+    Bodies smaller than ``minimum_size`` and responses that already carry a
+    Content-Encoding or hold binary data pass through untouched. Streamed
+    bodies are compressed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: List[str],
+        minimum_size: int = 1024,
+        gzip_level: int = 1,
+        zstd_level: int = 1
+    ):
+        self.app = app
+        self.encodings = available_encodings(encodings)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk shows whether to compress.
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start["headers"])
+            if (
+                "content-encoding" in headers
+                or not compressible(headers.get("content-type", ""))
+                or (not more_body and len(body) < self.middleware.minimum_size)
+            ):
+                self.passthrough = True
+                await self._send(self.start)
+                await self._send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.zstd_level)
+            compressed = await self._compress(body, final=not more_body)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        compressed = await self._compress(body, final=not more_body)
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    async def _compress(self, body: bytes, final: bool) -> bytes:
+        if len(body) >= OFFLOAD_BYTES:
+            compressed = await run_in_threadpool(self.compressor.compress, body, final)
+        else:
+            compressed = self.compressor.compress(body, final)
+        metrics.RESPONSE_BYTES.labels(encoding=self.encoding, stage="uncompressed").inc(len(body))
+        metrics.RESPONSE_BYTES.labels(encoding=self.encoding, stage="compressed").inc(len(compressed))
+        return compressed
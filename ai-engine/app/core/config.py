@@ -1,4 +1,3 @@
-import os
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -11,6 +10,54 @@ class Settings(BaseSettings):
     MODEL_CACHE_DIR: str = "./models"
     DATA_OUTPUT_DIR: str = "./output"
 
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_DIR: str = "./cache/analysis"
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 256
+
+    INGEST_CACHE_DIR: str = "./cache/datasets"
+    EXCEL_MAX_ROWS: int = 0
+    EXCEL_BATCH_ROWS: int = 50000
+
+    COMPACT_DATAFRAMES: bool = False
+    COMPACT_FLOAT32: bool = False
+
+    TRAINING_THREADS: int = 0
+    STREAMING_TRAINING: bool = False
+    TRAINING_CHUNK_ROWS: int = 100000
+    TRAINING_WORKER_PROCESSES: bool = True
+    TRAINING_MEMORY_LIMIT_MB: int = 0
+    TRAINING_CPU_AFFINITY: str = ""
+
+    MODEL_REGISTRY_MAX_BYTES: int = 536870912
+    MODEL_REGISTRY_PREWARM: str = ""
+
+    WARMUP_STEPS: str = "services,models,generation"
+    WARMUP_ROWS: int = 1000
+
+    OUTPUT_STORE_DIR: str = ""
+    OUTPUT_STORE_MAX_BYTES: int = 0
+    OUTPUT_STORE_MIN_FREE_BYTES: int = 1073741824
+    OUTPUT_STORE_MAX_AGE_HOURS: float = 24.0
+    OUTPUT_WRITER_WORKERS: int = 4
+    OUTPUT_COMPRESSION_BLOCK_ROWS: int = 50000
+    OUTPUT_GZIP_LEVEL: int = 6
+    OUTPUT_ZSTD_LEVEL: int = 3
+
+    MAX_CONCURRENT_TASKS: int = 4
+    HEALTH_SATURATION_THRESHOLD: float = 2.0
+
+    FIDELITY_EVALUATION: bool = True
+    FIDELITY_SAMPLE_ROWS: int = 50000
+
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_TRACEMALLOC: bool = True
+    PROFILING_TRACEMALLOC_FRAMES: int = 1
+
+    RESPONSE_COMPRESSION_ENCODINGS: str = "zstd,gzip"
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 1
+    RESPONSE_ZSTD_LEVEL: int = 1
+
     LOG_LEVEL: str = "INFO"
 
     class Config:
@@ -19,6 +66,3 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
-
-os.makedirs(settings.MODEL_CACHE_DIR, exist_ok=True)
-os.makedirs(settings.DATA_OUTPUT_DIR, exist_ok=True)
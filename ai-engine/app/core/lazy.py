@@ -0,0 +1,50 @@
+import importlib
+from typing import Dict, Any, List, Tuple
+
+
+class LazyService:
+    """
+    Stand-in for a service singleton that imports its module on first use.
+
+    Routers bind these at import time instead of the singletons themselves,
+    so importing ``app.main`` does not pull in pandas, scipy or torch. The
+    first attribute access imports the service module, which builds its
+    singleton; the warm-up does that ahead of traffic.
+    """
+
+    def __init__(self, module: str, name: str):
+        self._module = module
+        self._name = name
+        self._instance = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def resolve(self) -> Any:
+        # The import lock serializes concurrent first uses.
+        if self._instance is None:
+            self._instance = getattr(importlib.import_module(self._module), self._name)
+        return self._instance
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyService {self._module}.{self._name} ({state})>"
+
+
+_SERVICES: Dict[Tuple[str, str], LazyService] = {}
+
+
+def lazy_service(module: str, name: str) -> LazyService:
+    """The shared lazy handle for ``module.name``."""
+    key = (module, name)
+    if key not in _SERVICES:
+        _SERVICES[key] = LazyService(module, name)
+    return _SERVICES[key]
+
+
+def registered_services() -> List[LazyService]:
+    return list(_SERVICES.values())
@@ -0,0 +1,119 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Callable, Optional
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, ProcessCollector, generate_latest
+
+# Process metrics (resident memory, CPU, open fds) come from the default
+# registry's process collector; everything below is registered next to them.
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+RATE_BUCKETS = (1e3, 5e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7)
+
+GENERATION_CHUNK_SECONDS = Histogram(
+    "deai_generation_chunk_seconds", "Time to generate one chunk of synthetic rows", buckets=SECONDS_BUCKETS
+)
+GENERATION_ROWS_PER_SECOND = Histogram(
+    "deai_generation_rows_per_second", "Per-chunk generation throughput", buckets=RATE_BUCKETS
+)
+GENERATION_ROWS = Counter("deai_generation_rows", "Synthetic rows generated")
+
+SERIALIZATION_SECONDS = Histogram(
+    "deai_serialization_seconds", "Time to write generated data to a file", ["format"], buckets=SECONDS_BUCKETS
+)
+SERIALIZED_BYTES = Counter("deai_serialized_bytes", "Bytes of generated data written", ["format"])
+
+HASH_SECONDS = Histogram("deai_hash_seconds", "Time to hash a file", buckets=SECONDS_BUCKETS)
+HASHED_BYTES = Counter("deai_hashed_bytes", "Bytes hashed")
+
+UPLOAD_SECONDS = Histogram(
+    "deai_upload_seconds", "Time to upload a file to decentralized storage", ["storage"], buckets=SECONDS_BUCKETS
+)
+
+ANALYZER_COLUMN_SECONDS = Histogram(
+    "deai_analyzer_column_seconds", "Time to profile one column during dataset analysis", ["type"], buckets=SECONDS_BUCKETS
+)
+
+TRAINING_EPOCH_SECONDS = Histogram(
+    "deai_training_epoch_seconds", "Duration of one training epoch", ["synthesizer"], buckets=SECONDS_BUCKETS
+)
+TRAINING_SECONDS = Histogram(
+    "deai_training_seconds", "Duration of a training job, preprocessing to saved model", ["synthesizer"],
+    buckets=SECONDS_BUCKETS
+)
+
+SCHEDULER_QUEUE_DEPTH = Gauge("deai_scheduler_queued_tasks", "Tasks waiting for a scheduler slot")
+SCHEDULER_RUNNING = Gauge("deai_scheduler_running_tasks", "Tasks holding a scheduler slot")
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "deai_scheduler_wait_seconds", "Time a task waited in the queue before starting", buckets=SECONDS_BUCKETS
+)
+SCHEDULER_PREEMPTIONS = Counter("deai_scheduler_preemptions", "Running tasks preempted for higher priority work")
+
+TASK_REGISTRY_SIZE = Gauge("deai_task_registry_size", "Task records held in memory", ["service"])
+
+STARTUP_SECONDS = Gauge(
+    "deai_startup_seconds", "Seconds from process start to a startup milestone (started, ready)", ["phase"]
+)
+WARMUP_STEP_SECONDS = Gauge("deai_warmup_step_seconds", "Duration of each warm-up step", ["step"])
+OUTPUT_STORE_BYTES = Gauge("deai_output_store_bytes", "Generated output on disk and space reserved by jobs", ["kind"])
+OUTPUT_STORE_EVICTIONS = Counter("deai_output_store_evictions", "Uploaded outputs deleted to free space", ["reason"])
+
+RESPONSE_BYTES = Counter(
+    "deai_response_bytes", "Response body bytes before and after compression", ["encoding", "stage"]
+)
+
+READY = Gauge("deai_ready", "1 once warm-up has finished and the instance accepts traffic")
+
+# Worker processes forward observations here instead of recording them in
+# a registry nobody scrapes; see ``set_relay``.
+_RELAYED = {"trainingEpoch": TRAINING_EPOCH_SECONDS}
+_RELAY_NAMES = {histogram: name for name, histogram in _RELAYED.items()}
+_relay: Optional[Callable[[str, Dict[str, str], float], None]] = None
+
+
+def observe(histogram: Histogram, value: float, **labels):
+    """Record a histogram observation, forwarding it to the parent process when relayed."""
+    if _relay is not None and histogram in _RELAY_NAMES:
+        _relay(_RELAY_NAMES[histogram], labels, value)
+        return
+    (histogram.labels(**labels) if labels else histogram).observe(value)
+
+
+def set_relay(relay: Optional[Callable[[str, Dict[str, str], float], None]]):
+    """Forward relayable observations through ``relay`` (used inside worker processes)."""
+    global _relay
+    _relay = relay
+
+
+def record_relayed(name: str, labels: Dict[str, str], value: float):
+    """Record an observation forwarded from a worker process."""
+    histogram = _RELAYED.get(name)
+    if histogram is not None:
+        (histogram.labels(**labels) if labels else histogram).observe(value)
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Observe the duration of the ``with`` block."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(histogram, time.perf_counter() - started, **labels)
+
+
+def track_size(service: str, size: Callable[[], int]):
+    """Report the size of a service's task registry at scrape time."""
+    TASK_REGISTRY_SIZE.labels(service=service).set_function(size)
+
+
+def seconds_since_process_start() -> Optional[float]:
+    """Wall time since this process started, or None where /proc is unavailable."""
+    for family in ProcessCollector(registry=None).collect():
+        if family.name == "process_start_time_seconds" and family.samples:
+            return time.time() - family.samples[0].value
+    return None
+
+
+def render_metrics():
+    """The default registry in the Prometheus text format, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
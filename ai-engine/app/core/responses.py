@@ -0,0 +1,48 @@
+import sys
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+# NumPy arrays and scalars and datetimes serialize natively; NaN becomes null.
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """Serialize the values orjson has no native support for."""
+    # Only look for pandas types once pandas is loaded; importing it here would undo lazy startup.
+    pd = sys.modules.get("pandas")
+    if pd is not None:
+        if value is pd.NaT or value is pd.NA:
+            return None
+        if isinstance(value, pd.Timestamp):
+            # orjson formats a datetime natively, far faster than Timestamp.isoformat; keep nanoseconds exact.
+            return value.isoformat() if value.nanosecond else value.to_pydatetime()
+        if isinstance(value, pd.Timedelta):
+            return value.total_seconds()
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    The app's default response class, rendered with orjson.
+
+    Endpoints can return NumPy arrays and scalars, pandas timestamps and
+    datetimes directly instead of converting them to Python floats and
+    strings first; large payloads can skip the response-model round trip
+    by returning this class themselves.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,13 +1,25 @@
-from fastapi import FastAPI
+import os
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.logger import logger
-from app.api import data_generation, model_training, dataset_processing, generate_data
+from app.core import metrics
+from app.core.compression import CompressionMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.lazy import lazy_service
+from app.api import data_generation, model_training, dataset_processing, generate_data, profiles
+from app.services.task_scheduler import task_scheduler
+from app.services.warmup import warmup_service
+from app.services.output_store import output_store
+
+synthetic_data_generator = lazy_service("app.services.synthetic_data_generator", "synthetic_data_generator")
+model_trainer_v2_service = lazy_service("app.services.model_trainer_v2", "model_trainer_v2_service")
 
 app = FastAPI(
     title="DeAI Synthetic Data Generator - AI Engine",
     description="AI-powered synthetic data generation and model training service",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 app.add_middleware(
@@ -17,11 +29,26 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    encodings=[item.strip() for item in settings.RESPONSE_COMPRESSION_ENCODINGS.split(",") if item.strip()],
+    minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+    gzip_level=settings.RESPONSE_GZIP_LEVEL,
+    zstd_level=settings.RESPONSE_ZSTD_LEVEL
+)
 
 app.include_router(data_generation.router, prefix="/api")
 app.include_router(model_training.router, prefix="/api")
 app.include_router(dataset_processing.router, prefix="/api")
 app.include_router(generate_data.router, prefix="/api")
+app.include_router(profiles.router, prefix="/api")
+
+metrics.SCHEDULER_QUEUE_DEPTH.set_function(lambda: task_scheduler.stats()["queued"])
+metrics.SCHEDULER_RUNNING.set_function(lambda: task_scheduler.stats()["running"])
+metrics.track_size("generation", lambda: len(synthetic_data_generator.tasks) if synthetic_data_generator.loaded else 0)
+metrics.OUTPUT_STORE_BYTES.labels(kind="used").set_function(output_store.used_bytes)
+metrics.OUTPUT_STORE_BYTES.labels(kind="reserved").set_function(output_store.reserved_bytes)
+metrics.track_size("training", lambda: len(model_trainer_v2_service.tasks) if model_trainer_v2_service.loaded else 0)
 
 
 @app.get("/")
@@ -33,20 +60,72 @@ async def root():
     }
 
 
+def _saturation():
+    """Running plus queued tasks per scheduler slot, and whether that is at ``HEALTH_SATURATION_THRESHOLD``."""
+    scheduler = task_scheduler.stats()
+    saturation = (scheduler["running"] + scheduler["queued"]) / scheduler["maxRunning"]
+    return scheduler, saturation, saturation >= settings.HEALTH_SATURATION_THRESHOLD
+
+
 @app.get("/api/health")
 async def health_check():
+    """
+    Liveness, with saturation reported for information.
+
+    Always answers 200 while the process is up: orchestrators restart
+    instances that fail this check, which would lose their running tasks.
+    Draining a saturated instance is the readiness check's job.
+    """
+    scheduler, saturation, saturated = _saturation()
     return {
-        "status": "healthy",
-        "environment": settings.ENVIRONMENT
+        "status": "saturated" if saturated else "healthy",
+        "environment": settings.ENVIRONMENT,
+        "saturation": round(saturation, 3),
+        "scheduler": scheduler
     }
 
 
+@app.get("/api/ready")
+async def readiness_check(response: Response):
+    """
+    Readiness for load balancers and orchestrators.
+
+    Answers 503 until the startup warm-up has finished, so traffic only
+    reaches an instance once its services and prewarmed models are loaded,
+    and again while the instance is saturated, so it is drained until its
+    backlog clears.
+    """
+    scheduler, saturation, saturated = _saturation()
+    if not warmup_service.ready or saturated:
+        response.status_code = 503
+
+    status = warmup_service.status()
+    if warmup_service.ready and saturated:
+        status["status"] = "saturated"
+    return {**status, "saturation": round(saturation, 3), "scheduler": scheduler}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    body, content_type = metrics.render_metrics()
+    return Response(content=body, headers={"Content-Type": content_type})
+
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("AI Engine starting up...")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Model cache directory: {settings.MODEL_CACHE_DIR}")
 
+    os.makedirs(settings.MODEL_CACHE_DIR, exist_ok=True)
+    os.makedirs(settings.DATA_OUTPUT_DIR, exist_ok=True)
+
+    started = metrics.seconds_since_process_start()
+    if started is not None:
+        metrics.STARTUP_SECONDS.labels(phase="started").set(started)
+        logger.info(f"Started in {started:.2f}s; warming up: {settings.WARMUP_STEPS or 'nothing'}")
+    warmup_service.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -1,18 +1,32 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import Optional, Literal, Dict, Any, List
 from enum import Enum
 
 
 class OutputFormat(str, Enum):
     CSV = "csv"
     PARQUET = "parquet"
+    CSV_GZ = "csv.gz"
+    CSV_ZST = "csv.zst"
+
+
+class ColumnConstraint(BaseModel):
+    column: str = Field(..., description="Column to constrain")
+    values: Optional[List[Any]] = Field(default=None, description="Allowed values of a categorical column")
+    min: Optional[Any] = Field(default=None, description="Inclusive lower bound of a numeric or datetime column")
+    max: Optional[Any] = Field(default=None, description="Inclusive upper bound of a numeric or datetime column")
 
 
 class GenerateDataRequest(BaseModel):
     modelId: str = Field(..., description="Model identifier for synthetic data generation")
     numberOfRows: int = Field(..., ge=1, le=1000000, description="Number of synthetic rows to generate")
-    outputFormat: OutputFormat = Field(default=OutputFormat.CSV, description="Output format: csv or parquet")
+    outputFormat: OutputFormat = Field(default=OutputFormat.CSV, description="Output format: csv, csv.gz, csv.zst or parquet")
     jobId: str = Field(..., description="Job identifier for tracking")
+    priority: int = Field(default=0, ge=0, le=10, description="Scheduling priority; higher runs first and may preempt lower-priority tasks")
+    profile: bool = Field(default=False, description="Capture a CPU and allocation profile of this generation task")
+    constraints: Optional[List[ColumnConstraint]] = Field(default=None, description="Conditions every generated row must satisfy")
+    partitions: int = Field(default=1, ge=1, le=256, description="Write the output as this many part files plus a manifest")
+    partitionBy: Optional[str] = Field(default=None, description="Column to split the parts into Hive-style directories by (implies a partitioned dataset)")
 
     class Config:
         json_schema_extra = {
@@ -20,7 +34,11 @@ class GenerateDataRequest(BaseModel):
                 "modelId": "m7n8o9p0-q1r2-s3t4-u5v6-w7x8y9z0a1b2",
                 "numberOfRows": 50000,
                 "outputFormat": "csv",
-                "jobId": "job-123456"
+                "jobId": "job-123456",
+                "constraints": [
+                    {"column": "region", "values": ["North", "East"]},
+                    {"column": "age", "min": 30, "max": 45}
+                ]
             }
         }
 
@@ -40,4 +58,21 @@ class GenerationStatusResponse(BaseModel):
     totalRows: Optional[int] = None
     storageLink: Optional[str] = None
     outputFormat: Optional[str] = None
+    parts: Optional[int] = None
+    preemptions: int = 0
+    fidelity: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+
+
+class OutputStoreStatsResponse(BaseModel):
+    directory: str
+    artifacts: int
+    usedBytes: int
+    reservedBytes: int
+    reservations: int
+    maxBytes: int
+    freeDiskBytes: int
+    minFreeBytes: int
+    evictions: int
+    evictedBytes: int
+    rejections: int
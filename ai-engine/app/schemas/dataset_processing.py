@@ -4,6 +4,8 @@ from typing import Dict, Any, List, Optional
 
 class AnalyzeSchemaRequest(BaseModel):
     filePath: str = Field(..., description="Path to the dataset file")
+    sheetName: Optional[str] = Field(None, description="Worksheet to analyze for Excel files")
+    profile: bool = Field(False, description="Capture a CPU and allocation profile of this analysis")
 
 
 class AnalyzeSchemaResponse(BaseModel):
@@ -11,18 +13,39 @@ class AnalyzeSchemaResponse(BaseModel):
     dataDistribution: Dict[str, Any]
     rowCount: int
     recommendations: List[str]
+    profileId: Optional[str] = None
+
+
+class AnalysisCacheStatsResponse(BaseModel):
+    enabled: bool
+    entries: int
+    maxEntries: int
+    hits: int
+    misses: int
+    evictions: int
+    hitRate: float
 
 
 class ModelConfig(BaseModel):
     modelType: Optional[str] = Field("sdv", description="Type of model: sdv or gan")
     epochs: Optional[int] = Field(10, ge=1, le=100)
     batchSize: Optional[int] = Field(32, ge=1, le=512)
+    compactMemory: Optional[bool] = Field(None, description="Load the dataset with compact dtypes (defaults to COMPACT_DATAFRAMES)")
+    threads: Optional[int] = Field(None, ge=1, le=256, description="Torch intra-op threads for gan training (defaults to TRAINING_THREADS)")
+    resume: Optional[bool] = Field(True, description="Resume gan training from the job's last epoch checkpoint")
+    streaming: Optional[bool] = Field(None, description="Train from file chunks instead of loading the whole dataset (defaults to STREAMING_TRAINING)")
+    isolated: Optional[bool] = Field(None, description="Train in a separate worker process (defaults to TRAINING_WORKER_PROCESSES)")
+    memoryLimitMb: Optional[int] = Field(None, ge=256, description="Resident memory limit for the worker process (defaults to TRAINING_MEMORY_LIMIT_MB)")
+    cpuAffinity: Optional[List[int]] = Field(None, description="CPUs the worker process may run on (defaults to TRAINING_CPU_AFFINITY)")
+    priority: Optional[int] = Field(0, ge=0, le=10, description="Scheduling priority; higher runs first and may preempt lower-priority tasks")
 
 
 class TrainModelRequest(BaseModel):
     jobId: str = Field(..., description="Unique job identifier")
     filePath: str = Field(..., description="Path to the training dataset")
+    sheetName: Optional[str] = Field(None, description="Worksheet to train on for Excel files")
     modelConfig: Optional[ModelConfig] = None
+    profile: bool = Field(False, description="Capture a CPU and allocation profile of this training task")
 
 
 class TrainModelResponse(BaseModel):
@@ -36,4 +59,7 @@ class JobStatusResponse(BaseModel):
     status: str
     progress: float = 0
     modelPath: Optional[str] = None
+    memoryReport: Optional[Dict[str, Any]] = None
+    preemptions: int = 0
+    fidelity: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
@@ -1,5 +1,22 @@
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
+from enum import Enum
+
+
+class SearchStrategy(str, Enum):
+    GRID = "grid"
+    RANDOM = "random"
+    SUCCESSIVE_HALVING = "successive_halving"
+
+
+class HyperparameterSearch(BaseModel):
+    strategy: SearchStrategy = SearchStrategy.RANDOM
+    space: Dict[str, Any] = Field(..., description="Per parameter: a list of values or {low, high, log, type}")
+    num_trials: int = Field(default=10, ge=1, le=256, description="Configurations to sample (random and successive_halving)")
+    max_workers: Optional[int] = Field(default=None, ge=1, le=64, description="Worker processes (defaults to the CPU count)")
+    reduction_factor: int = Field(default=3, ge=2, le=10, description="Budget growth per rung; successive halving also keeps 1/reduction_factor per rung")
+    min_budget: float = Field(default=0.1, gt=0, le=1, description="Fraction of the training budget for the first rung; grid and random prune trials below each rung's median")
+    seed: Optional[int] = None
 
 
 class TrainingRequest(BaseModel):
@@ -8,6 +25,7 @@ class TrainingRequest(BaseModel):
     dataset_config: Optional[Dict[str, Any]] = None
     hyperparameters: Optional[Dict[str, Any]] = None
     epochs: int = Field(default=10, gt=0, le=100)
+    search: Optional[HyperparameterSearch] = None
 
     class Config:
         json_schema_extra = {
@@ -35,3 +53,22 @@ class ModelInfo(BaseModel):
     created_at: str
     metrics: Optional[Dict[str, float]] = None
     status: str
+    synthesizer: Optional[str] = None
+    version: Optional[str] = None
+    size_bytes: Optional[int] = None
+    columns: Optional[List[str]] = None
+    loaded: Optional[bool] = None
+    hyperparameters: Optional[Dict[str, Any]] = None
+    trials: Optional[List[Dict[str, Any]]] = None
+    fidelity: Optional[Dict[str, Any]] = None
+
+
+class ModelRegistryStatsResponse(BaseModel):
+    loaded_models: int
+    loaded_bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    shared_loads: int
+    evictions: int
+    hit_rate: float
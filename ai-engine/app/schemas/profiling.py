@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class TaskProfileResponse(BaseModel):
+    taskId: str
+    kind: str
+    pid: int
+    startedAt: str
+    elapsedSeconds: float
+    samples: int
+    intervalMs: float
+    peakTracedBytes: Optional[int] = None
+    error: Optional[str] = None
+    artifacts: List[str]
@@ -0,0 +1,160 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from app.core.logger import logger
+from app.core.config import settings
+
+
+class AnalysisCacheService:
+    """
+    Content-addressed cache of schema analysis results.
+
+    Entries are keyed by the SHA-256 of the file contents combined with the
+    analyzer options, so a changed file or a changed analyzer never serves a
+    stale result. Re-hashing is skipped while a file's size, mtime and inode
+    are unchanged. Entries are persisted as JSON files and evicted in LRU order.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int, enabled: bool = True):
+        self.enabled = enabled
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max(1, max_entries)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, None]" = OrderedDict()
+        self._fingerprints: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load_index()
+
+    def get(self, file_path: str, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached analysis for a file, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        key = self._make_key(file_path, options)
+        entry_path = self._entry_path(key)
+
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+        try:
+            with open(entry_path, "r") as f:
+                result = json.load(f)
+            os.utime(entry_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable analysis cache entry {key}: {str(e)}")
+            with self._lock:
+                self._entries.pop(key, None)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+
+        logger.info(f"Analysis cache hit for {file_path}")
+        return result
+
+    def put(self, file_path: str, options: Dict[str, Any], result: Dict[str, Any]):
+        """Store an analysis result and evict least recently used entries."""
+        if not self.enabled:
+            return
+
+        key = self._make_key(file_path, options)
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_suffix(f".{threading.get_ident()}.tmp")
+
+        with open(tmp_path, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, entry_path)
+
+        with self._lock:
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                evicted.append(old_key)
+                self.evictions += 1
+
+        for old_key in evicted:
+            try:
+                self._entry_path(old_key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def content_hash(self, file_path: str) -> str:
+        """
+        Return the SHA-256 of a file, reusing the previous digest while the
+        file's size, mtime and inode are unchanged.
+        """
+        stat = os.stat(file_path)
+        signature = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        real_path = os.path.realpath(file_path)
+
+        with self._lock:
+            known = self._fingerprints.get(real_path)
+        if known and known[0] == signature:
+            return known[1]
+
+        sha256_hash = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for byte_block in iter(lambda: f.read(1024 * 1024), b""):
+                sha256_hash.update(byte_block)
+        digest = sha256_hash.hexdigest()
+
+        with self._lock:
+            self._fingerprints[real_path] = (signature, digest)
+        return digest
+
+    def _make_key(self, file_path: str, options: Dict[str, Any]) -> str:
+        content_hash = self.content_hash(file_path)
+        options_blob = json.dumps(options, sort_keys=True, default=str)
+        return hashlib.sha256(f"{content_hash}:{options_blob}".encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self):
+        """Rebuild the LRU order from entry files on disk, oldest first."""
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for entry in entries:
+            self._entries[entry.stem] = None
+
+        for stale in self.cache_dir.glob("*.tmp"):
+            stale.unlink(missing_ok=True)
+
+        logger.info(f"Analysis cache loaded {len(self._entries)} entries from {self.cache_dir}")
+
+
+analysis_cache_service = AnalysisCacheService(
+    cache_dir=settings.ANALYSIS_CACHE_DIR,
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    enabled=settings.ANALYSIS_CACHE_ENABLED
+)
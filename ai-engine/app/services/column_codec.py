@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import Any, List, Optional, Tuple
+
+CONTINUOUS_TYPES = {"integer", "numeric", "datetime"}
+
+
+def to_float(series: pd.Series, column_type: str) -> np.ndarray:
+    """Numeric view of a continuous column; datetimes become epoch nanoseconds, nulls NaN."""
+    if column_type == "datetime":
+        stamps = pd.to_datetime(series, errors="coerce")
+        if getattr(stamps.dt, "tz", None) is not None:
+            stamps = stamps.dt.tz_convert(None)
+        values = stamps.astype("datetime64[ns]").to_numpy().view(np.int64).astype(np.float64)
+        values[stamps.isna().to_numpy()] = np.nan
+        return values
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def from_float(values: np.ndarray, column_type: str, null_mask: Optional[np.ndarray] = None):
+    """Inverse of ``to_float``: round integers, restore datetimes and apply nulls."""
+    if column_type == "datetime":
+        stamps = np.rint(values).astype(np.int64).view("datetime64[ns]")
+        if null_mask is not None:
+            stamps[null_mask] = np.datetime64("NaT")
+        return stamps
+    if column_type == "integer":
+        integers = np.rint(values).astype(np.int64)
+        if null_mask is not None:
+            return pd.arrays.IntegerArray(integers, null_mask)
+        return integers
+    if null_mask is not None:
+        values[null_mask] = np.nan
+    return values
+
+
+def factorize(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Integer codes (-1 for nulls) and unique values, reusing categorical codes when present."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(dtype=np.int64), series.cat.categories.to_numpy()
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    return codes.astype(np.int64), np.asarray(uniques)
+
+
+def category_ranks(series: pd.Series, categories: List[Any]) -> np.ndarray:
+    """Position of each value in ``categories``; -1 for nulls and unseen values."""
+    codes, uniques = factorize(series)
+    lookup = {value: rank for rank, value in enumerate(categories)}
+    code_to_rank = np.array([lookup.get(json_value(value), -1) for value in uniques] + [-1], dtype=np.int64)
+    return code_to_rank[codes]
+
+
+def decode_discrete(
+    codes: np.ndarray,
+    categories: List[Any],
+    column_type: str,
+    null_mask: Optional[np.ndarray] = None
+):
+    """Build an output column from category codes without materializing Python objects."""
+    if null_mask is not None:
+        codes = codes.copy()
+        codes[null_mask] = -1
+
+    if column_type == "boolean":
+        flags = np.asarray(categories, dtype=bool)[np.maximum(codes, 0)]
+        if null_mask is None:
+            return flags
+        return pd.arrays.BooleanArray(flags, codes < 0)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def synthetic_identifiers(
+    name: str,
+    num_rows: int,
+    rng: np.random.Generator,
+    null_mask: Optional[np.ndarray] = None
+) -> pd.Series:
+    """Random ``<name>_<n>`` identifiers built with Arrow string kernels."""
+    suffixes = pc.cast(pa.array(rng.integers(0, 2**40, num_rows)), pa.string())
+    identifiers = pc.binary_join_element_wise(f"{name}_", suffixes, "")
+    if null_mask is not None:
+        identifiers = pc.if_else(pa.array(null_mask), pa.scalar(None, pa.string()), identifiers)
+    return pd.Series(identifiers, dtype=pd.StringDtype("pyarrow"))
+
+
+def json_value(value: Any) -> Any:
+    """Category value that survives a JSON round trip."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    return str(value)
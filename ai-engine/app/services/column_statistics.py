@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+from app.services.column_codec import CONTINUOUS_TYPES, to_float, factorize, json_value
+
+
+class ColumnStatistics:
+    """
+    Single-pass column summaries over a stream of DataFrame chunks.
+
+    Continuous columns keep a uniform reservoir sample (Algorithm R, applied
+    a chunk at a time) from which quantiles or mixtures are fitted. Discrete
+    columns keep exact category counts until ``max_tracked_categories``
+    distinct values have been seen; past that the column is flagged as
+    overflowing and counting stops. Memory therefore depends on the reservoir
+    and category limits, not on the number of rows.
+    """
+
+    def __init__(
+        self,
+        column_types: Dict[str, str],
+        reservoir_size: int = 1000000,
+        max_tracked_categories: int = 100000,
+        seed: Optional[int] = None
+    ):
+        self.column_types = column_types
+        self.reservoir_size = reservoir_size
+        self.max_tracked_categories = max_tracked_categories
+        self.num_rows = 0
+        self._rng = np.random.default_rng(seed)
+        self._columns: Dict[str, Dict[str, Any]] = {}
+
+    def update(self, chunk: pd.DataFrame) -> "ColumnStatistics":
+        """Fold one chunk into the running summaries."""
+        for name in chunk.columns:
+            state = self._columns.get(name)
+            if state is None:
+                state = self._new_state(name)
+                state["dtype"] = str(chunk[name].dtype)
+                self._columns[name] = state
+
+            series = chunk[name]
+            if state["type"] in CONTINUOUS_TYPES:
+                values = to_float(series, state["type"])
+                valid = values[~np.isnan(values)]
+                state["nulls"] += len(values) - len(valid)
+                if len(valid):
+                    state["min"] = min(state["min"], float(valid.min()))
+                    state["max"] = max(state["max"], float(valid.max()))
+                self._update_reservoir(state, valid)
+            else:
+                state["nulls"] += int(series.isna().sum())
+                if not state["overflow"]:
+                    self._update_counts(state, series)
+
+        self.num_rows += len(chunk)
+        return self
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """
+        Per-column summaries in column order.
+
+        Each has ``name``, ``type``, ``dtype`` (of the first chunk), ``rows``
+        and ``nullRate``; continuous columns add ``values`` (the reservoir),
+        ``seen`` and exact ``min`` and ``max``; discrete columns add
+        ``counts`` (category -> count, first-seen order) and ``overflow``.
+        """
+        result = []
+        for state in self._columns.values():
+            summary = {
+                "name": state["name"],
+                "type": state["type"],
+                "dtype": state["dtype"],
+                "rows": self.num_rows,
+                "nullRate": state["nulls"] / self.num_rows if self.num_rows else 0.0,
+            }
+            if state["type"] in CONTINUOUS_TYPES:
+                summary["values"] = state["reservoir"]
+                summary["seen"] = state["seen"]
+                summary["min"] = state["min"]
+                summary["max"] = state["max"]
+            else:
+                summary["counts"] = state["counts"]
+                summary["overflow"] = state["overflow"]
+            result.append(summary)
+        return result
+
+    def _new_state(self, name: str) -> Dict[str, Any]:
+        column_type = self.column_types.get(name, "text")
+        state = {"name": str(name), "type": column_type, "nulls": 0}
+        if column_type in CONTINUOUS_TYPES:
+            state.update({"reservoir": np.empty(0), "seen": 0, "min": np.inf, "max": -np.inf})
+        else:
+            state.update({"counts": {}, "overflow": False})
+        return state
+
+    def _update_reservoir(self, state: Dict[str, Any], values: np.ndarray):
+        reservoir = state["reservoir"]
+        seen = state["seen"]
+
+        take = min(max(self.reservoir_size - len(reservoir), 0), len(values))
+        if take:
+            reservoir = np.concatenate([reservoir, values[:take]])
+
+        rest = values[take:]
+        if len(rest):
+            # Item number t replaces a random slot with probability k / t.
+            positions = seen + take + np.arange(1, len(rest) + 1)
+            slots = (self._rng.random(len(rest)) * positions).astype(np.int64)
+            keep = slots < self.reservoir_size
+            reservoir[slots[keep]] = rest[keep]
+
+        state["reservoir"] = reservoir
+        state["seen"] = seen + len(values)
+
+    def _update_counts(self, state: Dict[str, Any], series: pd.Series):
+        codes, uniques = factorize(series)
+        chunk_counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        counts = state["counts"]
+
+        if len(counts) + len(uniques) > self.max_tracked_categories:
+            new_values = sum(1 for value in uniques if json_value(value) not in counts)
+            if len(counts) + new_values > self.max_tracked_categories:
+                state["overflow"] = True
+                return
+
+        for value, count in zip(uniques, chunk_counts.tolist()):
+            if count:
+                key = json_value(value)
+                counts[key] = counts.get(key, 0) + count
@@ -0,0 +1,85 @@
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable
+import pandas as pd
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # csv.zst output is available only when the zstandard package is installed
+    zstandard = None
+
+COMPRESSED_CSV_FORMATS = ("csv.gz", "csv.zst")
+
+
+class CompressedCSVWriter:
+    """
+    Writes CSV compressed with gzip or zstd, block by block on a thread pool.
+
+    The frame is encoded to CSV ``block_rows`` rows at a time and each block
+    is compressed on its own as a complete gzip member or zstd frame.
+    Concatenated members (frames) are still one valid ``.gz`` (``.zst``)
+    stream, which gzip, zstd and pandas read back as a single file. zlib and
+    zstandard release the GIL while compressing, so blocks compress in
+    parallel while the next block is encoded; at most two blocks per worker
+    are held in memory.
+    """
+
+    def __init__(self, max_workers: int, block_rows: int, gzip_level: int, zstd_level: int):
+        self.max_workers = max(1, max_workers)
+        self.block_rows = max(1, block_rows)
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    def write(self, data: pd.DataFrame, target, output_format: str):
+        """
+        Write ``data`` as compressed CSV.
+
+        Args:
+            data: Frame to write (without its index)
+            target: Path or binary file object to write to
+            output_format: csv.gz or csv.zst
+
+        Raises:
+            ValueError: If the format is unknown or zstandard is not installed
+        """
+        compress = self._compressor(output_format)
+        opened = nullcontext(target) if hasattr(target, "write") else open(target, "wb")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="csv-compress") as pool, opened as out:
+            pending = deque()
+            # An empty frame still gets one block, so the output has a header.
+            for start in range(0, max(len(data), 1), self.block_rows):
+                block = data.iloc[start:start + self.block_rows].to_csv(index=False, header=start == 0)
+                pending.append(pool.submit(compress, block.encode("utf-8")))
+                if len(pending) >= 2 * self.max_workers:
+                    out.write(pending.popleft().result())
+            while pending:
+                out.write(pending.popleft().result())
+
+    def _compressor(self, output_format: str) -> Callable[[bytes], bytes]:
+        if output_format == "csv.gz":
+            return self._gzip_member
+        if output_format == "csv.zst":
+            if zstandard is None:
+                raise ValueError("csv.zst output requires the zstandard package")
+            return self._zstd_frame
+        raise ValueError(f"Unsupported format: {output_format}")
+
+    def _gzip_member(self, block: bytes) -> bytes:
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress(block) + compressor.flush()
+
+    def _zstd_frame(self, block: bytes) -> bytes:
+        # A ZstdCompressor must not be shared between threads.
+        return zstandard.ZstdCompressor(level=self.zstd_level).compress(block)
+
+
+compressed_csv_writer = CompressedCSVWriter(
+    max_workers=settings.OUTPUT_WRITER_WORKERS,
+    block_rows=settings.OUTPUT_COMPRESSION_BLOCK_ROWS,
+    gzip_level=settings.OUTPUT_GZIP_LEVEL,
+    zstd_level=settings.OUTPUT_ZSTD_LEVEL
+)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional, Tuple
+from app.services.column_codec import json_value
+
+
+def normalize_constraints(constraints: Optional[List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Validate request constraints and merge them per column.
+
+    Each constraint names a ``column`` and either the allowed ``values`` or
+    a ``min`` / ``max`` range (inclusive; numbers, or ISO timestamps for
+    datetime columns). Several constraints on one column intersect.
+
+    Returns:
+        Column name -> ``{"values": list or None, "min": value or None, "max": value or None}``
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for constraint in constraints or []:
+        name = constraint.get("column")
+        if not name:
+            raise ValueError("Every constraint needs a column")
+        values = constraint.get("values")
+        low, high = constraint.get("min"), constraint.get("max")
+        if values is None and low is None and high is None:
+            raise ValueError(f"Constraint on '{name}' needs values or a min/max range")
+        if values is not None and (low is not None or high is not None):
+            raise ValueError(f"Constraint on '{name}' cannot combine values with a min/max range")
+        if values is not None and len(values) == 0:
+            raise ValueError(f"Constraint on '{name}' allows no values")
+
+        current = merged.setdefault(name, {"values": None, "min": None, "max": None})
+        if values is not None:
+            if current["values"] is None:
+                current["values"] = list(values)
+            else:
+                current["values"] = [value for value in current["values"] if value in values]
+        if low is not None:
+            current["min"] = low if current["min"] is None else max(current["min"], low)
+        if high is not None:
+            current["max"] = high if current["max"] is None else min(current["max"], high)
+    return merged
+
+
+def numeric_bounds(name: str, constraint: Dict[str, Any], column_type: str) -> Tuple[float, float]:
+    """Inclusive bounds in the column's ``to_float`` space (epoch nanoseconds for datetimes)."""
+    if constraint["values"] is not None:
+        raise ValueError(f"Constraint on '{name}' must use min/max: the column is {column_type}")
+
+    def convert(value, default):
+        if value is None:
+            return default
+        if column_type == "datetime":
+            stamp = pd.Timestamp(value)
+            if stamp.tzinfo is not None:
+                stamp = stamp.tz_convert(None)
+            return float(stamp.value)
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Constraint bound {value!r} on '{name}' is not a number")
+
+    low, high = convert(constraint["min"], -np.inf), convert(constraint["max"], np.inf)
+    if low > high:
+        raise ValueError(f"Constraint on '{name}' has min above max")
+    return low, high
+
+
+def allowed_categories(name: str, constraint: Dict[str, Any], categories: List[Any]) -> np.ndarray:
+    """Mask of ``categories`` allowed by a ``values`` constraint; JSON values also match their string form."""
+    if constraint["values"] is None:
+        raise ValueError(f"Constraint on '{name}' must list values: the column is categorical")
+    wanted = {json_value(value) for value in constraint["values"]}
+    wanted_text = {str(value) for value in wanted}
+    return np.array([category in wanted or str(category) in wanted_text for category in categories], dtype=bool)
+
+
+def check_constraints(constraints: Dict[str, Dict[str, Any]], column_names: List[str]):
+    unknown = [name for name in constraints if name not in column_names]
+    if unknown:
+        raise ValueError(f"Constraints reference unknown columns: {', '.join(unknown)}")
+
+
+def no_match_error(name: str) -> ValueError:
+    return ValueError(f"No training data satisfies the constraint on '{name}'")
@@ -0,0 +1,882 @@
+import os
+import time
+import warnings
+import hashlib
+import json
+import multiprocessing
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import torch
+from torch import nn
+from torch.nn import functional as F
+from torch.utils.data import DataLoader, IterableDataset, TensorDataset, WeightedRandomSampler
+from typing import Dict, Any, Iterable, List, Optional, Callable
+from app.core.logger import logger
+from app.core import metrics
+from app.services.type_inference import type_inference_service
+from app.services.column_statistics import ColumnStatistics
+from app.services.column_codec import (
+    CONTINUOUS_TYPES,
+    to_float,
+    from_float,
+    category_ranks,
+    decode_discrete,
+    synthetic_identifiers
+)
+from app.services.constraints import (
+    normalize_constraints,
+    numeric_bounds,
+    allowed_categories,
+    check_constraints,
+    no_match_error
+)
+
+# Rounds of redrawing the rows whose continuous values fall outside a
+# constraint range; whatever remains after them is clipped into range.
+CONSTRAINT_REDRAWS = 10
+
+
+class ModeSpecificTransformer:
+    """
+    CTGAN data transformer.
+
+    Continuous columns are normalized per mode of a Bayesian Gaussian mixture:
+    each value becomes a scalar in [-1, 1] plus a one-hot of its mixture
+    component. Discrete columns become one-hot vectors. The mixture is fitted
+    on a bounded sample and stored as plain arrays, so transforming and
+    inverting are vectorized numpy operations.
+    """
+
+    def __init__(
+        self,
+        max_modes: int = 10,
+        max_categories: int = 1000,
+        identifier_ratio: float = 0.95,
+        fit_sample_size: int = 10000
+    ):
+        self.max_modes = max_modes
+        self.max_categories = max_categories
+        self.identifier_ratio = identifier_ratio
+        self.fit_sample_size = fit_sample_size
+        self.columns: List[Dict[str, Any]] = []
+
+    @property
+    def output_dim(self) -> int:
+        return sum(spec.get("width", 0) for spec in self.columns)
+
+    @property
+    def discrete_columns(self) -> List[Dict[str, Any]]:
+        return [spec for spec in self.columns if spec["kind"] == "discrete"]
+
+    def fit(self, df: pd.DataFrame, column_types: Dict[str, str], seed: Optional[int] = None):
+        statistics = ColumnStatistics(column_types, reservoir_size=self.fit_sample_size, seed=seed)
+        return self.fit_summaries(statistics.update(df).summaries(), seed)
+
+    def fit_summaries(self, summaries: List[Dict[str, Any]], seed: Optional[int] = None):
+        """Fit from ``ColumnStatistics`` summaries, whose reservoirs bound the mixture fit."""
+        from sklearn.mixture import BayesianGaussianMixture
+
+        rng = np.random.default_rng(seed)
+        self.columns = []
+        offset = 0
+
+        for summary in summaries:
+            column_type, rows = summary["type"], summary["rows"]
+            spec: Dict[str, Any] = {"name": summary["name"], "type": column_type, "nullRate": summary["nullRate"]}
+
+            if column_type in CONTINUOUS_TYPES:
+                valid = summary["values"]
+                if len(valid) == 0:
+                    spec["kind"] = "empty"
+                else:
+                    if len(valid) > self.fit_sample_size:
+                        valid = rng.choice(valid, self.fit_sample_size, replace=False)
+                    mixture = BayesianGaussianMixture(
+                        n_components=min(self.max_modes, len(np.unique(valid))),
+                        weight_concentration_prior_type="dirichlet_process",
+                        weight_concentration_prior=0.001,
+                        max_iter=100,
+                        random_state=int(rng.integers(2**31))
+                    )
+                    mixture.fit(valid.reshape(-1, 1))
+                    keep = mixture.weights_ > 0.005
+                    if not keep.any():
+                        keep = mixture.weights_ == mixture.weights_.max()
+                    spec.update({
+                        "kind": "continuous",
+                        "weights": mixture.weights_[keep] / mixture.weights_[keep].sum(),
+                        "means": mixture.means_.reshape(-1)[keep],
+                        "stds": np.sqrt(mixture.covariances_.reshape(-1)[keep]) + 1e-6,
+                        "fill": float(np.mean(valid)),
+                    })
+                    spec["width"] = 1 + len(spec["means"])
+            else:
+                counts = summary["counts"]
+                if column_type == "text" and rows and (summary["overflow"] or len(counts) / rows >= self.identifier_ratio):
+                    spec["kind"] = "identifier"
+                elif not counts:
+                    spec["kind"] = "empty"
+                else:
+                    ordered = sorted(counts.items(), key=lambda item: -item[1])[:self.max_categories]
+                    frequencies = np.array([count for _, count in ordered], dtype=np.float64)
+                    spec.update({
+                        "kind": "discrete",
+                        "categories": [value for value, _ in ordered],
+                        "frequencies": frequencies / frequencies.sum(),
+                        "width": len(ordered),
+                    })
+
+            if "width" in spec:
+                spec["offset"] = offset
+                offset += spec["width"]
+            self.columns.append(spec)
+
+        return self
+
+    def transform(self, df: pd.DataFrame, seed: Optional[int] = None):
+        """
+        Encode a frame as a float32 matrix.
+
+        Returns:
+            The encoded matrix and an int64 matrix of category ranks for each
+            discrete column (-1 for values outside the kept categories)
+        """
+        rng = np.random.default_rng(seed)
+        num_rows = len(df)
+        encoded = np.zeros((num_rows, self.output_dim), dtype=np.float32)
+        discrete = self.discrete_columns
+        ranks = np.full((num_rows, len(discrete)), -1, dtype=np.int64)
+
+        for spec in self.columns:
+            if spec["kind"] == "continuous":
+                values = to_float(df[spec["name"]], spec["type"])
+                values = np.where(np.isnan(values), spec["fill"], values)
+                mode = self._sample_modes(spec, values, rng)
+                normalized = (values - spec["means"][mode]) / (4 * spec["stds"][mode])
+                encoded[:, spec["offset"]] = np.clip(normalized, -0.99, 0.99)
+                encoded[np.arange(num_rows), spec["offset"] + 1 + mode] = 1.0
+
+        for idx, spec in enumerate(discrete):
+            rank = category_ranks(df[spec["name"]], spec["categories"])
+            ranks[:, idx] = rank
+            known = rank >= 0
+            encoded[np.flatnonzero(known), spec["offset"] + rank[known]] = 1.0
+
+        return encoded, ranks
+
+    def inverse_transform(
+        self,
+        encoded: np.ndarray,
+        num_rows: int,
+        rng: np.random.Generator,
+        non_null: Iterable[str] = (),
+        bounds: Optional[Dict[str, Any]] = None
+    ) -> pd.DataFrame:
+        """
+        Decode an encoded matrix into a frame.
+
+        Args:
+            encoded: Activated generator output
+            num_rows: Rows in ``encoded``
+            rng: Random generator for nulls and identifiers
+            non_null: Columns to emit without nulls
+            bounds: Column name -> ``(low, high)`` to clip continuous values to, in ``to_float`` space
+        """
+        data = {}
+        non_null = set(non_null)
+        bounds = bounds or {}
+
+        for spec in self.columns:
+            null_mask = None
+            if spec["name"] not in non_null and spec.get("nullRate", 0.0) > 0:
+                null_mask = rng.random(num_rows) < spec["nullRate"]
+
+            if spec["kind"] == "continuous":
+                start = spec["offset"]
+                alpha = np.clip(encoded[:, start], -1, 1).astype(np.float64)
+                mode = np.argmax(encoded[:, start + 1:start + spec["width"]], axis=1)
+                values = alpha * 4 * spec["stds"][mode] + spec["means"][mode]
+                if spec["name"] in bounds:
+                    values = np.clip(values, *bounds[spec["name"]])
+                data[spec["name"]] = from_float(values, spec["type"], null_mask)
+            elif spec["kind"] == "discrete":
+                start = spec["offset"]
+                codes = np.argmax(encoded[:, start:start + spec["width"]], axis=1)
+                data[spec["name"]] = decode_discrete(codes, spec["categories"], spec["type"], null_mask)
+            elif spec["kind"] == "identifier":
+                data[spec["name"]] = synthetic_identifiers(spec["name"], num_rows, rng, null_mask)
+            else:
+                data[spec["name"]] = np.full(num_rows, None, dtype=object)
+
+        return pd.DataFrame(data, copy=False)
+
+    def output_activations(self) -> List[Dict[str, Any]]:
+        """Segments of the output vector with the activation each needs."""
+        segments = []
+        for spec in self.columns:
+            if spec["kind"] == "continuous":
+                segments.append({"start": spec["offset"], "width": 1, "activation": "tanh"})
+                segments.append({"start": spec["offset"] + 1, "width": spec["width"] - 1, "activation": "softmax"})
+            elif spec["kind"] == "discrete":
+                segments.append({"start": spec["offset"], "width": spec["width"], "activation": "softmax"})
+        return segments
+
+    def _sample_modes(self, spec: Dict[str, Any], values: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Draw each value's mixture component from its posterior, vectorized."""
+        z = (values[:, None] - spec["means"][None, :]) / spec["stds"][None, :]
+        log_prob = np.log(spec["weights"])[None, :] - 0.5 * z ** 2 - np.log(spec["stds"])[None, :]
+        log_prob -= log_prob.max(axis=1, keepdims=True)
+        prob = np.exp(log_prob)
+        cumulative = np.cumsum(prob, axis=1)
+        draws = rng.random(len(values))[:, None] * cumulative[:, -1:]
+        return np.minimum((cumulative < draws).sum(axis=1), len(spec["means"]) - 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "maxModes": self.max_modes,
+            "maxCategories": self.max_categories,
+            "identifierRatio": self.identifier_ratio,
+            "columns": self.columns,
+        }
+
+    @classmethod
+    def from_dict(cls, params: Dict[str, Any]) -> "ModeSpecificTransformer":
+        transformer = cls(
+            max_modes=params["maxModes"],
+            max_categories=params["maxCategories"],
+            identifier_ratio=params["identifierRatio"]
+        )
+        transformer.columns = params["columns"]
+        return transformer
+
+
+class Residual(nn.Module):
+    def __init__(self, input_dim: int, output_dim: int):
+        super().__init__()
+        self.fc = nn.Linear(input_dim, output_dim)
+        self.bn = nn.BatchNorm1d(output_dim)
+
+    def forward(self, x):
+        return torch.cat([F.relu(self.bn(self.fc(x))), x], dim=1)
+
+
+class Generator(nn.Module):
+    def __init__(self, input_dim: int, hidden_dims: List[int], output_dim: int):
+        super().__init__()
+        layers = []
+        dim = input_dim
+        for hidden in hidden_dims:
+            layers.append(Residual(dim, hidden))
+            dim += hidden
+        layers.append(nn.Linear(dim, output_dim))
+        self.seq = nn.Sequential(*layers)
+
+    def forward(self, x):
+        return self.seq(x)
+
+
+class Discriminator(nn.Module):
+    def __init__(self, input_dim: int, hidden_dims: List[int]):
+        super().__init__()
+        layers = []
+        dim = input_dim
+        for hidden in hidden_dims:
+            layers += [nn.Linear(dim, hidden), nn.LeakyReLU(0.2), nn.Dropout(0.5)]
+            dim = hidden
+        layers.append(nn.Linear(dim, 1))
+        self.seq = nn.Sequential(*layers)
+
+    def forward(self, x):
+        return self.seq(x)
+
+
+class ChunkBatchStream(IterableDataset):
+    """
+    Streams training batches for one epoch, a chunk at a time.
+
+    Each chunk is encoded when it arrives and resampled with the same
+    training-by-sampling weights as an in-memory epoch, so only one encoded
+    chunk is alive at once. Chunks passed as a list are already in memory
+    and are encoded once, then reused across epochs. Set ``seed`` before
+    each epoch.
+    """
+
+    def __init__(self, synthesizer: "CTGANSynthesizer", chunks: Iterable[pd.DataFrame], batch_size: int):
+        self.synthesizer = synthesizer
+        self.chunks = chunks
+        self.batch_size = batch_size
+        self.seed: Optional[int] = None
+        self._encoded: Dict[int, tuple] = {}
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed)
+        transformer = self.synthesizer.transformer
+        cache = isinstance(self.chunks, list)
+
+        for idx, chunk in enumerate(self.chunks):
+            if len(chunk) < 2:
+                continue
+            if cache and idx in self._encoded:
+                encoded, ranks = self._encoded[idx]
+            else:
+                encoded, ranks = transformer.transform(chunk, seed=int(rng.integers(2**31)))
+                if cache:
+                    self._encoded[idx] = (encoded, ranks)
+
+            batch_size = min(self.batch_size, len(chunk))
+            yield from self.synthesizer._epoch_loader(torch.from_numpy(encoded), ranks, batch_size, rng)
+
+
+class CTGANSynthesizer:
+    """
+    Conditional tabular GAN (CTGAN-style) trained with mini-batches on CPU.
+
+    Training uses a DataLoader whose weighted sampler implements CTGAN's
+    training-by-sampling: each row is conditioned on one of its discrete
+    columns, and rows are drawn so that categories appear in proportion to
+    the log of their frequency. The generator is penalized when its output
+    does not match the conditioning category; the critic uses WGAN-GP.
+
+    Training accepts chunked input (``fit_chunks``) for datasets larger than
+    memory. Checkpoints are written after every epoch and training resumes
+    from the last completed epoch when a matching checkpoint exists.
+    """
+
+    model_type = "ctgan"
+
+    def __init__(
+        self,
+        epochs: int = 10,
+        batch_size: int = 500,
+        embedding_dim: int = 128,
+        generator_dims: Optional[List[int]] = None,
+        discriminator_dims: Optional[List[int]] = None,
+        learning_rate: float = 2e-4,
+        threads: Optional[int] = None
+    ):
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.embedding_dim = embedding_dim
+        self.generator_dims = generator_dims or [256, 256]
+        self.discriminator_dims = discriminator_dims or [256, 256]
+        self.learning_rate = learning_rate
+        self.threads = threads
+
+        self.transformer: Optional[ModeSpecificTransformer] = None
+        self.generator: Optional[Generator] = None
+        self.num_rows_fit = 0
+        self.epochs_completed = 0
+
+    @property
+    def column_names(self) -> List[str]:
+        return [spec["name"] for spec in self.transformer.columns] if self.transformer else []
+
+    @property
+    def cond_dim(self) -> int:
+        return sum(spec["width"] for spec in self.transformer.discrete_columns)
+
+    def fit(
+        self,
+        df: pd.DataFrame,
+        column_types: Optional[Dict[str, str]] = None,
+        seed: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        on_progress: Optional[Callable[[int, int, int], None]] = None
+    ) -> "CTGANSynthesizer":
+        """
+        Train the GAN.
+
+        Args:
+            df: Training data
+            column_types: Semantic types from type inference; inferred when omitted
+            seed: Seed for the transformer and torch RNGs
+            checkpoint_path: Where to save per-epoch checkpoints and resume from
+            on_progress: Called with (batches_done, total_batches, epoch) after each batch
+
+        Returns:
+            The fitted synthesizer
+        """
+        return self.fit_chunks([df], column_types, seed, checkpoint_path, on_progress)
+
+    def fit_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        column_types: Optional[Dict[str, str]] = None,
+        seed: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        on_progress: Optional[Callable[[int, int, int], None]] = None
+    ) -> "CTGANSynthesizer":
+        """
+        Train from a re-iterable sequence of DataFrame chunks.
+
+        One pass collects bounded column statistics for the transformer, then
+        every epoch streams the chunks again through a ``ChunkBatchStream``,
+        so memory holds one encoded chunk rather than the whole dataset.
+        Arguments are as for ``fit``.
+        """
+        with torch_threads(self.threads):
+            return self._fit_chunks(chunks, column_types, seed, checkpoint_path, on_progress)
+
+    def _fit_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        column_types: Optional[Dict[str, str]],
+        seed: Optional[int],
+        checkpoint_path: Optional[str],
+        on_progress: Optional[Callable[[int, int, int], None]]
+    ) -> "CTGANSynthesizer":
+        rng = np.random.default_rng(seed)
+        torch.manual_seed(int(rng.integers(2**31)))
+
+        if not column_types:
+            first = next(iter(chunks))
+            column_types = {col: info["type"] for col, info in type_inference_service.infer(first).items()}
+
+        transformer = ModeSpecificTransformer()
+        statistics = ColumnStatistics(
+            column_types,
+            reservoir_size=transformer.fit_sample_size,
+            seed=int(rng.integers(2**31))
+        )
+        for chunk in chunks:
+            statistics.update(chunk)
+        summaries = statistics.summaries()
+
+        num_rows = statistics.num_rows
+        if num_rows < 2:
+            raise ValueError("CTGAN needs at least 2 rows to train")
+
+        fingerprint = self._fingerprint([summary["name"] for summary in summaries], column_types, num_rows)
+        checkpoint = self._load_checkpoint(checkpoint_path, fingerprint)
+
+        if checkpoint is not None:
+            self.transformer = ModeSpecificTransformer.from_dict(checkpoint["transformer"])
+        else:
+            self.transformer = transformer.fit_summaries(summaries, seed=int(rng.integers(2**31)))
+
+        data_dim = self.transformer.output_dim
+        cond_dim = self.cond_dim
+
+        self.generator = Generator(self.embedding_dim + cond_dim, self.generator_dims, data_dim)
+        discriminator = Discriminator(data_dim + cond_dim, self.discriminator_dims)
+        optimizer_g = torch.optim.Adam(self.generator.parameters(), lr=self.learning_rate, betas=(0.5, 0.9), weight_decay=1e-6)
+        optimizer_d = torch.optim.Adam(discriminator.parameters(), lr=self.learning_rate, betas=(0.5, 0.9), weight_decay=1e-6)
+
+        start_epoch = 0
+        if checkpoint is not None:
+            self.generator.load_state_dict(checkpoint["generator"])
+            discriminator.load_state_dict(checkpoint["discriminator"])
+            optimizer_g.load_state_dict(checkpoint["optimizer_g"])
+            optimizer_d.load_state_dict(checkpoint["optimizer_d"])
+            start_epoch = checkpoint["epoch"]
+            logger.info(f"Resuming CTGAN training from epoch {start_epoch}")
+
+        # Batch norm needs two or more rows per batch, so trailing partial batches are dropped.
+        batch_size = min(max(self.batch_size, 2), num_rows)
+        stream = ChunkBatchStream(self, chunks, batch_size)
+        loader = DataLoader(stream, batch_size=None)
+        segments = self.transformer.output_activations()
+        cond_offsets = self._cond_offsets()
+
+        batches_per_epoch = max(1, num_rows // batch_size)
+        total_batches = batches_per_epoch * self.epochs
+        batches_done = batches_per_epoch * start_epoch
+
+        for epoch in range(start_epoch, self.epochs):
+            epoch_started = time.time()
+            stream.seed = int(rng.integers(2**63))
+            self.generator.train()
+            discriminator.train()
+
+            for real, cond_column, cond_rank in loader:
+                cond, cond_mask = self._cond_vectors(cond_column, cond_rank, cond_offsets)
+
+                noise = torch.randn(len(real), self.embedding_dim)
+                fake = self._activate(self.generator(torch.cat([noise, cond], dim=1)), segments)
+                real_input = torch.cat([real, cond], dim=1)
+                fake_input = torch.cat([fake, cond], dim=1)
+
+                loss_d = (
+                    discriminator(fake_input.detach()).mean() - discriminator(real_input).mean()
+                    + self._gradient_penalty(discriminator, real_input, fake_input.detach())
+                )
+                optimizer_d.zero_grad(set_to_none=True)
+                loss_d.backward()
+                optimizer_d.step()
+
+                noise = torch.randn(len(real), self.embedding_dim)
+                raw = self.generator(torch.cat([noise, cond], dim=1))
+                fake = self._activate(raw, segments)
+                loss_g = (
+                    -discriminator(torch.cat([fake, cond], dim=1)).mean()
+                    + self._cond_loss(raw, cond_column, cond_rank, cond_mask)
+                )
+                optimizer_g.zero_grad(set_to_none=True)
+                loss_g.backward()
+                optimizer_g.step()
+
+                # Chunk boundaries can add a batch or two over the estimate.
+                batches_done = min(batches_done + 1, batches_per_epoch * (epoch + 1))
+                if on_progress is not None:
+                    on_progress(batches_done, total_batches, epoch)
+
+            batches_done = batches_per_epoch * (epoch + 1)
+            self.epochs_completed = epoch + 1
+            epoch_seconds = time.time() - epoch_started
+            metrics.observe(metrics.TRAINING_EPOCH_SECONDS, epoch_seconds, synthesizer=self.model_type)
+            logger.info(
+                f"CTGAN epoch {epoch + 1}/{self.epochs}: loss_g={loss_g.item():.4f} "
+                f"loss_d={loss_d.item():.4f} ({epoch_seconds:.2f}s)"
+            )
+
+            if checkpoint_path:
+                self._save_checkpoint(checkpoint_path, fingerprint, epoch + 1, discriminator, optimizer_g, optimizer_d)
+
+        self.num_rows_fit = num_rows
+        self.generator.eval()
+        return self
+
+    def sample(
+        self,
+        num_rows: int,
+        rng: Optional[np.random.Generator] = None,
+        constraints: Optional[List[Dict[str, Any]]] = None
+    ) -> pd.DataFrame:
+        """
+        Draw ``num_rows`` rows, conditioning on categories at their observed frequency.
+
+        Constraints steer the generator rather than filter its output. A
+        constrained discrete column is conditioned on through the conditional
+        vector, drawing its allowed categories at their renormalized
+        frequency, and its other categories are masked out of the output. A
+        continuous range masks the mixture modes that cannot reach it; the
+        few rows whose value still falls outside are redrawn, and clipped
+        into range after ``CONSTRAINT_REDRAWS`` rounds.
+
+        Args:
+            num_rows: Rows to draw
+            rng: Random generator
+            constraints: Column constraints (see ``normalize_constraints``) every row must satisfy
+        """
+        if self.generator is None:
+            raise ValueError("Synthesizer has not been fitted")
+
+        rng = rng or np.random.default_rng()
+        constraints = normalize_constraints(constraints)
+        plan = self._constraint_plan(constraints)
+        encoded = self._generate(num_rows, rng, plan)
+
+        if plan["ranges"]:
+            for _ in range(CONSTRAINT_REDRAWS):
+                outside = np.flatnonzero(self._outside_ranges(encoded, plan["ranges"]))
+                if len(outside) == 0:
+                    break
+                encoded[outside] = self._generate(len(outside), rng, plan)
+
+        bounds = {spec["name"]: (low, high) for spec, low, high in plan["ranges"]}
+        return self.transformer.inverse_transform(encoded, num_rows, rng, non_null=constraints, bounds=bounds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Parameters with generator weights as numpy arrays."""
+        return {
+            "modelType": self.model_type,
+            "epochs": self.epochs,
+            "batchSize": self.batch_size,
+            "embeddingDim": self.embedding_dim,
+            "generatorDims": self.generator_dims,
+            "discriminatorDims": self.discriminator_dims,
+            "numRowsFit": self.num_rows_fit,
+            "epochsCompleted": self.epochs_completed,
+            "transformer": self.transformer.to_dict(),
+            "generator": {key: value.detach().cpu().numpy() for key, value in self.generator.state_dict().items()},
+        }
+
+    @classmethod
+    def from_dict(cls, params: Dict[str, Any]) -> "CTGANSynthesizer":
+        synthesizer = cls(
+            epochs=params["epochs"],
+            batch_size=params["batchSize"],
+            embedding_dim=params["embeddingDim"],
+            generator_dims=params["generatorDims"],
+            discriminator_dims=params["discriminatorDims"]
+        )
+        synthesizer.transformer = ModeSpecificTransformer.from_dict(params["transformer"])
+        synthesizer.num_rows_fit = params["numRowsFit"]
+        synthesizer.epochs_completed = params["epochsCompleted"]
+        synthesizer.generator = Generator(
+            synthesizer.embedding_dim + synthesizer.cond_dim,
+            synthesizer.generator_dims,
+            synthesizer.transformer.output_dim
+        )
+        with warnings.catch_warnings():
+            # Weights may be read-only views of a memory-mapped artifact; they are
+            # assigned without copying and never written during inference.
+            warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+            synthesizer.generator.load_state_dict({
+                key: torch.from_numpy(np.asarray(value)) for key, value in params["generator"].items()
+            }, assign=True)
+        synthesizer.generator.eval()
+        return synthesizer
+
+    def _epoch_loader(self, data_tensor: torch.Tensor, ranks: np.ndarray, batch_size: int, rng: np.random.Generator):
+        """
+        DataLoader for one epoch of training-by-sampling.
+
+        Every row is assigned one of its discrete columns to condition on;
+        sampling weights make each category's share proportional to the log
+        of its frequency so rare categories are seen during training.
+        """
+        num_rows = len(data_tensor)
+        num_discrete = ranks.shape[1]
+
+        if num_discrete == 0:
+            cond_column = np.full(num_rows, -1, dtype=np.int64)
+            cond_rank = np.full(num_rows, -1, dtype=np.int64)
+            weights = np.ones(num_rows)
+        else:
+            cond_column = rng.integers(0, num_discrete, num_rows)
+            cond_rank = ranks[np.arange(num_rows), cond_column]
+            weights = np.zeros(num_rows)
+            for idx in range(num_discrete):
+                rows = cond_column == idx
+                column_ranks = cond_rank[rows]
+                valid = column_ranks >= 0
+                counts = np.bincount(column_ranks[valid], minlength=self.transformer.discrete_columns[idx]["width"])
+                log_share = np.log1p(counts)
+                column_weights = np.zeros(len(column_ranks))
+                column_weights[valid] = log_share[column_ranks[valid]] / np.maximum(counts[column_ranks[valid]], 1)
+                weights[rows] = column_weights
+            cond_column = np.where(cond_rank >= 0, cond_column, -1)
+            if weights.sum() == 0:
+                weights = np.ones(num_rows)
+
+        sampler = WeightedRandomSampler(
+            torch.from_numpy(weights),
+            num_samples=num_rows,
+            replacement=True,
+            generator=torch.Generator().manual_seed(int(rng.integers(2**63)))
+        )
+        dataset = TensorDataset(data_tensor, torch.from_numpy(cond_column), torch.from_numpy(cond_rank))
+        return DataLoader(dataset, batch_size=batch_size, sampler=sampler, drop_last=True)
+
+    def _cond_offsets(self) -> torch.Tensor:
+        offsets, offset = [], 0
+        for spec in self.transformer.discrete_columns:
+            offsets.append(offset)
+            offset += spec["width"]
+        return torch.tensor(offsets + [0], dtype=torch.int64)
+
+    def _cond_vectors(self, cond_column: torch.Tensor, cond_rank: torch.Tensor, cond_offsets: torch.Tensor):
+        batch = len(cond_column)
+        cond = torch.zeros(batch, self.cond_dim)
+        num_discrete = len(self.transformer.discrete_columns)
+        mask = torch.zeros(batch, max(num_discrete, 1))
+        active = cond_column >= 0
+        if num_discrete and active.any():
+            rows = torch.nonzero(active).squeeze(1)
+            cond[rows, cond_offsets[cond_column[rows]] + cond_rank[rows]] = 1.0
+            mask[rows, cond_column[rows]] = 1.0
+        return cond, mask
+
+    def _generate(self, num_rows: int, rng: np.random.Generator, plan: Dict[str, Any]) -> np.ndarray:
+        """Run the generator for ``num_rows`` rows and return the activated encoding."""
+        torch_rng = torch.Generator().manual_seed(int(rng.integers(2**63)))
+        cond = torch.from_numpy(self._sample_cond(num_rows, rng, plan["conditions"]))
+        noise = torch.randn(num_rows, self.embedding_dim, generator=torch_rng)
+        segments = self.transformer.output_activations()
+
+        self.generator.eval()
+        with torch.no_grad():
+            raw = self.generator(torch.cat([noise, cond], dim=1))
+            return self._activate(raw, segments, hard=True, masks=plan["masks"]).numpy()
+
+    def _constraint_plan(self, constraints: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Translate constraints into generator controls.
+
+        Returns:
+            ``conditions``: allowed-category mask per discrete column index,
+            ``masks``: allowed-output mask per activation segment start, and
+            ``ranges``: ``(spec, low, high)`` per continuous constraint
+        """
+        plan: Dict[str, Any] = {"conditions": {}, "masks": {}, "ranges": []}
+        if not constraints:
+            return plan
+        check_constraints(constraints, self.column_names)
+
+        discrete_index = {spec["name"]: idx for idx, spec in enumerate(self.transformer.discrete_columns)}
+        for spec in self.transformer.columns:
+            constraint = constraints.get(spec["name"])
+            if constraint is None:
+                continue
+
+            if spec["kind"] == "discrete":
+                allowed = allowed_categories(spec["name"], constraint, spec["categories"])
+                if not (allowed & (np.asarray(spec["frequencies"]) > 0)).any():
+                    raise no_match_error(spec["name"])
+                plan["conditions"][discrete_index[spec["name"]]] = allowed
+                plan["masks"][spec["offset"]] = allowed
+            elif spec["kind"] == "continuous":
+                low, high = numeric_bounds(spec["name"], constraint, spec["type"])
+                means, stds = np.asarray(spec["means"]), np.asarray(spec["stds"])
+                reachable = (means + 4 * stds >= low) & (means - 4 * stds <= high)
+                if not reachable.any():
+                    raise no_match_error(spec["name"])
+                plan["masks"][spec["offset"] + 1] = reachable
+                plan["ranges"].append((spec, low, high))
+            else:
+                raise ValueError(f"Column '{spec['name']}' cannot be constrained")
+        return plan
+
+    def _continuous_values(self, encoded: np.ndarray, spec: Dict[str, Any]):
+        start = spec["offset"]
+        alpha = np.clip(encoded[:, start], -1, 1).astype(np.float64)
+        mode = np.argmax(encoded[:, start + 1:start + spec["width"]], axis=1)
+        return alpha * 4 * spec["stds"][mode] + spec["means"][mode], mode
+
+    def _outside_ranges(self, encoded: np.ndarray, ranges: List[Any]) -> np.ndarray:
+        outside = np.zeros(len(encoded), dtype=bool)
+        for spec, low, high in ranges:
+            values, _ = self._continuous_values(encoded, spec)
+            outside |= (values < low) | (values > high)
+        return outside
+
+    def _sample_cond(
+        self,
+        num_rows: int,
+        rng: np.random.Generator,
+        conditions: Optional[Dict[int, np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        One-hot conditional vectors for ``num_rows`` rows.
+
+        Without ``conditions`` each row conditions on a random discrete column
+        at its observed frequencies; with them, on a random constrained column
+        restricted to its allowed categories.
+        """
+        cond = np.zeros((num_rows, self.cond_dim), dtype=np.float32)
+        discrete = self.transformer.discrete_columns
+        if not discrete:
+            return cond
+
+        choices = np.array(sorted(conditions)) if conditions else np.arange(len(discrete))
+        column = choices[rng.integers(0, len(choices), num_rows)]
+        offset = 0
+        for idx, spec in enumerate(discrete):
+            rows = np.flatnonzero(column == idx)
+            frequencies = np.asarray(spec["frequencies"])
+            if conditions and idx in conditions:
+                frequencies = frequencies * conditions[idx]
+                frequencies = frequencies / frequencies.sum()
+            cumulative = np.cumsum(frequencies)
+            ranks = np.minimum(np.searchsorted(cumulative, rng.random(len(rows)), side="right"), spec["width"] - 1)
+            cond[rows, offset + ranks] = 1.0
+            offset += spec["width"]
+        return cond
+
+    def _activate(
+        self,
+        raw: torch.Tensor,
+        segments: List[Dict[str, Any]],
+        hard: bool = False,
+        masks: Optional[Dict[int, np.ndarray]] = None
+    ) -> torch.Tensor:
+        parts = []
+        for segment in segments:
+            chunk = raw[:, segment["start"]:segment["start"] + segment["width"]]
+            if masks and segment["start"] in masks:
+                chunk = chunk.masked_fill(~torch.from_numpy(masks[segment["start"]]), float("-inf"))
+            if segment["activation"] == "tanh":
+                parts.append(torch.tanh(chunk))
+            else:
+                parts.append(F.gumbel_softmax(chunk, tau=0.2, hard=hard))
+        return torch.cat(parts, dim=1) if parts else raw
+
+    def _cond_loss(self, raw: torch.Tensor, cond_column: torch.Tensor, cond_rank: torch.Tensor, mask: torch.Tensor):
+        losses = []
+        for idx, spec in enumerate(self.transformer.discrete_columns):
+            logits = raw[:, spec["offset"]:spec["offset"] + spec["width"]]
+            target = torch.where(cond_column == idx, cond_rank, torch.zeros_like(cond_rank))
+            losses.append(F.cross_entropy(logits, target, reduction="none") * mask[:, idx])
+        if not losses:
+            return torch.zeros(())
+        return torch.stack(losses, dim=1).sum() / len(raw)
+
+    def _gradient_penalty(self, discriminator: nn.Module, real: torch.Tensor, fake: torch.Tensor) -> torch.Tensor:
+        alpha = torch.rand(len(real), 1)
+        interpolated = (alpha * real + (1 - alpha) * fake).requires_grad_(True)
+        gradients = torch.autograd.grad(
+            outputs=discriminator(interpolated).sum(),
+            inputs=interpolated,
+            create_graph=True
+        )[0]
+        return 10 * ((gradients.norm(2, dim=1) - 1) ** 2).mean()
+
+    def _fingerprint(self, columns: List[str], column_types: Dict[str, str], num_rows: int) -> str:
+        """Identifies the data and architecture a checkpoint can be resumed with."""
+        blob = json.dumps({
+            "columns": columns,
+            "types": column_types,
+            "rows": num_rows,
+            "batchSize": self.batch_size,
+            "embeddingDim": self.embedding_dim,
+            "generatorDims": self.generator_dims,
+            "discriminatorDims": self.discriminator_dims,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _load_checkpoint(self, checkpoint_path: Optional[str], fingerprint: str) -> Optional[Dict[str, Any]]:
+        if not checkpoint_path or not os.path.exists(checkpoint_path):
+            return None
+        try:
+            checkpoint = torch.load(checkpoint_path, map_location="cpu")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {checkpoint_path}: {str(e)}")
+            return None
+        if checkpoint.get("fingerprint") != fingerprint:
+            logger.info(f"Checkpoint {checkpoint_path} was made for different data; starting fresh")
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint_path, fingerprint, epoch, discriminator, optimizer_g, optimizer_d):
+        tmp_path = f"{checkpoint_path}.tmp"
+        torch.save({
+            "fingerprint": fingerprint,
+            "epoch": epoch,
+            "transformer": self.transformer.to_dict(),
+            "generator": self.generator.state_dict(),
+            "discriminator": discriminator.state_dict(),
+            "optimizer_g": optimizer_g.state_dict(),
+            "optimizer_d": optimizer_d.state_dict(),
+        }, tmp_path)
+        os.replace(tmp_path, checkpoint_path)
+
+
+@contextmanager
+def torch_threads(threads: Optional[int]):
+    """
+    Apply a training job's torch thread counts for the duration of the block.
+
+    Torch's thread counts are process-wide, so the previous intra-op count is
+    restored on exit; otherwise an in-process job would leave its setting to
+    every later job and to sampling. The inter-op pool can only be sized once,
+    before torch starts parallel work, and never restored, so it is sized
+    only in a child process (the isolated training worker), which runs a
+    single job.
+    """
+    if not threads:
+        yield
+        return
+
+    previous = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    if multiprocessing.parent_process() is not None:
+        try:
+            torch.set_num_interop_threads(max(1, threads // 2))
+        except RuntimeError:
+            pass
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
@@ -0,0 +1,461 @@
+import os
+import copy
+import json
+import hashlib
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from app.core.logger import logger
+from app.core.config import settings
+from app.services.type_inference import type_inference_service
+
+SUPPORTED_SUFFIXES = ['.csv', '.xlsx', '.xls', '.parquet']
+
+# Schema metadata keys used to check that a columnar copy matches its upload.
+SOURCE_SIZE_KEY = b"deai.source_size"
+SOURCE_MTIME_KEY = b"deai.source_mtime_ns"
+SOURCE_VARIANT_KEY = b"deai.source_variant"
+INFERENCE_OPTIONS_KEY = b"deai.inference_options"
+COLUMN_TYPES_KEY = b"deai.column_types"
+
+
+class IngestedDataset:
+    """
+    Columnar view of an ingested upload.
+
+    The table is memory-mapped from an Arrow IPC file, so opening it does not
+    copy column data and several readers share the same pages.
+    """
+
+    def __init__(self, source_path: str, columnar_path: str, table: pa.Table):
+        self.source_path = source_path
+        self.columnar_path = columnar_path
+        self.table = table
+
+    @property
+    def num_rows(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def columns(self) -> List[str]:
+        return self.table.column_names
+
+    @property
+    def column_types(self) -> Dict[str, str]:
+        """Semantic column types inferred once at ingest time."""
+        metadata = self.table.schema.metadata or {}
+        return json.loads(metadata.get(COLUMN_TYPES_KEY, b"{}"))
+
+    def to_pandas(self) -> pd.DataFrame:
+        """Convert to pandas, avoiding copies for null-free numeric columns."""
+        return self.table.to_pandas(split_blocks=True, date_as_object=False)
+
+
+class ChunkedDataset:
+    """
+    Re-iterable chunked reader over an upload, for out-of-core training.
+
+    Each iteration re-opens the source and yields DataFrames of at most
+    ``chunk_rows`` rows, so multi-pass fitting holds one chunk at a time.
+    Types are inferred once from the first chunk and every chunk is
+    converted with the same rules.
+    """
+
+    def __init__(
+        self,
+        service: "DatasetIngestionService",
+        file_path: Path,
+        chunk_rows: int,
+        sheet_name: Optional[str] = None
+    ):
+        self.service = service
+        self.file_path = file_path
+        self.chunk_rows = chunk_rows
+        self.sheet_name = sheet_name
+        self._inference: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @property
+    def column_types(self) -> Dict[str, str]:
+        return {col: info["type"] for col, info in self._get_inference().items()}
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        inference = self._get_inference()
+        for chunk in self.service._iter_raw_chunks(self.file_path, self.chunk_rows, self.sheet_name):
+            # apply() may relabel columns that fail to convert; keep the shared rules intact.
+            type_inference_service.apply(chunk, copy.deepcopy(inference))
+            yield chunk
+
+    def _get_inference(self) -> Dict[str, Dict[str, Any]]:
+        if self._inference is None:
+            first = next(self.service._iter_raw_chunks(self.file_path, self.chunk_rows, self.sheet_name), None)
+            inference = type_inference_service.infer(first) if first is not None else {}
+            # Settle the probe against the whole first chunk before sharing the rules.
+            if first is not None:
+                type_inference_service.apply(first, inference)
+            self._inference = inference
+        return self._inference
+
+
+class DatasetIngestionService:
+    """
+    Parses uploaded datasets once and keeps a columnar copy next to the upload.
+
+    CSV files are parsed with the multi-threaded pyarrow reader, Parquet files
+    are read directly and ``.xlsx`` workbooks are streamed row by row into
+    Arrow batches. Column types are
+    inferred once, string columns that probe as numbers, booleans or dates
+    are converted, and the result is written as an Arrow IPC file (``<upload>.arrow``) and re-opened with
+    ``mmap`` on later reads, so analyze -> train flows parse the raw file once.
+    When the upload directory is read-only, copies go to INGEST_CACHE_DIR.
+    """
+
+    def __init__(self, cache_dir: str, excel_max_rows: int = 0, excel_batch_rows: int = 50000):
+        self.cache_dir = Path(cache_dir)
+        self.excel_max_rows = excel_max_rows
+        self.excel_batch_rows = excel_batch_rows
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def ingest(self, file_path: str, sheet_name: Optional[str] = None) -> IngestedDataset:
+        """
+        Return a memory-mapped columnar handle for an upload, parsing it if needed.
+
+        Args:
+            file_path: Path to a CSV, Parquet or Excel upload
+            sheet_name: Worksheet to read from Excel uploads (defaults to the first)
+
+        Returns:
+            Handle to the ingested dataset
+        """
+        file_path_obj = Path(file_path)
+
+        if not file_path_obj.exists():
+            raise FileNotFoundError(f"File does not exist: {file_path}")
+
+        if file_path_obj.suffix.lower() not in SUPPORTED_SUFFIXES:
+            raise ValueError(f"Unsupported file format: {file_path_obj.suffix}")
+
+        stat = file_path_obj.stat()
+        is_excel = file_path_obj.suffix.lower() != '.csv'
+        variant = self._variant(sheet_name, self.excel_max_rows) if is_excel else ""
+
+        with self._lock_for(file_path_obj):
+            columnar_path = self._find_fresh_copy(file_path_obj, stat, variant)
+
+            if columnar_path is None:
+                logger.info(f"Ingesting {file_path} into columnar format")
+                table = self._parse(file_path_obj, sheet_name)
+                table, column_types = self._infer_types(table)
+                table = table.replace_schema_metadata({
+                    **(table.schema.metadata or {}),
+                    SOURCE_SIZE_KEY: str(stat.st_size).encode(),
+                    SOURCE_MTIME_KEY: str(stat.st_mtime_ns).encode(),
+                    SOURCE_VARIANT_KEY: variant.encode(),
+                    INFERENCE_OPTIONS_KEY: self._inference_signature(),
+                    COLUMN_TYPES_KEY: json.dumps(column_types).encode(),
+                })
+                columnar_path = self._write_copy(file_path_obj, table, variant)
+
+        return IngestedDataset(str(file_path_obj), str(columnar_path), self._open(columnar_path))
+
+    def load_dataframe(self, file_path: str, sheet_name: Optional[str] = None) -> pd.DataFrame:
+        """Convenience wrapper returning the ingested dataset as a DataFrame."""
+        return self.ingest(file_path, sheet_name).to_pandas()
+
+    def open_chunks(self, file_path: str, chunk_rows: int, sheet_name: Optional[str] = None) -> ChunkedDataset:
+        """
+        Open an upload for chunked reading without ingesting it whole.
+
+        CSV and Parquet files are read with streaming readers and ``.xlsx``
+        worksheets with openpyxl's row iterator. Legacy ``.xls`` workbooks
+        cannot be streamed and are read through the ingested columnar copy.
+        """
+        file_path_obj = Path(file_path)
+
+        if not file_path_obj.exists():
+            raise FileNotFoundError(f"File does not exist: {file_path}")
+
+        if file_path_obj.suffix.lower() not in SUPPORTED_SUFFIXES:
+            raise ValueError(f"Unsupported file format: {file_path_obj.suffix}")
+
+        return ChunkedDataset(self, file_path_obj, chunk_rows, sheet_name)
+
+    def _iter_raw_chunks(self, file_path: Path, chunk_rows: int, sheet_name: Optional[str]) -> Iterator[pd.DataFrame]:
+        suffix = file_path.suffix.lower()
+
+        if suffix == '.csv':
+            with pd.read_csv(file_path, chunksize=chunk_rows, low_memory=False) as reader:
+                yield from reader
+        elif suffix == '.parquet':
+            for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_rows):
+                yield batch.to_pandas(date_as_object=False)
+        elif suffix == '.xlsx':
+            names, batches = self._xlsx_row_batches(file_path, sheet_name, chunk_rows)
+            for batch in batches:
+                yield pd.DataFrame.from_records(batch, columns=names)
+        else:
+            table = self.ingest(str(file_path), sheet_name).table
+            for batch in table.to_batches(max_chunksize=chunk_rows):
+                yield batch.to_pandas(date_as_object=False)
+
+    def _parse(self, file_path: Path, sheet_name: Optional[str]) -> pa.Table:
+        suffix = file_path.suffix.lower()
+
+        if suffix == '.csv':
+            return self._parse_csv(file_path)
+        elif suffix == '.xlsx':
+            return self._parse_xlsx(file_path, sheet_name)
+        elif suffix == '.parquet':
+            table = pq.read_table(file_path)
+            return table.rename_columns(self._dedupe_columns(table.column_names))
+
+        # Legacy .xls workbooks cannot be streamed with openpyxl.
+        df = pd.read_excel(
+            file_path,
+            sheet_name=sheet_name if sheet_name is not None else 0,
+            nrows=self.excel_max_rows or None
+        )
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    def _parse_csv(self, file_path: Path) -> pa.Table:
+        try:
+            table = pa_csv.read_csv(
+                file_path,
+                read_options=pa_csv.ReadOptions(use_threads=True),
+                convert_options=pa_csv.ConvertOptions(strings_can_be_null=True)
+            )
+        except pa.ArrowInvalid as e:
+            # Type inference only looks at the first block; fall back to pandas
+            # for columns whose type changes further down the file.
+            logger.warning(f"Columnar CSV reader failed for {file_path}, using pandas: {str(e)}")
+            df = pd.read_csv(file_path, low_memory=False)
+            return pa.Table.from_pandas(df, preserve_index=False)
+
+        return table.rename_columns(self._dedupe_columns(table.column_names))
+
+    def _infer_types(self, table: pa.Table):
+        """Run type inference and write converted columns back into the table."""
+        df = table.to_pandas(split_blocks=True, date_as_object=False)
+        inference = type_inference_service.infer(df)
+        converted_cols = type_inference_service.apply(df, inference)
+
+        for col in converted_cols:
+            idx = table.column_names.index(col)
+            table = table.set_column(idx, col, pa.Array.from_pandas(df[col]))
+
+        return table, {col: info["type"] for col, info in inference.items()}
+
+    def _inference_signature(self) -> bytes:
+        return json.dumps(type_inference_service.options(), sort_keys=True).encode()
+
+    def _parse_xlsx(self, file_path: Path, sheet_name: Optional[str]) -> pa.Table:
+        """
+        Stream a worksheet into Arrow without building the workbook in memory.
+
+        Rows are read with openpyxl's read-only iterator and converted to
+        columnar batches of ``excel_batch_rows``; column types are reconciled
+        across batches at the end.
+        """
+        names, batches = self._xlsx_row_batches(file_path, sheet_name, self.excel_batch_rows)
+        columns: List[List[pa.Array]] = [[] for _ in names]
+
+        for batch in batches:
+            self._append_batch(columns, batch)
+
+        if not names:
+            return pa.table({})
+
+        return pa.table({
+            name: self._unify_chunks(chunks)
+            for name, chunks in zip(names, columns)
+        })
+
+    def _xlsx_row_batches(self, file_path: Path, sheet_name: Optional[str], batch_rows: int):
+        """
+        Open a worksheet and return its header names and a generator of row batches.
+
+        The workbook is closed when the generator is exhausted or discarded.
+        """
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            if sheet_name is None:
+                sheet = workbook.worksheets[0]
+            elif sheet_name in workbook.sheetnames:
+                sheet = workbook[sheet_name]
+            else:
+                raise ValueError(f"Sheet '{sheet_name}' not found in {file_path.name}")
+
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+        except Exception:
+            workbook.close()
+            raise
+
+        if header is None:
+            workbook.close()
+            return [], iter(())
+
+        names = self._dedupe_columns([
+            str(name) if name is not None else f"Unnamed: {idx}"
+            for idx, name in enumerate(header)
+        ])
+        width = len(names)
+
+        def batches():
+            try:
+                batch: List[tuple] = []
+                row_count = 0
+
+                for row in rows:
+                    if all(value is None for value in row):
+                        continue
+                    if len(row) != width:
+                        row = (tuple(row) + (None,) * width)[:width]
+                    batch.append(row)
+                    row_count += 1
+
+                    if len(batch) >= batch_rows:
+                        yield batch
+                        batch = []
+
+                    if self.excel_max_rows and row_count >= self.excel_max_rows:
+                        logger.warning(f"Row cap of {self.excel_max_rows} reached while reading {file_path.name}")
+                        break
+
+                if batch:
+                    yield batch
+            finally:
+                workbook.close()
+
+        return names, batches()
+
+    def _append_batch(self, columns: List[List[pa.Array]], batch: List[tuple]):
+        for idx, values in enumerate(zip(*batch)):
+            try:
+                columns[idx].append(pa.array(values))
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                columns[idx].append(pa.array(
+                    [None if value is None else str(value) for value in values],
+                    type=pa.string()
+                ))
+
+    def _unify_chunks(self, chunks: List[pa.Array]) -> pa.ChunkedArray:
+        """Cast per-batch arrays to one type: null < int < float, otherwise string."""
+        types = {chunk.type for chunk in chunks if not pa.types.is_null(chunk.type)}
+
+        if not types:
+            return pa.chunked_array(chunks, type=pa.null())
+        if len(types) == 1:
+            target = types.pop()
+        elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+            target = pa.float64()
+        elif all(pa.types.is_timestamp(t) or pa.types.is_date(t) for t in types):
+            target = pa.timestamp("us")
+        else:
+            target = pa.string()
+
+        return pa.chunked_array([self._cast_chunk(chunk, target) for chunk in chunks], type=target)
+
+    def _cast_chunk(self, chunk: pa.Array, target: pa.DataType) -> pa.Array:
+        if chunk.type == target:
+            return chunk
+        if pa.types.is_null(chunk.type):
+            return pa.nulls(len(chunk), type=target)
+        if pa.types.is_string(target) and not pa.types.is_string(chunk.type):
+            return pa.array(
+                [None if value is None else str(value) for value in chunk.to_pylist()],
+                type=pa.string()
+            )
+        return pc.cast(chunk, target)
+
+    def _variant(self, sheet_name: Optional[str], max_rows: int) -> str:
+        """Identify ingestion options that change the columnar copy's contents."""
+        if sheet_name is None and not max_rows:
+            return ""
+        return f"sheet={sheet_name or ''};max_rows={max_rows}"
+
+    def _dedupe_columns(self, names: List[str]) -> List[str]:
+        """Rename duplicate headers the way pandas does (``a``, ``a.1``, ...)."""
+        seen: Dict[str, int] = {}
+        result = []
+        for name in names:
+            if name in seen:
+                seen[name] += 1
+                candidate = f"{name}.{seen[name]}"
+                while candidate in seen:
+                    seen[name] += 1
+                    candidate = f"{name}.{seen[name]}"
+                seen[candidate] = 0
+                result.append(candidate)
+            else:
+                seen[name] = 0
+                result.append(name)
+        return result
+
+    def _candidate_paths(self, file_path: Path, variant: str) -> List[Path]:
+        digest = hashlib.sha256(f"{file_path.resolve()}|{variant}".encode()).hexdigest()[:32]
+        suffix = f".{hashlib.sha256(variant.encode()).hexdigest()[:8]}.arrow" if variant else ".arrow"
+        return [
+            file_path.with_name(f"{file_path.name}{suffix}"),
+            self.cache_dir / f"{digest}.arrow",
+        ]
+
+    def _find_fresh_copy(self, file_path: Path, stat: os.stat_result, variant: str) -> Optional[Path]:
+        for candidate in self._candidate_paths(file_path, variant):
+            if not candidate.exists():
+                continue
+            try:
+                with pa.memory_map(str(candidate), "r") as source:
+                    metadata = pa.ipc.open_file(source).schema.metadata or {}
+            except (OSError, pa.ArrowInvalid):
+                continue
+            if (metadata.get(SOURCE_SIZE_KEY) == str(stat.st_size).encode()
+                    and metadata.get(SOURCE_MTIME_KEY) == str(stat.st_mtime_ns).encode()
+                    and metadata.get(SOURCE_VARIANT_KEY, b"") == variant.encode()
+                    and metadata.get(INFERENCE_OPTIONS_KEY) == self._inference_signature()):
+                return candidate
+        return None
+
+    def _write_copy(self, file_path: Path, table: pa.Table, variant: str) -> Path:
+        last_error: Optional[OSError] = None
+
+        for candidate in self._candidate_paths(file_path, variant):
+            tmp_path = candidate.with_name(f"{candidate.name}.{os.getpid()}.tmp")
+            try:
+                candidate.parent.mkdir(parents=True, exist_ok=True)
+                with pa.OSFile(str(tmp_path), "wb") as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+                os.replace(tmp_path, candidate)
+                logger.info(f"Columnar copy of {file_path} written to {candidate}")
+                return candidate
+            except OSError as e:
+                last_error = e
+                tmp_path.unlink(missing_ok=True)
+
+        raise last_error
+
+    def _open(self, columnar_path: Path) -> pa.Table:
+        source = pa.memory_map(str(columnar_path), "r")
+        return pa.ipc.open_file(source).read_all()
+
+    def _lock_for(self, file_path: Path) -> threading.Lock:
+        key = str(file_path.resolve())
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+
+dataset_ingestion_service = DatasetIngestionService(
+    cache_dir=settings.INGEST_CACHE_DIR,
+    excel_max_rows=settings.EXCEL_MAX_ROWS,
+    excel_batch_rows=settings.EXCEL_BATCH_ROWS
+)
@@ -0,0 +1,324 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy.special import ndtri
+from typing import Dict, Any, Iterable, List, Optional, Union
+from app.services.column_statistics import ColumnStatistics
+from app.services.column_codec import CONTINUOUS_TYPES, to_float, factorize, json_value
+
+DISCRETE_TYPES = {"categorical", "boolean"}
+WORST_ITEMS = 5
+EPSILON = 1e-6
+
+
+class FidelityProfile:
+    """
+    Compact sketch of a training set for judging how well synthetic data matches it.
+
+    Built in one pass over the training chunks: continuous columns keep
+    quantile bin edges with the real CDF at each edge (from a reservoir
+    sample), discrete columns keep the frequencies of their most common
+    categories, and a bottom-k row sample gives the correlation matrix of
+    per-column normal scores. The profile is stored with the model, so
+    evaluating generated data is a single streaming pass over the synthetic
+    rows that never touches the training file:
+
+    - continuous columns: KS distance between the binned CDFs
+    - discrete columns: total variation distance and per-category
+      frequency errors
+    - all pairs: absolute deltas between the two correlation matrices
+    """
+
+    def __init__(
+        self,
+        num_bins: int = 100,
+        max_categories: int = 500,
+        sample_rows: int = 20000,
+        reservoir_size: int = 200000
+    ):
+        self.num_bins = num_bins
+        self.max_categories = max_categories
+        self.sample_rows = sample_rows
+        self.reservoir_size = reservoir_size
+        self.num_rows = 0
+        self.columns: List[Dict[str, Any]] = []
+        self.correlation: Optional[np.ndarray] = None
+
+    def fit(self, df: pd.DataFrame, column_types: Dict[str, str], seed: Optional[int] = None) -> "FidelityProfile":
+        return self.fit_chunks([df], column_types, seed)
+
+    def fit_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        column_types: Dict[str, str],
+        seed: Optional[int] = None
+    ) -> "FidelityProfile":
+        rng = np.random.default_rng(seed)
+        evaluated = [name for name, column_type in column_types.items() if column_type in CONTINUOUS_TYPES | DISCRETE_TYPES]
+        statistics = ColumnStatistics(
+            {name: column_types[name] for name in evaluated},
+            reservoir_size=self.reservoir_size,
+            seed=int(rng.integers(2**31))
+        )
+
+        # Bottom-k sample: every row draws a random key and the k smallest keys are kept.
+        sample, sample_keys = None, np.empty(0)
+        for chunk in chunks:
+            chunk = chunk[[name for name in evaluated if name in chunk.columns]]
+            statistics.update(chunk)
+
+            keys = rng.random(len(chunk))
+            if len(sample_keys) >= self.sample_rows:
+                keep = keys < sample_keys.max()
+                chunk, keys = chunk[keep], keys[keep]
+            sample = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+            sample_keys = np.concatenate([sample_keys, keys])
+            if len(sample_keys) > self.sample_rows:
+                keep = np.argsort(sample_keys, kind="stable")[:self.sample_rows]
+                keep.sort()
+                sample, sample_keys = sample.iloc[keep].reset_index(drop=True), sample_keys[keep]
+
+        self.num_rows = statistics.num_rows
+        self.columns = [spec for spec in map(self._column_spec, statistics.summaries()) if spec is not None]
+        self.correlation = self._correlation(self._scores(sample)) if sample is not None and len(sample) > 1 else None
+        return self
+
+    def evaluate(self, data: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Dict[str, Any]:
+        """
+        Compare synthetic data with the profiled training data.
+
+        Args:
+            data: Synthetic rows, as one frame or a sequence of chunks
+
+        Returns:
+            ``score`` in [0, 1] (mean of ``columnScore`` and
+            ``correlationScore``), per-column distances and correlation deltas
+        """
+        started = time.time()
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+
+        states = [self._new_state(spec) for spec in self.columns]
+        dims = len(self.columns)
+        gram, sums, num_rows = np.zeros((dims, dims)), np.zeros(dims), 0
+
+        for chunk in chunks:
+            for spec, state in zip(self.columns, states):
+                if spec["name"] in chunk.columns:
+                    self._accumulate(spec, state, chunk[spec["name"]])
+            if dims:
+                scores = self._scores(chunk)
+                gram += scores.T @ scores
+                sums += scores.sum(axis=0)
+            num_rows += len(chunk)
+
+        columns = {
+            spec["name"]: self._column_report(spec, state, num_rows)
+            for spec, state in zip(self.columns, states)
+            if state["seen"]
+        }
+        distances = [report["distance"] for report in columns.values()]
+        column_score = 1.0 - float(np.mean(distances)) if distances else None
+
+        correlation = None
+        if self.correlation is not None and num_rows > 1 and dims > 1:
+            mean = sums / num_rows
+            synthetic = self._normalize_covariance(gram / num_rows - np.outer(mean, mean))
+            correlation = self._correlation_report(synthetic)
+
+        parts = [part for part in (column_score, correlation and correlation["score"]) if part is not None]
+        return {
+            "score": round(float(np.mean(parts)), 4) if parts else None,
+            "columnScore": round(column_score, 4) if column_score is not None else None,
+            "correlationScore": correlation["score"] if correlation else None,
+            "rows": num_rows,
+            "trainingRows": self.num_rows,
+            "columns": columns,
+            "correlation": correlation,
+            "elapsedSeconds": round(time.time() - started, 3),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "numBins": self.num_bins,
+            "maxCategories": self.max_categories,
+            "sampleRows": self.sample_rows,
+            "reservoirSize": self.reservoir_size,
+            "numRows": self.num_rows,
+            "columns": self.columns,
+            "correlation": self.correlation,
+        }
+
+    @classmethod
+    def from_dict(cls, params: Dict[str, Any]) -> "FidelityProfile":
+        profile = cls(
+            num_bins=params["numBins"],
+            max_categories=params["maxCategories"],
+            sample_rows=params["sampleRows"],
+            reservoir_size=params["reservoirSize"]
+        )
+        profile.num_rows = params["numRows"]
+        profile.columns = params["columns"]
+        profile.correlation = None if params.get("correlation") is None else np.asarray(params["correlation"])
+        return profile
+
+    def _column_spec(self, summary: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        spec = {"name": summary["name"], "type": summary["type"], "nullRate": summary["nullRate"]}
+
+        if summary["type"] in CONTINUOUS_TYPES:
+            values = np.sort(summary["values"])
+            if len(values) == 0:
+                return None
+            spec["edges"] = np.unique(np.quantile(values, np.linspace(0, 1, self.num_bins + 1)))
+            spec["cdf"] = np.searchsorted(values, spec["edges"], side="right") / len(values)
+            return spec
+
+        counts = summary["counts"]
+        total = sum(counts.values())
+        if summary["overflow"] or total == 0:
+            return None
+        top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:self.max_categories]
+        spec["categories"] = [value for value, _ in top]
+        spec["frequencies"] = np.array([count for _, count in top], dtype=np.float64) / total
+        spec["otherFrequency"] = max(0.0, 1.0 - float(spec["frequencies"].sum()))
+        return spec
+
+    def _new_state(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        state = {"seen": 0, "nulls": 0}
+        if spec["type"] in CONTINUOUS_TYPES:
+            state.update({"bins": np.zeros(len(spec["edges"]) + 1, dtype=np.int64), "below": 0})
+        else:
+            state["counts"] = {}
+        return state
+
+    def _accumulate(self, spec: Dict[str, Any], state: Dict[str, Any], series: pd.Series):
+        state["seen"] += len(series)
+        if spec["type"] in CONTINUOUS_TYPES:
+            values = to_float(series, spec["type"])
+            values = values[~np.isnan(values)]
+            state["nulls"] += len(series) - len(values)
+            # Bin i holds values in (edges[i-1], edges[i]], so its cumulative sum is the CDF at each edge.
+            state["bins"] += np.bincount(np.searchsorted(spec["edges"], values, side="left"), minlength=len(state["bins"]))
+            state["below"] += int(np.count_nonzero(values < spec["edges"][0]))
+            return
+
+        codes, uniques = factorize(series)
+        state["nulls"] += int(np.count_nonzero(codes < 0))
+        counts = state["counts"]
+        for value, count in zip(uniques, np.bincount(codes[codes >= 0], minlength=len(uniques)).tolist()):
+            if count:
+                key = json_value(value)
+                counts[key] = counts.get(key, 0) + count
+
+    def _column_report(self, spec: Dict[str, Any], state: Dict[str, Any], num_rows: int) -> Dict[str, Any]:
+        null_rate = state["nulls"] / state["seen"]
+        report = {
+            "type": spec["type"],
+            "nullRate": round(null_rate, 4),
+            "nullRateDelta": round(abs(null_rate - spec["nullRate"]), 4),
+        }
+
+        if spec["type"] in CONTINUOUS_TYPES:
+            bins = state["bins"]
+            valid = int(bins.sum())
+            if valid == 0:
+                report.update({"metric": "ks", "distance": 1.0})
+                return report
+            synthetic_cdf = np.cumsum(bins)[:len(spec["edges"])] / valid
+            report.update({
+                "metric": "ks",
+                "distance": round(float(np.max(np.abs(synthetic_cdf - spec["cdf"]))), 4),
+                "outOfRange": round((state["below"] + int(bins[-1])) / valid, 4),
+            })
+            return report
+
+        counts = state["counts"]
+        valid = sum(counts.values())
+        real = np.append(spec["frequencies"], spec["otherFrequency"])
+        synthetic = np.array([counts.get(value, 0) for value in spec["categories"]], dtype=np.float64)
+        synthetic = np.append(synthetic, valid - synthetic.sum()) / max(valid, 1)
+
+        errors = np.abs(synthetic - real)
+        worst = np.argsort(-errors[:-1], kind="stable")[:WORST_ITEMS]
+        report.update({
+            "metric": "tvd",
+            "distance": round(0.5 * float(errors.sum()), 4),
+            "categoryErrors": {
+                "max": round(float(errors.max()), 4),
+                "mean": round(float(errors[:-1].mean()), 4) if len(errors) > 1 else 0.0,
+                "unseenFrequency": round(float(synthetic[-1] - real[-1]), 4) if valid else 0.0,
+                "worst": [
+                    {
+                        "category": spec["categories"][idx],
+                        "real": round(float(real[idx]), 4),
+                        "synthetic": round(float(synthetic[idx]), 4),
+                    }
+                    for idx in worst
+                    if errors[idx] > 0
+                ],
+            },
+        })
+        return report
+
+    def _scores(self, df: pd.DataFrame) -> np.ndarray:
+        """Normal scores of each profiled column under the real marginals; nulls score 0."""
+        scores = np.zeros((len(df), len(self.columns)))
+        for idx, spec in enumerate(self.columns):
+            if spec["name"] not in df.columns:
+                continue
+            series = df[spec["name"]]
+
+            if spec["type"] in CONTINUOUS_TYPES:
+                values = to_float(series, spec["type"])
+                valid = ~np.isnan(values)
+                if len(spec["edges"]) > 1:
+                    quantiles = np.interp(values[valid], spec["edges"], spec["cdf"])
+                else:
+                    quantiles = np.full(int(valid.sum()), 0.5)
+                scores[valid, idx] = ndtri(np.clip(quantiles, EPSILON, 1 - EPSILON))
+                continue
+
+            # Categories sit at the midpoint of their cumulative frequency, most common first.
+            cumulative = np.cumsum(spec["frequencies"]) - spec["frequencies"] / 2
+            category_scores = ndtri(np.clip(np.append(cumulative, 1 - spec["otherFrequency"] / 2), EPSILON, 1 - EPSILON))
+            codes, uniques = factorize(series)
+            lookup = {value: pos for pos, value in enumerate(spec["categories"])}
+            positions = np.array(
+                [lookup.get(json_value(value), len(spec["categories"])) for value in uniques],
+                dtype=np.int64
+            )
+            valid = codes >= 0
+            scores[valid, idx] = category_scores[positions[codes[valid]]]
+        return scores
+
+    def _correlation(self, scores: np.ndarray) -> np.ndarray:
+        centered = scores - scores.mean(axis=0)
+        return self._normalize_covariance(centered.T @ centered / len(scores))
+
+    def _normalize_covariance(self, covariance: np.ndarray) -> np.ndarray:
+        std = np.sqrt(np.clip(np.diag(covariance), 0, None))
+        # Constant columns leave only rounding noise in their variance; they correlate with nothing.
+        std[std < EPSILON] = 0.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = covariance / np.outer(std, std)
+        correlation = np.nan_to_num(np.clip(correlation, -1, 1))
+        np.fill_diagonal(correlation, 1.0)
+        return correlation
+
+    def _correlation_report(self, synthetic: np.ndarray) -> Dict[str, Any]:
+        rows, cols = np.triu_indices(len(self.columns), k=1)
+        deltas = np.abs(synthetic[rows, cols] - self.correlation[rows, cols])
+        worst = np.argsort(-deltas, kind="stable")[:WORST_ITEMS]
+        mean_delta = float(deltas.mean())
+        return {
+            "score": round(1.0 - mean_delta / 2, 4),
+            "meanAbsDelta": round(mean_delta, 4),
+            "maxAbsDelta": round(float(deltas.max()), 4),
+            "worstPairs": [
+                {
+                    "columns": [self.columns[rows[idx]]["name"], self.columns[cols[idx]]["name"]],
+                    "real": round(float(self.correlation[rows[idx], cols[idx]]), 4),
+                    "synthetic": round(float(synthetic[rows[idx], cols[idx]]), 4),
+                }
+                for idx in worst
+            ],
+        }
@@ -0,0 +1,508 @@
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from app.core.logger import logger
+from app.services.type_inference import type_inference_service
+from app.services.column_statistics import ColumnStatistics
+from app.services.column_codec import (
+    CONTINUOUS_TYPES,
+    to_float,
+    from_float,
+    category_ranks,
+    decode_discrete,
+    synthetic_identifiers
+)
+from app.services.constraints import (
+    normalize_constraints,
+    numeric_bounds,
+    allowed_categories,
+    check_constraints,
+    no_match_error
+)
+
+# Keeps normal scores finite at the edges of the empirical CDF.
+U_EPSILON = 1e-6
+# Gibbs sweeps over the constrained copula dimensions; the chain starts
+# from exact marginal draws, so a few sweeps suffice to add the correlation.
+GIBBS_SWEEPS = 4
+
+
+class GaussianCopulaSynthesizer:
+    """
+    Vectorized Gaussian copula synthesizer.
+
+    Each column gets an empirical marginal: a quantile grid for numeric and
+    datetime columns, category frequencies for discrete ones. Values are
+    mapped to normal scores through their marginal CDF and a single
+    correlation matrix is estimated from those scores in row blocks. Fitting
+    accepts chunked input, so datasets larger than memory can be used; the
+    quantiles come from a reservoir sample once a column exceeds
+    ``reservoir_size`` values.
+
+    Sampling draws correlated normals with a batched Cholesky transform and
+    maps them back through each marginal's inverse CDF. Nearly unique text
+    columns (ids, emails) are emitted as synthetic identifiers instead of
+    replaying observed values.
+
+    Constrained sampling conditions the copula instead of filtering its
+    output: each constraint becomes a set of allowed intervals of its
+    column's uniform (a range of the quantile grid, or the CDF intervals of
+    the allowed categories), the constrained normals are drawn from the
+    truncated multivariate normal with vectorized Gibbs sweeps, and the
+    unconstrained columns are drawn from their exact conditional normal.
+    Every drawn row satisfies the constraints, at roughly the cost of an
+    unconstrained draw.
+    """
+
+    model_type = "gaussian_copula"
+
+    def __init__(
+        self,
+        num_quantiles: int = 1000,
+        max_categories: int = 1000,
+        identifier_ratio: float = 0.95,
+        block_rows: int = 100000,
+        reservoir_size: int = 1000000
+    ):
+        self.num_quantiles = num_quantiles
+        self.max_categories = max_categories
+        self.identifier_ratio = identifier_ratio
+        self.block_rows = block_rows
+        self.reservoir_size = reservoir_size
+
+        self.columns: List[Dict[str, Any]] = []
+        self.correlation: Optional[np.ndarray] = None
+        self.num_rows_fit = 0
+        self._cholesky: Optional[np.ndarray] = None
+
+    @property
+    def column_names(self) -> List[str]:
+        return [spec["name"] for spec in self.columns]
+
+    def fit(
+        self,
+        df: pd.DataFrame,
+        column_types: Optional[Dict[str, str]] = None,
+        seed: Optional[int] = None
+    ) -> "GaussianCopulaSynthesizer":
+        """
+        Fit marginals and the copula correlation.
+
+        Args:
+            df: Training data
+            column_types: Semantic types from type inference; inferred when omitted
+            seed: Seed for the jitter used to spread discrete values over their CDF interval
+
+        Returns:
+            The fitted synthesizer
+        """
+        return self.fit_chunks([df], column_types, seed)
+
+    def fit_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        column_types: Optional[Dict[str, str]] = None,
+        seed: Optional[int] = None
+    ) -> "GaussianCopulaSynthesizer":
+        """
+        Fit from a re-iterable sequence of DataFrame chunks in two passes.
+
+        The first pass builds marginals from bounded column statistics, the
+        second accumulates the correlation of normal scores chunk by chunk,
+        so only one chunk is in memory at a time.
+        """
+        rng = np.random.default_rng(seed)
+
+        if not column_types:
+            first = next(iter(chunks))
+            column_types = {col: info["type"] for col, info in type_inference_service.infer(first).items()}
+
+        statistics = ColumnStatistics(
+            column_types,
+            reservoir_size=self.reservoir_size,
+            seed=int(rng.integers(2**31))
+        )
+        for chunk in chunks:
+            statistics.update(chunk)
+
+        self.columns = [self._spec_from_summary(summary) for summary in statistics.summaries()]
+        dims = 0
+        for spec in self.columns:
+            if spec["kind"] in ("continuous", "discrete"):
+                spec["copulaIndex"] = dims
+                dims += 1
+
+        gram = np.zeros((dims, dims))
+        sums = np.zeros(dims)
+        for chunk in chunks:
+            for start in range(0, len(chunk), self.block_rows):
+                block = self._normal_scores(chunk.iloc[start:start + self.block_rows], dims, rng)
+                gram += block.T @ block
+                sums += block.sum(axis=0)
+
+        self.correlation = self._correlation(gram, sums, statistics.num_rows)
+        self.num_rows_fit = statistics.num_rows
+        self._cholesky = None
+
+        logger.info(f"Fitted Gaussian copula on {self.num_rows_fit} rows, {len(self.columns)} columns")
+        return self
+
+    def sample(
+        self,
+        num_rows: int,
+        rng: Optional[np.random.Generator] = None,
+        constraints: Optional[List[Dict[str, Any]]] = None
+    ) -> pd.DataFrame:
+        """
+        Draw ``num_rows`` synthetic rows.
+
+        Args:
+            num_rows: Rows to draw
+            rng: Random generator
+            constraints: Column constraints (see ``normalize_constraints``) every row must satisfy
+        """
+        if self.correlation is None:
+            raise ValueError("Synthesizer has not been fitted")
+
+        rng = rng or np.random.default_rng()
+        constraints = normalize_constraints(constraints)
+        if constraints:
+            check_constraints(constraints, self.column_names)
+            uniforms = self._sample_conditioned_uniforms(num_rows, rng, self._uniform_intervals(constraints))
+        else:
+            uniforms = self._sample_uniforms(num_rows, rng)
+
+        data = {}
+        for spec in self.columns:
+            column_u = uniforms[spec["copulaIndex"]] if "copulaIndex" in spec else None
+            data[spec["name"]] = self._decode_column(spec, column_u, num_rows, rng, spec["name"] not in constraints)
+
+        return pd.DataFrame(data, copy=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable parameters; numpy arrays are kept as arrays."""
+        return {
+            "modelType": self.model_type,
+            "numQuantiles": self.num_quantiles,
+            "maxCategories": self.max_categories,
+            "identifierRatio": self.identifier_ratio,
+            "numRowsFit": self.num_rows_fit,
+            "columns": self.columns,
+            "correlation": self.correlation,
+        }
+
+    @classmethod
+    def from_dict(cls, params: Dict[str, Any]) -> "GaussianCopulaSynthesizer":
+        synthesizer = cls(
+            num_quantiles=params["numQuantiles"],
+            max_categories=params["maxCategories"],
+            identifier_ratio=params["identifierRatio"]
+        )
+        synthesizer.columns = params["columns"]
+        synthesizer.correlation = np.asarray(params["correlation"], dtype=np.float64)
+        synthesizer.num_rows_fit = params["numRowsFit"]
+        return synthesizer
+
+    def _spec_from_summary(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        name, column_type, rows = summary["name"], summary["type"], summary["rows"]
+        spec = {"name": name, "type": column_type, "nullRate": summary["nullRate"]}
+
+        if column_type in CONTINUOUS_TYPES:
+            if len(summary["values"]) == 0:
+                spec["kind"] = "empty"
+                return spec
+            spec["kind"] = "continuous"
+            spec["quantiles"] = np.quantile(summary["values"], np.linspace(0.0, 1.0, self.num_quantiles + 1))
+            return spec
+
+        counts = summary["counts"]
+        if column_type == "text" and rows and (summary["overflow"] or len(counts) / rows >= self.identifier_ratio):
+            spec["kind"] = "identifier"
+            return spec
+        if not counts:
+            spec["kind"] = "empty"
+            return spec
+
+        ordered = sorted(counts.items(), key=lambda item: -item[1])[:self.max_categories]
+        kept_counts = np.array([count for _, count in ordered], dtype=np.float64)
+        spec["kind"] = "discrete"
+        spec["categories"] = [value for value, _ in ordered]
+        spec["probabilities"] = kept_counts / kept_counts.sum()
+        return spec
+
+    def _normal_scores(self, block: pd.DataFrame, dims: int, rng: np.random.Generator) -> np.ndarray:
+        """Map a block of rows to normal scores; nulls and dropped categories score 0."""
+        scores = np.zeros((len(block), dims))
+
+        for spec in self.columns:
+            if "copulaIndex" not in spec or spec["name"] not in block.columns:
+                continue
+            series = block[spec["name"]]
+
+            if spec["kind"] == "continuous":
+                values = to_float(series, spec["type"])
+                u = self._continuous_cdf(spec["quantiles"], values)
+                known = ~np.isnan(values)
+            else:
+                ranks = category_ranks(series, spec["categories"])
+                known = ranks >= 0
+                probabilities = spec["probabilities"]
+                safe = np.maximum(ranks, 0)
+                upper = np.cumsum(probabilities)[safe]
+                # Spread each category uniformly over its CDF interval.
+                u = upper - probabilities[safe] * rng.random(len(block))
+
+            column_scores = ndtri(np.clip(u, U_EPSILON, 1 - U_EPSILON))
+            column_scores[~known] = 0.0
+            scores[:, spec["copulaIndex"]] = column_scores
+
+        return scores
+
+    def _correlation(self, gram: np.ndarray, sums: np.ndarray, num_rows: int) -> np.ndarray:
+        dims = len(sums)
+        if dims == 0 or num_rows < 2:
+            return np.eye(dims)
+
+        covariance = (gram - np.outer(sums, sums) / num_rows) / (num_rows - 1)
+        std = np.sqrt(np.clip(np.diag(covariance), 0, None))
+        std[std == 0] = 1.0
+        correlation = covariance / np.outer(std, std)
+        np.fill_diagonal(correlation, 1.0)
+        return np.clip(correlation, -1.0, 1.0)
+
+    def _sample_uniforms(self, num_rows: int, rng: np.random.Generator) -> np.ndarray:
+        """Correlated uniforms laid out column-major: one contiguous row per copula column."""
+        dims = self.correlation.shape[0]
+        if dims == 0:
+            return np.empty((0, num_rows))
+
+        if self._cholesky is None:
+            self._cholesky = self._stable_cholesky(self.correlation)
+
+        normals = rng.standard_normal((dims, num_rows))
+        return ndtr(self._cholesky @ normals)
+
+    def _decode_column(
+        self,
+        spec: Dict[str, Any],
+        u: Optional[np.ndarray],
+        num_rows: int,
+        rng: np.random.Generator,
+        nullable: bool = True
+    ):
+        kind = spec["kind"]
+        null_mask = None
+        if nullable and spec.get("nullRate", 0.0) > 0:
+            null_mask = rng.random(num_rows) < spec["nullRate"]
+
+        if kind == "continuous":
+            values = self._inverse_cdf(spec["quantiles"], u)
+            return from_float(values, spec["type"], null_mask)
+
+        if kind == "discrete":
+            cumulative = np.cumsum(spec["probabilities"])
+            codes = np.minimum(np.searchsorted(cumulative, u, side="right"), len(cumulative) - 1)
+            return decode_discrete(codes, spec["categories"], spec["type"], null_mask)
+
+        if kind == "identifier":
+            return synthetic_identifiers(spec["name"], num_rows, rng, null_mask)
+
+        return np.full(num_rows, None, dtype=object)
+
+    def _uniform_intervals(self, constraints: Dict[str, Dict[str, Any]]) -> Dict[int, np.ndarray]:
+        """Allowed uniform intervals per constrained copula dimension, as an (m, 2) array."""
+        intervals = {}
+        for spec in self.columns:
+            constraint = constraints.get(spec["name"])
+            if constraint is None:
+                continue
+
+            if spec["kind"] == "continuous":
+                low, high = numeric_bounds(spec["name"], constraint, spec["type"])
+                spans = np.array([self._quantile_interval(spec["quantiles"], low, high)])
+            elif spec["kind"] == "discrete":
+                allowed = allowed_categories(spec["name"], constraint, spec["categories"])
+                upper = np.cumsum(spec["probabilities"])
+                upper[-1] = 1.0
+                lower = np.concatenate([[0.0], upper[:-1]])
+                spans = self._merge_intervals(np.column_stack([lower, upper])[allowed])
+            else:
+                raise ValueError(f"Column '{spec['name']}' cannot be constrained")
+
+            spans = spans[spans[:, 1] > spans[:, 0]] if len(spans) else spans
+            if len(spans) == 0:
+                raise no_match_error(spec["name"])
+            intervals[spec["copulaIndex"]] = spans
+        return intervals
+
+    def _quantile_interval(self, quantiles: np.ndarray, low: float, high: float) -> Tuple[float, float]:
+        """Uniform range whose inverse-CDF values lie in [low, high] on the piecewise-linear quantile grid."""
+        size = len(quantiles)
+        step = 1.0 / (size - 1)
+
+        start = int(np.searchsorted(quantiles, low, side="left"))
+        if start == 0:
+            u_low = 0.0
+        elif start == size:
+            u_low = 1.0
+        else:
+            span = quantiles[start] - quantiles[start - 1]
+            u_low = (start - 1 + (low - quantiles[start - 1]) / span) * step
+
+        end = int(np.searchsorted(quantiles, high, side="right"))
+        if end == size:
+            u_high = 1.0
+        elif end == 0:
+            u_high = 0.0
+        else:
+            span = quantiles[end] - quantiles[end - 1]
+            u_high = (end - 1 + (high - quantiles[end - 1]) / span) * step
+
+        return u_low, u_high
+
+    def _merge_intervals(self, spans: np.ndarray) -> np.ndarray:
+        if len(spans) < 2:
+            return spans
+        spans = spans[np.argsort(spans[:, 0])]
+        merged = [spans[0].copy()]
+        for low, high in spans[1:]:
+            if low <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], high)
+            else:
+                merged.append(np.array([low, high]))
+        return np.array(merged)
+
+    def _sample_conditioned_uniforms(
+        self,
+        num_rows: int,
+        rng: np.random.Generator,
+        intervals: Dict[int, np.ndarray]
+    ) -> np.ndarray:
+        """Correlated uniforms with each constrained dimension restricted to its allowed intervals."""
+        dims = self.correlation.shape[0]
+        constrained = sorted(intervals)
+        free = [idx for idx in range(dims) if idx not in intervals]
+        normals = np.empty((dims, num_rows))
+
+        # z-space bounds of the allowed intervals; the marginal of each constrained
+        # normal is standard, so independent truncated draws start the chain exactly.
+        bounds = {idx: ndtri(np.clip(intervals[idx], 0.0, 1.0)) for idx in constrained}
+        z = np.stack([
+            self._truncated_normal(np.zeros(num_rows), np.ones(num_rows), bounds[idx], rng)
+            for idx in constrained
+        ])
+
+        sigma_cc = self.correlation[np.ix_(constrained, constrained)]
+        if len(constrained) > 1:
+            precision = np.linalg.pinv(sigma_cc)
+            for _ in range(GIBBS_SWEEPS):
+                for pos, idx in enumerate(constrained):
+                    others = [other for other in range(len(constrained)) if other != pos]
+                    variance = 1.0 / precision[pos, pos]
+                    mean = -variance * (precision[pos, others] @ z[others])
+                    z[pos] = self._truncated_normal(mean, np.full(num_rows, np.sqrt(variance)), bounds[idx], rng)
+        normals[constrained] = z
+
+        if free:
+            sigma_fc = self.correlation[np.ix_(free, constrained)]
+            weights = sigma_fc @ np.linalg.pinv(sigma_cc)
+            conditional = self.correlation[np.ix_(free, free)] - weights @ sigma_fc.T
+            conditional = (conditional + conditional.T) / 2 + np.eye(len(free)) * 1e-9
+            normals[free] = weights @ z + self._psd_factor(conditional) @ rng.standard_normal((len(free), num_rows))
+
+        uniforms = ndtr(normals)
+        for idx in constrained:
+            # Rounding through ndtri/ndtr can leave a value just outside its
+            # interval; pull it back so it never decodes to a disallowed category.
+            spans = intervals[idx]
+            pos = np.clip(np.searchsorted(spans[:, 0], uniforms[idx], side="right") - 1, 0, len(spans) - 1)
+            upper = spans[pos, 1] - (spans[pos, 1] - spans[pos, 0]) * 1e-9
+            uniforms[idx] = np.clip(uniforms[idx], spans[pos, 0], upper)
+        return uniforms
+
+    def _truncated_normal(
+        self,
+        mean: np.ndarray,
+        std: np.ndarray,
+        bounds: np.ndarray,
+        rng: np.random.Generator
+    ) -> np.ndarray:
+        """
+        Per-row draws from N(mean, std^2) restricted to a union of intervals.
+
+        An interval is picked in proportion to its probability mass, then a
+        value is drawn inside it by inverse CDF. Tail intervals are handled
+        on the side where the normal CDF keeps its precision.
+        """
+        lower = (bounds[:, 0][None, :] - mean[:, None]) / std[:, None]
+        upper = (bounds[:, 1][None, :] - mean[:, None]) / std[:, None]
+        # Mass of [a, b] computed on the upper tail when a > 0 avoids 1 - 1 cancellation.
+        flip = lower > 0
+        cdf_low = np.where(flip, ndtr(-upper), ndtr(lower))
+        cdf_high = np.where(flip, ndtr(-lower), ndtr(upper))
+        mass = np.clip(cdf_high - cdf_low, 0.0, None)
+
+        total = mass.sum(axis=1)
+        cumulative = np.cumsum(mass, axis=1)
+        pick = (cumulative < (rng.random(len(mean)) * total)[:, None]).sum(axis=1)
+        pick = np.minimum(pick, bounds.shape[0] - 1)
+        rows = np.arange(len(mean))
+
+        u = cdf_low[rows, pick] + rng.random(len(mean)) * mass[rows, pick]
+        t = ndtri(np.clip(u, 1e-300, 1 - 1e-16))
+        t = np.where(flip[rows, pick], -t, t)
+
+        # Rows whose allowed set is numerically unreachable snap to the nearest edge.
+        stranded = total <= 0
+        if stranded.any():
+            nearest = np.where(np.abs(lower[:, 0]) < np.abs(upper[:, -1]), lower[:, 0], upper[:, -1])
+            t[stranded] = nearest[stranded]
+
+        values = mean + std * t
+        return np.clip(values, bounds[0, 0], bounds[-1, 1])
+
+    def _psd_factor(self, covariance: np.ndarray) -> np.ndarray:
+        try:
+            return np.linalg.cholesky(covariance)
+        except np.linalg.LinAlgError:
+            eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+            return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+    def _inverse_cdf(self, quantiles: np.ndarray, u: np.ndarray) -> np.ndarray:
+        """Linear interpolation on the evenly spaced quantile grid, O(1) per value."""
+        intervals = len(quantiles) - 1
+        position = u * intervals
+        idx = np.minimum(position.astype(np.int64), intervals - 1)
+        frac = position - idx
+        lower = quantiles[idx]
+        return lower + frac * (quantiles[idx + 1] - lower)
+
+    def _continuous_cdf(self, quantiles: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """
+        Piecewise-linear CDF through the quantile grid. Values tied with
+        several grid points (discrete data) map to the middle of their mass.
+        """
+        size = len(quantiles)
+        probs = np.linspace(0.0, 1.0, size)
+        left = np.searchsorted(quantiles, values, side="left")
+        right = np.searchsorted(quantiles, values, side="right")
+
+        idx = np.clip(left, 1, size - 1)
+        lower, upper = quantiles[idx - 1], quantiles[idx]
+        span = upper - lower
+        frac = np.divide(values - lower, span, out=np.full(len(values), 0.5), where=span > 0)
+        interpolated = probs[idx - 1] + np.clip(frac, 0.0, 1.0) * (probs[idx] - probs[idx - 1])
+
+        tied = right - left > 1
+        tie_u = (probs[np.clip(left, 0, size - 1)] + probs[np.clip(right - 1, 0, size - 1)]) / 2
+        return np.where(tied, tie_u, interpolated)
+
+    def _stable_cholesky(self, correlation: np.ndarray) -> np.ndarray:
+        try:
+            return np.linalg.cholesky(correlation)
+        except np.linalg.LinAlgError:
+            eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+            repaired = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+            scale = np.sqrt(np.diag(repaired))
+            return np.linalg.cholesky(repaired / np.outer(scale, scale))
@@ -0,0 +1,272 @@
+import os
+import math
+import time
+import itertools
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from typing import Dict, Any, List, Optional
+from app.core.logger import logger
+from app.services.fidelity import FidelityProfile
+
+COPULA_PARAMS = {"num_quantiles", "max_categories", "identifier_ratio"}
+GAN_PARAMS = {"epochs", "batch_size", "embedding_dim", "learning_rate", "generator_dims", "discriminator_dims"}
+MAX_GRID_SIZE = 1000
+HOLDOUT_FRACTION = 0.2
+
+# Per-worker view of the shared dataset, attached once by the pool initializer.
+_worker_state: Dict[str, Any] = {}
+
+
+class HyperparameterSearchService:
+    """
+    Parallel hyperparameter search over synthesizer configurations.
+
+    The preprocessed dataset is written once into a shared memory segment as
+    an Arrow IPC stream; pool workers map it in their initializer as an
+    Arrow table whose buffers point into the segment, so trials do not
+    pickle or re-read the data. Pandas needs its own copy, so each trial
+    converts only the training rows it fits on and drops them when it
+    finishes; a worker's private copy lives as long as its running trial.
+    Trials are scored by how closely a sample matches a holdout split,
+    using the fidelity score of a profile built once per worker from the
+    holdout.
+
+    Trials run on rungs of growing training budget, starting at
+    ``min_budget`` and multiplied by ``reduction_factor`` until a rung runs
+    on the full budget; after each rung the poorer trials are pruned.
+    Strategies: ``grid`` evaluates every combination of listed values and
+    ``random`` samples ``num_trials`` configurations, both pruning with the
+    median stopping rule (a trial scoring below the rung's median stops);
+    ``successive_halving`` samples ``num_trials`` configurations and
+    promotes only the best ``1 / reduction_factor`` to the next rung.
+    """
+
+    def search(
+        self,
+        model_type: str,
+        df: pd.DataFrame,
+        column_types: Dict[str, str],
+        search_config: Dict[str, Any],
+        base_params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a search and return every trial with the best configuration.
+
+        Args:
+            model_type: Model type from the training request; names containing
+                ``gan`` search CTGAN parameters, anything else the Gaussian copula
+            df: Preprocessed training data
+            column_types: Semantic column types
+            search_config: Strategy, space and limits (see ``HyperparameterSearch``)
+            base_params: Fixed hyperparameters merged into every trial
+
+        Returns:
+            ``{"trials": [...], "best": trial, "elapsedSeconds": float}``
+        """
+        synthesizer = "ctgan" if "gan" in model_type.lower() else "gaussian_copula"
+        allowed = GAN_PARAMS if synthesizer == "ctgan" else COPULA_PARAMS
+        space = search_config.get("space") or {}
+        base_params = dict(base_params or {})
+
+        unknown = (set(space) | set(base_params)) - allowed
+        if unknown:
+            raise ValueError(f"Unsupported hyperparameters for {synthesizer}: {', '.join(sorted(unknown))}")
+
+        rng = np.random.default_rng(search_config.get("seed"))
+        strategy = search_config.get("strategy", "random")
+        configs = self._configurations(strategy, space, search_config.get("num_trials", 10), rng)
+        trials = [
+            {"trial_id": idx, "hyperparameters": {**base_params, **params}, "status": "pending", "intermediate": []}
+            for idx, params in enumerate(configs)
+        ]
+
+        max_workers = min(search_config.get("max_workers") or os.cpu_count() or 1, len(trials))
+        started = time.time()
+
+        segment, size = self._share_dataset(df, rng)
+        try:
+            context = get_context("spawn")
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=context,
+                initializer=_attach_dataset,
+                initargs=(segment.name, size, column_types, max(1, (os.cpu_count() or 1) // max_workers))
+            ) as pool:
+                self._run_rungs(
+                    pool, synthesizer, trials, strategy,
+                    search_config.get("min_budget", 0.1),
+                    search_config.get("reduction_factor", 3)
+                )
+        finally:
+            segment.close()
+            segment.unlink()
+
+        for trial in trials:
+            if trial["status"] == "pending":
+                trial["status"] = "completed"
+
+        scored = [trial for trial in trials if trial.get("score") is not None]
+        if not scored:
+            raise RuntimeError("All hyperparameter trials failed")
+        best = max(scored, key=lambda trial: (trial["budget"], trial["score"]))
+
+        elapsed = time.time() - started
+        logger.info(
+            f"{strategy} search over {len(trials)} {synthesizer} trials with {max_workers} workers "
+            f"finished in {elapsed:.2f}s; best score {best['score']:.4f}"
+        )
+        return {"trials": trials, "best": best, "elapsedSeconds": round(elapsed, 3)}
+
+    def _configurations(self, strategy: str, space: Dict[str, Any], num_trials: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+        if strategy == "grid":
+            names = list(space)
+            for name in names:
+                if not isinstance(space[name], list):
+                    raise ValueError(f"Grid search needs a list of values for '{name}'")
+            size = math.prod(len(space[name]) for name in names)
+            if size > MAX_GRID_SIZE:
+                raise ValueError(f"Grid has {size} combinations; the limit is {MAX_GRID_SIZE}")
+            return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+        if strategy not in ("random", "successive_halving"):
+            raise ValueError(f"Unknown search strategy: {strategy}")
+        return [
+            {name: self._sample_value(name, spec, rng) for name, spec in space.items()}
+            for _ in range(num_trials)
+        ]
+
+    def _sample_value(self, name: str, spec: Any, rng: np.random.Generator) -> Any:
+        if isinstance(spec, list):
+            return spec[int(rng.integers(len(spec)))]
+        if isinstance(spec, dict) and "low" in spec and "high" in spec:
+            low, high = float(spec["low"]), float(spec["high"])
+            if spec.get("log"):
+                value = math.exp(rng.uniform(math.log(low), math.log(high)))
+            else:
+                value = rng.uniform(low, high)
+            if spec.get("type") == "int" or (isinstance(spec["low"], int) and isinstance(spec["high"], int)):
+                return int(round(value))
+            return value
+        raise ValueError(f"Search space for '{name}' must be a list of values or a {{low, high}} range")
+
+    def _run_rungs(
+        self,
+        pool,
+        synthesizer: str,
+        trials: List[Dict[str, Any]],
+        strategy: str,
+        min_budget: float,
+        reduction_factor: int
+    ):
+        active = trials
+        rung = 0
+
+        # The winner must have been fitted on the full budget, so rungs continue until one runs at 1.0.
+        while True:
+            budget = min(1.0, round(min_budget * reduction_factor ** rung, 6))
+            self._run_rung(pool, synthesizer, active, budget)
+            survivors = [trial for trial in active if trial.get("score") is not None]
+            if budget >= 1.0 or not survivors:
+                break
+
+            if len(survivors) > 1:
+                survivors.sort(key=lambda trial: trial["score"], reverse=True)
+                if strategy == "successive_halving":
+                    keep = max(1, len(survivors) // reduction_factor)
+                else:
+                    median = float(np.median([trial["score"] for trial in survivors]))
+                    keep = sum(1 for trial in survivors if trial["score"] >= median)
+                for trial in survivors[keep:]:
+                    trial["status"] = "pruned"
+                survivors = survivors[:keep]
+            active = survivors
+            rung += 1
+
+    def _run_rung(self, pool, synthesizer: str, trials: List[Dict[str, Any]], budget: float):
+        futures = [
+            (trial, pool.submit(_run_trial, synthesizer, trial["hyperparameters"], budget, trial["trial_id"]))
+            for trial in trials
+        ]
+        for trial, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Trial {trial['trial_id']} failed: {str(e)}")
+                trial.update({"status": "failed", "error": str(e), "score": None})
+                continue
+            trial["intermediate"].append({"budget": budget, "score": result["score"], "fitSeconds": result["fitSeconds"]})
+            trial.update({"budget": budget, "score": result["score"], "fitSeconds": result["fitSeconds"]})
+
+    def _share_dataset(self, df: pd.DataFrame, rng: np.random.Generator):
+        """Shuffle rows and copy them into shared memory as an Arrow IPC stream."""
+        shuffled = df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+        table = pa.Table.from_pandas(shuffled, preserve_index=False)
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        payload = sink.getvalue()
+
+        segment = shared_memory.SharedMemory(create=True, size=max(payload.size, 1))
+        try:
+            target = np.frombuffer(segment.buf, dtype=np.uint8, count=payload.size)
+            target[:] = np.frombuffer(payload, dtype=np.uint8)
+            del target
+        except BaseException:
+            segment.close()
+            segment.unlink()
+            raise
+        return segment, payload.size
+
+
+def _attach_dataset(segment_name: str, size: int, column_types: Dict[str, str], threads: int):
+    """Pool initializer: map the shared dataset and profile the holdout once per worker."""
+    from threadpoolctl import threadpool_limits
+
+    # Spawned workers share the parent's resource tracker, so attaching only
+    # re-registers a name the parent already tracks and unlinks on exit.
+    segment = shared_memory.SharedMemory(name=segment_name)
+
+    # Reading the stream from a buffer slices it rather than copying, so the table's columns are views of the segment.
+    table = pa.ipc.open_stream(pa.py_buffer(segment.buf[:size])).read_all()
+    holdout_rows = max(1, int(table.num_rows * HOLDOUT_FRACTION))
+    holdout = table.slice(0, holdout_rows).to_pandas(date_as_object=False)
+
+    _worker_state.update({
+        "segment": segment,
+        "train": table.slice(holdout_rows),
+        "holdout": FidelityProfile().fit(holdout, column_types),
+        "columnTypes": column_types,
+        "threads": threads,
+        "limits": threadpool_limits(limits=threads),
+    })
+
+
+def _run_trial(synthesizer: str, params: Dict[str, Any], budget: float, trial_id: int) -> Dict[str, Any]:
+    """Fit one configuration on ``budget`` of the training split and score it."""
+    train: pa.Table = _worker_state["train"]
+    holdout = _worker_state["holdout"]
+    column_types = _worker_state["columnTypes"]
+
+    started = time.time()
+    if synthesizer == "ctgan":
+        from app.services.ctgan import CTGANSynthesizer
+        params = dict(params)
+        params["epochs"] = max(1, int(round(params.get("epochs", 10) * budget)))
+        model = CTGANSynthesizer(threads=_worker_state["threads"], **params)
+        model.fit(train.to_pandas(date_as_object=False), column_types, seed=trial_id)
+    else:
+        from app.services.gaussian_copula import GaussianCopulaSynthesizer
+        rows = max(2, int(train.num_rows * budget))
+        frame = train.slice(0, rows).to_pandas(date_as_object=False)
+        model = GaussianCopulaSynthesizer(**params).fit(frame, column_types, seed=trial_id)
+    fit_seconds = time.time() - started
+
+    sample = model.sample(holdout.num_rows, np.random.default_rng(trial_id))
+    return {"score": holdout.evaluate(sample)["score"] or 0.0, "fitSeconds": round(fit_seconds, 3)}
+
+
+hyperparameter_search_service = HyperparameterSearchService()
@@ -0,0 +1,155 @@
+import os
+import json
+import mmap
+import struct
+import numpy as np
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+ARTIFACT_NAME = "model.deai"
+MAGIC = b"DEAIMDL1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Marks a header node that stands in for an array blob.
+ARRAY_REF_KEY = "__array__"
+
+
+def save_artifact(path: str, params: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Write model parameters as a JSON header followed by aligned array blobs.
+
+    Layout: 8-byte magic, little-endian uint64 header length, UTF-8 JSON
+    header, then each numpy array's raw bytes at a 64-byte aligned offset.
+    Arrays anywhere in ``params`` are replaced in the header by references
+    to their blob. The file is written to a temporary name and renamed into
+    place, so readers never see a partial artifact and existing memory maps
+    of the previous version stay valid.
+
+    Returns:
+        Size of the written file in bytes
+    """
+    arrays: List[np.ndarray] = []
+    tree = _extract_arrays(params, arrays)
+
+    # Offsets depend on the header length, which depends on the offsets'
+    # digits; iterate until the layout is stable.
+    header_len = 0
+    while True:
+        blobs, offset = [], _align(len(MAGIC) + 8 + header_len)
+        for array in arrays:
+            blobs.append({"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset, "nbytes": array.nbytes})
+            offset = _align(offset + array.nbytes)
+        header = json.dumps({
+            "format": FORMAT_VERSION,
+            "metadata": metadata or {},
+            "params": tree,
+            "arrays": blobs,
+        }, default=_json_default).encode()
+        if len(header) == header_len:
+            break
+        header_len = len(header)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", header_len))
+            f.write(header)
+            for array, blob in zip(arrays, blobs):
+                f.write(b"\0" * (blob["offset"] - f.tell()))
+                f.write(np.ascontiguousarray(array).tobytes())
+            size = f.tell()
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+    return size
+
+
+def load_artifact(path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Memory-map an artifact and rebuild its parameters.
+
+    Arrays are read-only views into the shared mapping, so loading costs the
+    header parse only and processes that map the same file share its pages.
+
+    Returns:
+        The parameters and the metadata stored with them
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    header = _parse_header(buffer, path)
+    arrays = [
+        np.frombuffer(
+            buffer,
+            dtype=np.dtype(blob["dtype"]),
+            count=int(np.prod(blob["shape"], dtype=np.int64)),
+            offset=blob["offset"]
+        ).reshape(blob["shape"])
+        for blob in header["arrays"]
+    ]
+
+    return _restore_arrays(header["params"], arrays), header["metadata"]
+
+
+def read_metadata(path: str) -> Dict[str, Any]:
+    """Read only the metadata from an artifact's header."""
+    with open(path, "rb") as f:
+        prefix = f.read(len(MAGIC) + 8)
+        if len(prefix) < len(MAGIC) + 8 or prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a model artifact: {path}")
+        (header_len,) = struct.unpack("<Q", prefix[len(MAGIC):])
+        return json.loads(f.read(header_len))["metadata"]
+
+
+def _parse_header(buffer: mmap.mmap, path: str) -> Dict[str, Any]:
+    if len(buffer) < len(MAGIC) + 8 or buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"Not a model artifact: {path}")
+
+    (header_len,) = struct.unpack_from("<Q", buffer, len(MAGIC))
+    start = len(MAGIC) + 8
+    header = json.loads(buffer[start:start + header_len])
+
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {header.get('format')} in {path}")
+    for blob in header["arrays"]:
+        if blob["offset"] + blob["nbytes"] > len(buffer):
+            raise ValueError(f"Truncated model artifact: {path}")
+    return header
+
+
+def _extract_arrays(node: Any, arrays: List[np.ndarray]) -> Any:
+    if isinstance(node, np.ndarray):
+        if node.dtype.hasobject:
+            raise ValueError("Object arrays cannot be stored in a model artifact")
+        array = node if node.dtype.byteorder != ">" else node.astype(node.dtype.newbyteorder("<"))
+        arrays.append(array)
+        return {ARRAY_REF_KEY: len(arrays) - 1}
+    if isinstance(node, dict):
+        return {key: _extract_arrays(value, arrays) for key, value in node.items()}
+    if isinstance(node, (list, tuple)):
+        return [_extract_arrays(value, arrays) for value in node]
+    return node
+
+
+def _restore_arrays(node: Any, arrays: List[np.ndarray]) -> Any:
+    if isinstance(node, dict):
+        if len(node) == 1 and ARRAY_REF_KEY in node:
+            return arrays[node[ARRAY_REF_KEY]]
+        return {key: _restore_arrays(value, arrays) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_restore_arrays(value, arrays) for value in node]
+    return node
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
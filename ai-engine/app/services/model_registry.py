@@ -0,0 +1,307 @@
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from app.core.logger import logger
+from app.core.config import settings
+from app.services.gaussian_copula import GaussianCopulaSynthesizer
+from app.services.model_artifact import ARTIFACT_NAME, load_artifact, read_metadata
+from app.services.preprocessing import PreprocessingPipeline
+from app.services.fidelity import FidelityProfile
+
+
+class TrainedModel:
+    """A fitted synthesizer, the preprocessing pipeline it was trained behind and its training-data profile."""
+
+    def __init__(
+        self,
+        synthesizer,
+        pipeline: Optional[PreprocessingPipeline] = None,
+        profile: Optional[FidelityProfile] = None
+    ):
+        self.synthesizer = synthesizer
+        self.pipeline = pipeline
+        self.profile = profile
+
+    def sample(
+        self,
+        num_rows: int,
+        rng: Optional[np.random.Generator] = None,
+        constraints: Optional[List[Dict[str, Any]]] = None
+    ) -> pd.DataFrame:
+        rng = rng or np.random.default_rng()
+        data = self.synthesizer.sample(num_rows, rng, constraints)
+        if self.pipeline is not None:
+            self.pipeline.inverse_transform(data, rng, constraints)
+        return data
+
+
+class ModelRegistryService:
+    """
+    Indexes trained model artifacts on disk and serves loaded models.
+
+    Artifacts live in ``MODEL_CACHE_DIR/<jobId>/model.deai`` and carry their
+    metadata in the header. The index is rebuilt lazily from the directory and
+    each entry carries a version derived from the artifact's size and mtime,
+    so retraining a job invalidates its loaded model.
+
+    Loaded models are kept in an LRU bounded by ``max_bytes``, using
+    the artifact size as the size estimate; their arrays are memory-mapped
+    from the artifact, so loading is cheap and processes share pages. Concurrent requests
+    for a model that is not loaded yet share a single load.
+    """
+
+    def __init__(self, model_dir: str, max_bytes: int, prewarm_ids: str = ""):
+        self.model_dir = Path(model_dir)
+        self.max_bytes = max_bytes
+        self.prewarm_ids = prewarm_ids
+
+        self._loaded: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._loading: Dict[tuple, Dict[str, Any]] = {}
+        self._loaded_bytes = 0
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.shared_loads = 0
+        self.evictions = 0
+
+    def list_models(self) -> List[Dict[str, Any]]:
+        """Index entries for every artifact in the model directory, newest first."""
+        entries = []
+        if self.model_dir.is_dir():
+            for artifact in self.model_dir.glob(f"*/{ARTIFACT_NAME}"):
+                entry = self._index_entry(artifact)
+                if entry is not None:
+                    entries.append(entry)
+        return sorted(entries, key=lambda entry: entry["created_at"], reverse=True)
+
+    def get_model_info(self, model_id: str) -> Optional[Dict[str, Any]]:
+        artifact = self.resolve_path(model_id)
+        return self._index_entry(Path(artifact)) if artifact else None
+
+    def get(self, model_id: str):
+        """
+        Return the loaded model for a job id or model path.
+
+        Returns:
+            The ``TrainedModel``, or None when no trained artifact exists
+        """
+        artifact = self.resolve_path(model_id)
+        if artifact is None:
+            return None
+        entry = self._index_entry(Path(artifact))
+        if entry is None:
+            return None
+
+        key = (entry["path"], entry["version"])
+        with self._lock:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                self.hits += 1
+                return self._loaded[key]["model"]
+
+            pending = self._loading.get(key)
+            owner = pending is None
+            if owner:
+                pending = {"event": threading.Event(), "model": None, "error": None}
+                self._loading[key] = pending
+                self.misses += 1
+            else:
+                self.shared_loads += 1
+
+        if not owner:
+            pending["event"].wait()
+            if pending["error"] is not None:
+                raise pending["error"]
+            return pending["model"]
+
+        try:
+            model = self._load(entry["path"])
+            pending["model"] = model
+        except Exception as e:
+            pending["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+                if pending["model"] is not None:
+                    self._store(key, pending["model"], entry["size_bytes"])
+            pending["event"].set()
+
+        return model
+
+    def prewarm(self, model_ids: Optional[List[str]] = None) -> List[str]:
+        """
+        Load models ahead of the first request.
+
+        Args:
+            model_ids: Job ids to load; ``["*"]`` loads the newest models that
+                fit the memory budget. Defaults to MODEL_REGISTRY_PREWARM.
+
+        Returns:
+            The ids of the models that were loaded
+        """
+        if model_ids is None:
+            model_ids = [item.strip() for item in self.prewarm_ids.split(",") if item.strip()]
+        if not model_ids:
+            return []
+
+        if model_ids == ["*"]:
+            budget = self.max_bytes
+            model_ids = []
+            for entry in self.list_models():
+                if entry["size_bytes"] > budget:
+                    break
+                budget -= entry["size_bytes"]
+                model_ids.append(entry["model_id"])
+
+        loaded = []
+        for model_id in model_ids:
+            try:
+                if self.get(model_id) is not None:
+                    logger.info(f"Prewarmed model {model_id}")
+                    loaded.append(model_id)
+                else:
+                    logger.warning(f"Cannot prewarm {model_id}: no trained model found")
+            except Exception as e:
+                logger.error(f"Failed to prewarm model {model_id}: {str(e)}")
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.shared_loads
+            return {
+                "loaded_models": len(self._loaded),
+                "loaded_bytes": self._loaded_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_loads": self.shared_loads,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.shared_loads) / lookups, 4) if lookups else 0.0
+            }
+
+    def resolve_path(self, model_id: str) -> Optional[str]:
+        """
+        Map a job id or artifact path to an artifact inside MODEL_CACHE_DIR.
+
+        ``model_id`` may be a training job id or the ``modelPath`` reported by
+        /job_status; paths outside the model directory are rejected.
+        """
+        model_root = self.model_dir.resolve()
+        candidates = [Path(model_id), model_root / model_id / ARTIFACT_NAME]
+
+        for candidate in candidates:
+            try:
+                resolved = candidate.resolve()
+            except (OSError, RuntimeError):
+                continue
+            if resolved.is_file() and model_root in resolved.parents:
+                return str(resolved)
+        return None
+
+    def _index_entry(self, artifact: Path) -> Optional[Dict[str, Any]]:
+        try:
+            stat = artifact.stat()
+        except OSError:
+            return None
+
+        version = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+        path = str(artifact.resolve())
+        cached = self._index.get(path)
+        if cached is not None and cached["version"] == version:
+            entry = dict(cached)
+        else:
+            entry = self._read_entry(artifact, path, version, stat.st_size)
+            self._index[path] = entry
+            entry = dict(entry)
+
+        with self._lock:
+            entry["loaded"] = (path, version) in self._loaded
+        return entry
+
+    def _read_entry(self, artifact: Path, path: str, version: str, size: int) -> Dict[str, Any]:
+        try:
+            metadata = read_metadata(str(artifact))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable model artifact {artifact}: {str(e)}")
+            metadata = {}
+
+        fidelity = metadata.get("fidelity") or {}
+        metrics = {
+            name: fidelity[key]
+            for name, key in (("fidelity", "score"), ("column_fidelity", "columnScore"), ("correlation_fidelity", "correlationScore"))
+            if isinstance(fidelity.get(key), (int, float))
+        }
+        # Older artifacts carry placeholder accuracy and loss values instead.
+        if not fidelity:
+            metrics = {
+                name: metadata[name]
+                for name in ("accuracy", "loss")
+                if isinstance(metadata.get(name), (int, float))
+            }
+
+        return {
+            "model_id": artifact.parent.name,
+            "model_type": metadata.get("modelType", "unknown"),
+            "synthesizer": metadata.get("synthesizer"),
+            "version": version,
+            "size_bytes": size,
+            "columns": metadata.get("columns", []),
+            "column_types": metadata.get("columnTypes", {}),
+            "created_at": metadata.get("trainedAt", ""),
+            "metrics": metrics or None,
+            "fidelity": metadata.get("fidelity"),
+            "status": "trained",
+            "path": path,
+        }
+
+    def _load(self, artifact_path: str):
+        logger.info(f"Loading model artifact {artifact_path}")
+        params, _ = load_artifact(artifact_path)
+
+        # Artifacts written before preprocessing was persisted hold the synthesizer at the top level.
+        synthesizer_params = params.get("synthesizer", params)
+        if synthesizer_params.get("modelType", GaussianCopulaSynthesizer.model_type) == "ctgan":
+            # torch is only imported when a GAN model is actually served.
+            from app.services.ctgan import CTGANSynthesizer
+            synthesizer = CTGANSynthesizer.from_dict(synthesizer_params)
+        else:
+            synthesizer = GaussianCopulaSynthesizer.from_dict(synthesizer_params)
+
+        pipeline = None
+        if "preprocessing" in params:
+            pipeline = PreprocessingPipeline.from_dict(params["preprocessing"])
+        profile = FidelityProfile.from_dict(params["fidelity"]) if "fidelity" in params else None
+        return TrainedModel(synthesizer, pipeline, profile)
+
+    def _store(self, key: tuple, model: TrainedModel, size: int):
+        """Insert a loaded model and evict least recently used ones over budget. Caller holds the lock."""
+        if size > self.max_bytes:
+            logger.warning(f"Model {key[0]} ({size} bytes) exceeds the registry budget; not caching it")
+            return
+
+        # A newer version replaces any older one for the same artifact.
+        for stale in [k for k in self._loaded if k[0] == key[0]]:
+            self._loaded_bytes -= self._loaded.pop(stale)["size"]
+
+        self._loaded[key] = {"model": model, "size": size}
+        self._loaded_bytes += size
+
+        while self._loaded_bytes > self.max_bytes:
+            evicted_key, evicted = self._loaded.popitem(last=False)
+            self._loaded_bytes -= evicted["size"]
+            self.evictions += 1
+            logger.info(f"Evicted model {evicted_key[0]} from the registry")
+
+
+model_registry_service = ModelRegistryService(
+    model_dir=settings.MODEL_CACHE_DIR,
+    max_bytes=settings.MODEL_REGISTRY_MAX_BYTES,
+    prewarm_ids=settings.MODEL_REGISTRY_PREWARM
+)
@@ -2,6 +2,9 @@ import uuid
 from typing import Dict, Any, Optional
 from datetime import datetime
 from app.core.logger import logger
+from app.services.dataset_ingestion import dataset_ingestion_service
+from app.services.preprocessing import PreprocessingPipeline
+from app.services.hyperparameter_search import hyperparameter_search_service
 
 
 class ModelTrainerService:
@@ -14,7 +17,9 @@ class ModelTrainerService:
         model_type: str,
         dataset_config: Optional[Dict[str, Any]] = None,
         hyperparameters: Optional[Dict[str, Any]] = None,
-        epochs: int = 10
+        epochs: int = 10,
+        dataset_path: Optional[str] = None,
+        search: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         task_id = str(uuid.uuid4())
         model_id = str(uuid.uuid4())
@@ -22,12 +27,21 @@ class ModelTrainerService:
         try:
             logger.info(f"Starting model training for type: {model_type}")
 
-            training_result = self._simulate_training(
-                model_type,
-                dataset_config,
-                hyperparameters,
-                epochs
-            )
+            if search is not None:
+                training_result = self._run_search(
+                    model_type,
+                    dataset_path,
+                    hyperparameters,
+                    epochs,
+                    search
+                )
+            else:
+                training_result = self._simulate_training(
+                    model_type,
+                    dataset_config,
+                    hyperparameters,
+                    epochs
+                )
 
             model_info = {
                 "model_id": model_id,
@@ -35,8 +49,9 @@ class ModelTrainerService:
                 "created_at": datetime.utcnow().isoformat(),
                 "metrics": training_result["metrics"],
                 "status": "trained",
-                "hyperparameters": hyperparameters or {},
-                "epochs": epochs
+                "hyperparameters": training_result.get("hyperparameters", hyperparameters or {}),
+                "epochs": epochs,
+                "trials": training_result.get("trials")
             }
 
             self.models[model_id] = model_info
@@ -63,6 +78,45 @@ class ModelTrainerService:
             self.tasks[task_id] = error_result
             raise
 
+    def _run_search(
+        self,
+        model_type: str,
+        dataset_path: Optional[str],
+        hyperparameters: Optional[Dict[str, Any]],
+        epochs: int,
+        search: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if not dataset_path:
+            raise ValueError("Hyperparameter search requires dataset_path")
+
+        dataset = dataset_ingestion_service.ingest(dataset_path)
+        df = dataset.to_pandas()
+        column_types = dataset.column_types
+        PreprocessingPipeline().fit(df, column_types).transform(df)
+
+        base_params = dict(hyperparameters or {})
+        if "gan" in model_type.lower():
+            base_params.setdefault("epochs", epochs)
+
+        result = hyperparameter_search_service.search(model_type, df, column_types, search, base_params)
+        trials = result["trials"]
+        best = result["best"]
+
+        metrics = {
+            "score": best["score"],
+            "trials": len(trials),
+            "pruned_trials": sum(1 for trial in trials if trial["status"] == "pruned"),
+            "failed_trials": sum(1 for trial in trials if trial["status"] == "failed"),
+            "search_seconds": result["elapsedSeconds"]
+        }
+
+        return {
+            "status": "success",
+            "metrics": metrics,
+            "hyperparameters": best["hyperparameters"],
+            "trials": trials
+        }
+
     def _simulate_training(
         self,
         model_type: str,
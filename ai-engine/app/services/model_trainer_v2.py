@@ -1,25 +1,41 @@
 import uuid
-import threading
 import time
+import functools
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Iterable, Optional, Union
 from datetime import datetime
 from app.core.logger import logger
 from app.core.config import settings
+from app.core import metrics
+from app.services.dataset_ingestion import ChunkedDataset, dataset_ingestion_service
+from app.services.type_inference import type_inference_service
+from app.services.dataframe_compactor import dataframe_compactor
+from app.services.preprocessing import PreprocessingPipeline
+from app.services.gaussian_copula import GaussianCopulaSynthesizer
+from app.services.model_artifact import ARTIFACT_NAME, save_artifact
+from app.services.model_registry import TrainedModel
+from app.services.fidelity import FidelityProfile
+from app.services.task_scheduler import CancellationToken, TaskCancelled, task_scheduler
+from app.services.training_worker import run_training_process
+from app.services.task_profiler import task_profiler
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
 
 
 class ModelTrainerV2Service:
-    def __init__(self):
+    def __init__(self, on_update: Optional[Callable[[str, Dict[str, Any]], None]] = None):
         self.tasks = {}
-        self.training_threads = {}
+        # Worker processes report task updates to their parent instead of a local table.
+        self.on_update = on_update
 
     def start_training(
         self,
         job_id: str,
         file_path: str,
-        model_config: Dict[str, Any]
+        model_config: Dict[str, Any],
+        sheet_name: Optional[str] = None
     ) -> Dict[str, str]:
         task_id = str(uuid.uuid4())
 
@@ -28,18 +44,19 @@ class ModelTrainerV2Service:
             "status": "queued",
             "progress": 0,
             "filePath": file_path,
+            "sheetName": sheet_name,
             "modelConfig": model_config,
+            "priority": model_config.get("priority") or 0,
+            "preemptions": 0,
             "createdAt": datetime.utcnow().isoformat(),
         }
 
-        thread = threading.Thread(
-            target=self._train_model_background,
-            args=(task_id, job_id, file_path, model_config)
+        task_scheduler.submit(
+            task_id,
+            functools.partial(self._train_model_background, task_id, job_id, file_path, model_config, sheet_name),
+            priority=model_config.get("priority") or 0,
+            on_cancel=functools.partial(self._on_cancel, task_id)
         )
-        thread.daemon = True
-        thread.start()
-
-        self.training_threads[task_id] = thread
 
         logger.info(f"Training task {task_id} queued for job {job_id}")
 
@@ -50,31 +67,29 @@ class ModelTrainerV2Service:
         task_id: str,
         job_id: str,
         file_path: str,
-        model_config: Dict[str, Any]
+        model_config: Dict[str, Any],
+        sheet_name: Optional[str] = None,
+        token: Optional[CancellationToken] = None
     ):
+        token = token or CancellationToken()
+        started = time.perf_counter()
         try:
             self._update_task(task_id, {"status": "training", "progress": 5})
 
-            logger.info(f"Loading dataset for task {task_id}")
-            df = self._load_dataset(file_path)
-            self._update_task(task_id, {"progress": 15})
-
-            logger.info(f"Preprocessing data for task {task_id}")
-            processed_data = self._preprocess_data(df)
-            self._update_task(task_id, {"progress": 30})
-
-            model_type = model_config.get("modelType", "sdv")
-            epochs = model_config.get("epochs", 10)
-
-            logger.info(f"Training {model_type} model for task {task_id}")
-            model_path = self._train_model(
-                task_id,
-                job_id,
-                processed_data,
-                model_type,
-                epochs
+            isolated = model_config.get("isolated")
+            if isolated if isolated is not None else settings.TRAINING_WORKER_PROCESSES:
+                # A profiled job is profiled inside the worker, not here.
+                model_path = run_training_process(
+                    task_id, job_id, file_path, model_config, sheet_name, token,
+                    on_update=functools.partial(self._update_task, task_id)
+                )
+            else:
+                with task_profiler.capture(task_id, "training", enabled=bool(model_config.get("profile"))):
+                    model_path = self.run_training(task_id, job_id, file_path, model_config, sheet_name, token)
+
+            metrics.TRAINING_SECONDS.labels(synthesizer=model_config.get("modelType") or "sdv").observe(
+                time.perf_counter() - started
             )
-
             self._update_task(task_id, {
                 "status": "completed",
                 "progress": 100,
@@ -84,6 +99,10 @@ class ModelTrainerV2Service:
 
             logger.info(f"Training completed successfully for task {task_id}")
 
+        except TaskCancelled as e:
+            if not e.preempted:
+                self._remove_partial_model(job_id)
+            raise
         except Exception as e:
             logger.error(f"Training failed for task {task_id}: {str(e)}")
             self._update_task(task_id, {
@@ -92,72 +111,159 @@ class ModelTrainerV2Service:
                 "failedAt": datetime.utcnow().isoformat()
             })
 
-    def _load_dataset(self, file_path: str) -> pd.DataFrame:
-        file_path_obj = Path(file_path)
-
-        if not file_path_obj.exists():
-            raise FileNotFoundError(f"File does not exist: {file_path}")
-
-        if file_path_obj.suffix.lower() == '.csv':
-            return pd.read_csv(file_path)
-        elif file_path_obj.suffix.lower() in ['.xlsx', '.xls']:
-            return pd.read_excel(file_path)
+    def run_training(
+        self,
+        task_id: str,
+        job_id: str,
+        file_path: str,
+        model_config: Dict[str, Any],
+        sheet_name: Optional[str] = None,
+        token: Optional[CancellationToken] = None
+    ) -> str:
+        """Load the dataset, train and save the model; runs in-process or inside a training worker."""
+        token = token or CancellationToken()
+
+        streaming = model_config.get("streaming")
+        if streaming if streaming is not None else settings.STREAMING_TRAINING:
+            logger.info(f"Streaming dataset for task {task_id} in chunks of {settings.TRAINING_CHUNK_ROWS} rows")
+            chunks = dataset_ingestion_service.open_chunks(file_path, settings.TRAINING_CHUNK_ROWS, sheet_name)
+            training_data, column_types, memory_report = token.checked(chunks), chunks.column_types, None
         else:
-            raise ValueError(f"Unsupported file format: {file_path_obj.suffix}")
+            training_data, column_types, memory_report = self._load_training_frame(
+                task_id, file_path, model_config, sheet_name
+            )
 
-    def _preprocess_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        processed = df.copy()
+        token.check()
 
-        for col in processed.columns:
-            if processed[col].dtype == 'object':
-                try:
-                    processed[col] = pd.to_datetime(processed[col])
-                except:
-                    pass
+        model_type = model_config.get("modelType") or "sdv"
 
-        numeric_cols = processed.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            if processed[col].isnull().sum() > 0:
-                processed[col].fillna(processed[col].median(), inplace=True)
+        logger.info(f"Training {model_type} model for task {task_id}")
+        return self._train_model(
+            task_id,
+            job_id,
+            training_data,
+            model_config,
+            memory_report,
+            column_types,
+            token
+        )
 
-        categorical_cols = processed.select_dtypes(include=['object']).columns
-        for col in categorical_cols:
-            if processed[col].isnull().sum() > 0:
-                processed[col].fillna(processed[col].mode()[0] if not processed[col].mode().empty else 'Unknown', inplace=True)
+    def _load_training_frame(
+        self,
+        task_id: str,
+        file_path: str,
+        model_config: Dict[str, Any],
+        sheet_name: Optional[str] = None
+    ):
+        logger.info(f"Loading dataset for task {task_id}")
+        dataset = dataset_ingestion_service.ingest(file_path, sheet_name)
+
+        memory_report = None
+        compact = model_config.get("compactMemory")
+        if compact if compact is not None else settings.COMPACT_DATAFRAMES:
+            df, memory_report = dataframe_compactor.compact_table(dataset.table, dataset.column_types)
+            logger.info(
+                f"Task {task_id}: compacted dataset from {memory_report['bytesBefore']} "
+                f"to {memory_report['bytesAfter']} bytes"
+            )
+        else:
+            df = dataset.to_pandas()
+        self._update_task(task_id, {"progress": 15, "memoryReport": memory_report})
 
-        return processed
+        return df, dataset.column_types, memory_report
+
+    def _preprocess_data(
+        self,
+        data: Union[pd.DataFrame, ChunkedDataset],
+        column_types: Optional[Dict[str, str]] = None
+    ):
+        """
+        Fit the preprocessing pipeline and apply it to the training data.
+
+        In-memory frames are imputed in place, since the frame is owned by the
+        training task, and returned as a single chunk; streamed datasets are
+        wrapped so each chunk is imputed as it is read.
+
+        Returns:
+            The training chunks, the fitted pipeline and the column types
+        """
+        if isinstance(data, pd.DataFrame):
+            # Datasets from the ingestion layer are already converted; anything
+            # else goes through the same sample-probed inference.
+            if not column_types:
+                column_types = type_inference_service.infer_and_apply(data)
+            pipeline = PreprocessingPipeline().fit(data, column_types)
+            return [pipeline.transform(data)], pipeline, column_types
+
+        pipeline = PreprocessingPipeline().fit_chunks(data, column_types)
+        return pipeline.transform_chunks(data), pipeline, column_types
 
     def _train_model(
         self,
         task_id: str,
         job_id: str,
-        data: pd.DataFrame,
-        model_type: str,
-        epochs: int
+        data: Union[pd.DataFrame, ChunkedDataset],
+        model_config: Dict[str, Any],
+        memory_report: Optional[Dict[str, Any]] = None,
+        column_types: Optional[Dict[str, str]] = None,
+        token: Optional[CancellationToken] = None
     ) -> str:
+        token = token or CancellationToken()
         model_dir = Path(settings.MODEL_CACHE_DIR) / job_id
         model_dir.mkdir(parents=True, exist_ok=True)
 
-        progress_step = (70 - 30) / epochs
+        model_type = model_config.get("modelType") or "sdv"
+        epochs = model_config.get("epochs") or 10
+
+        if isinstance(data, pd.DataFrame) and not column_types:
+            column_types = type_inference_service.infer_and_apply(data)
 
-        for epoch in range(epochs):
-            time.sleep(2)
+        # Profile the raw data before preprocessing imputes it in place.
+        profile = None
+        if settings.FIDELITY_EVALUATION:
+            logger.info(f"Profiling training data for task {task_id}")
+            profile = FidelityProfile().fit_chunks([data] if isinstance(data, pd.DataFrame) else data, column_types)
+            token.check()
+            self._update_task(task_id, {"progress": 20})
 
-            current_progress = 30 + (epoch + 1) * progress_step
-            self._update_task(task_id, {"progress": int(current_progress)})
+        logger.info(f"Preprocessing data for task {task_id}")
+        chunks, pipeline, column_types = self._preprocess_data(data, column_types)
+        token.check()
+        self._update_task(task_id, {"progress": 30})
 
-            logger.info(f"Task {task_id}: Epoch {epoch + 1}/{epochs} completed")
+        fit_started = time.time()
+        if model_type == "gan":
+            synthesizer = self._fit_gan(task_id, chunks, model_config, column_types, model_dir, token)
+        else:
+            if model_type != "sdv":
+                logger.warning(f"Task {task_id}: unknown model type '{model_type}', fitting a Gaussian copula")
+            synthesizer = GaussianCopulaSynthesizer().fit_chunks(chunks, column_types)
+        token.check()
+        self._update_task(task_id, {"progress": 70})
+
+        logger.info(f"Task {task_id}: {synthesizer.model_type} fitted in {time.time() - fit_started:.2f}s")
+
+        fidelity = None
+        if profile is not None:
+            num_rows = min(synthesizer.num_rows_fit, settings.FIDELITY_SAMPLE_ROWS)
+            synthetic = TrainedModel(synthesizer, pipeline).sample(num_rows, np.random.default_rng(0))
+            fidelity = profile.evaluate(synthetic)
+            logger.info(f"Task {task_id}: fidelity score {fidelity['score']} on {num_rows} sampled rows")
+            token.check()
+            self._update_task(task_id, {"progress": 80, "fidelity": fidelity})
 
         model_metadata = {
             "jobId": job_id,
             "taskId": task_id,
             "modelType": model_type,
             "epochs": epochs,
-            "dataShape": data.shape,
-            "columns": list(data.columns),
+            "dataShape": [synthesizer.num_rows_fit, len(synthesizer.column_names)],
+            "columns": synthesizer.column_names,
+            "columnTypes": column_types,
+            "synthesizer": synthesizer.model_type,
             "trainedAt": datetime.utcnow().isoformat(),
-            "accuracy": round(np.random.uniform(0.75, 0.95), 4),
-            "loss": round(np.random.uniform(0.05, 0.25), 4),
+            "fidelity": fidelity,
+            "memory": memory_report,
         }
 
         metadata_path = model_dir / "metadata.json"
@@ -165,17 +271,99 @@ class ModelTrainerV2Service:
         with open(metadata_path, 'w') as f:
             json.dump(model_metadata, f, indent=2)
 
-        model_path = str(model_dir / "model.pkl")
-
-        import pickle
-        with open(model_path, 'wb') as f:
-            pickle.dump({"model_type": model_type, "metadata": model_metadata}, f)
+        model_path = str(model_dir / ARTIFACT_NAME)
+        params = {"synthesizer": synthesizer.to_dict(), "preprocessing": pipeline.to_dict()}
+        if profile is not None:
+            params["fidelity"] = profile.to_dict()
+        save_artifact(model_path, params, metadata=model_metadata)
 
         logger.info(f"Model saved to {model_path}")
 
         return model_path
 
+    def _fit_gan(
+        self,
+        task_id: str,
+        chunks: Iterable[pd.DataFrame],
+        model_config: Dict[str, Any],
+        column_types: Optional[Dict[str, str]],
+        model_dir: Path,
+        token: Optional[CancellationToken] = None
+    ):
+        """
+        Train the CTGAN synthesizer, mapping batch progress onto 30-70%.
+
+        A per-epoch checkpoint lives in the model directory so a retried job
+        continues from its last finished epoch; it is removed once training
+        completes. Cancellation is checked after every batch; a preempted job
+        keeps its checkpoint and resumes from it when it runs again.
+        """
+        from app.services.ctgan import CTGANSynthesizer
+
+        checkpoint_path = model_dir / "checkpoint.pt"
+        if not model_config.get("resume", True) and checkpoint_path.exists():
+            checkpoint_path.unlink()
+
+        synthesizer = CTGANSynthesizer(
+            epochs=model_config.get("epochs") or 10,
+            batch_size=model_config.get("batchSize") or 32,
+            threads=model_config.get("threads") or settings.TRAINING_THREADS or None
+        )
+
+        def on_progress(batches_done: int, total_batches: int, epoch: int):
+            self._update_task(task_id, {"progress": 30 + int(40 * batches_done / total_batches)})
+            if token is not None:
+                token.check()
+
+        synthesizer.fit_chunks(
+            chunks,
+            column_types,
+            checkpoint_path=str(checkpoint_path),
+            on_progress=on_progress
+        )
+
+        checkpoint_path.unlink(missing_ok=True)
+        return synthesizer
+
+    def cancel_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Request cancellation of a queued or running training task.
+
+        Queued tasks are cancelled at once; running ones are marked
+        ``cancelling`` and stop at their next chunk or batch boundary.
+
+        Returns:
+            The task's state, or None for an unknown task
+        """
+        task = self.tasks.get(task_id)
+        if task is None or task["status"] in TERMINAL_STATUSES:
+            return task
+
+        if task["status"] != "queued":
+            self._update_task(task_id, {"status": "cancelling"})
+        task_scheduler.cancel(task_id)
+        return task
+
+    def _on_cancel(self, task_id: str, reason: str):
+        task = self.tasks.get(task_id, {})
+        if reason == "preempted":
+            self._update_task(task_id, {"status": "queued", "progress": 0, "preemptions": task.get("preemptions", 0) + 1})
+        else:
+            self._update_task(task_id, {"status": "cancelled", "cancelledAt": datetime.utcnow().isoformat()})
+
+    def _remove_partial_model(self, job_id: str):
+        """Delete a cancelled job's checkpoint, and its model directory if nothing else is in it."""
+        model_dir = Path(settings.MODEL_CACHE_DIR) / job_id
+        for name in ("checkpoint.pt", "checkpoint.pt.tmp"):
+            (model_dir / name).unlink(missing_ok=True)
+        try:
+            model_dir.rmdir()
+        except OSError:
+            pass
+
     def _update_task(self, task_id: str, updates: Dict[str, Any]):
+        if self.on_update is not None:
+            self.on_update(task_id, updates)
         if task_id in self.tasks:
             self.tasks[task_id].update(updates)
 
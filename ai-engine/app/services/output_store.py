@@ -0,0 +1,264 @@
+import os
+import time
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional
+from app.core.logger import logger
+from app.core.config import settings
+from app.core import metrics
+
+
+class OutputStoreFull(Exception):
+    """Raised when a job's output cannot fit the quota or the disk, even after eviction."""
+
+
+def _disk_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(entry.stat().st_size for entry in path.rglob("*") if entry.is_file())
+    return path.stat().st_size
+
+
+def _delete(path: Path):
+    if path.is_dir():
+        try:
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            pass
+    else:
+        path.unlink(missing_ok=True)
+
+
+class OutputStoreService:
+    """
+    Managed directory for generated files and partitioned datasets.
+
+    Jobs reserve their estimated output size before they start, so a job
+    that cannot fit is refused up front instead of failing on ENOSPC
+    halfway through. A reservation must fit both the byte quota and the
+    free space on the volume (keeping ``min_free_bytes`` spare). If it does
+    not, artifacts that have already been uploaded are evicted, least
+    recently used first, until it does.
+
+    Artifacts that are not uploaded yet are never evicted. Neither is any
+    file with an open reference, such as a stream being hashed or
+    uploaded. Uploaded artifacts older than ``max_age_seconds`` are removed
+    on the next reservation. Files found on disk at startup belong to
+    tasks from an earlier run, so they count as uploaded. An artifact may be
+    a directory (a partitioned dataset); it is sized, kept and evicted as a
+    whole.
+    """
+
+    def __init__(self, root: str, max_bytes: int, min_free_bytes: int, max_age_seconds: float):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.min_free_bytes = min_free_bytes
+        self.max_age_seconds = max_age_seconds
+
+        self._lock = threading.Lock()
+        # name -> {"size", "uploaded", "refs", "lastUsed"}, least recently used first
+        self._artifacts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._reservations: Dict[str, int] = {}
+        self._used_bytes = 0
+        self._scanned = False
+
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.rejections = 0
+
+    def path_for(self, name: str) -> Path:
+        """Where a new artifact called ``name`` should be written."""
+        with self._lock:
+            self._scan()
+        return self.root / name
+
+    def reserve(self, key: str, nbytes: int):
+        """
+        Hold ``nbytes`` of space for the job ``key`` until its artifact is added or the reservation released.
+
+        Raises:
+            OutputStoreFull: If the space cannot be freed
+        """
+        with self._lock:
+            self._scan()
+            # Each reservation retries deletes that failed before, at most once per artifact.
+            for artifact in self._artifacts.values():
+                artifact.pop("undeletable", None)
+            self._evict_expired()
+            self._reservations.pop(key, None)
+            # Refuse before evicting anything if even evicting everything would not make room.
+            if not self._fits(nbytes, self._evictable_bytes()):
+                self.rejections += 1
+                raise OutputStoreFull(self._shortfall_message(nbytes))
+            while not self._fits(nbytes):
+                victim = self._next_victim()
+                if victim is None:
+                    # Deletes failed, or the disk filled up for another reason since the check above.
+                    self.rejections += 1
+                    raise OutputStoreFull(self._shortfall_message(nbytes))
+                self._evict(victim, "quota")
+            self._reservations[key] = nbytes
+        logger.info(f"Reserved {nbytes} bytes of output space for {key}")
+
+    def release(self, key: str):
+        with self._lock:
+            self._reservations.pop(key, None)
+
+    def add(self, path: str, key: Optional[str] = None):
+        """Register a written artifact, replacing the reservation held for it."""
+        path = Path(path)
+        size = _disk_size(path)
+        with self._lock:
+            self._scan()
+            if key is not None:
+                self._reservations.pop(key, None)
+            previous = self._artifacts.pop(path.name, None)
+            if previous is not None:
+                self._used_bytes -= previous["size"]
+            self._artifacts[path.name] = {"size": size, "uploaded": False, "refs": 0, "lastUsed": time.time()}
+            self._used_bytes += size
+
+    def mark_uploaded(self, path: str):
+        """Allow eviction of an artifact now that a remote copy exists."""
+        with self._lock:
+            artifact = self._artifacts.get(Path(path).name)
+            if artifact is not None:
+                artifact["uploaded"] = True
+
+    def remove(self, path: str, key: Optional[str] = None):
+        """Delete an artifact (for example a cancelled job's partial output) and release its reservation."""
+        path = Path(path)
+        with self._lock:
+            if key is not None:
+                self._reservations.pop(key, None)
+            artifact = self._artifacts.pop(path.name, None)
+            if artifact is not None:
+                self._used_bytes -= artifact["size"]
+        try:
+            _delete(path)
+        except OSError as e:
+            logger.warning(f"Could not delete output {path.name}: {str(e)}")
+
+    @contextmanager
+    def reference(self, path: str):
+        """Keep an artifact from being evicted while the ``with`` block reads it."""
+        name = Path(path).name
+        with self._lock:
+            artifact = self._artifacts.get(name)
+            if artifact is not None:
+                artifact["refs"] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                artifact = self._artifacts.get(name)
+                if artifact is not None:
+                    artifact["refs"] -= 1
+                    artifact["lastUsed"] = time.time()
+                    self._artifacts.move_to_end(name)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._scan()
+            return {
+                "directory": str(self.root),
+                "artifacts": len(self._artifacts),
+                "usedBytes": self._used_bytes,
+                "reservedBytes": sum(self._reservations.values()),
+                "reservations": len(self._reservations),
+                "maxBytes": self.max_bytes,
+                "freeDiskBytes": shutil.disk_usage(self.root).free,
+                "minFreeBytes": self.min_free_bytes,
+                "evictions": self.evictions,
+                "evictedBytes": self.evicted_bytes,
+                "rejections": self.rejections,
+            }
+
+    def used_bytes(self) -> int:
+        return self._used_bytes
+
+    def reserved_bytes(self) -> int:
+        with self._lock:
+            return sum(self._reservations.values())
+
+    def _fits(self, nbytes: int, evictable: int = 0) -> bool:
+        reserved = sum(self._reservations.values())
+        if self.max_bytes and self._used_bytes - evictable + reserved + nbytes > self.max_bytes:
+            return False
+        free = shutil.disk_usage(self.root).free + evictable
+        return free - reserved - nbytes >= self.min_free_bytes
+
+    def _evictable_bytes(self) -> int:
+        return sum(artifact["size"] for artifact in self._artifacts.values() if self._evictable(artifact))
+
+    def _shortfall_message(self, nbytes: int) -> str:
+        reserved = sum(self._reservations.values())
+        free = shutil.disk_usage(self.root).free
+        quota = f" of a {self.max_bytes}-byte quota" if self.max_bytes else ""
+        return (
+            f"Not enough output space: need {nbytes} bytes, {self._used_bytes} bytes used{quota}, "
+            f"{reserved} bytes reserved by running jobs and {free} bytes free on disk"
+        )
+
+    def _next_victim(self) -> Optional[str]:
+        for name, artifact in self._artifacts.items():
+            if self._evictable(artifact):
+                return name
+        return None
+
+    def _evictable(self, artifact: Dict[str, Any]) -> bool:
+        return artifact["uploaded"] and artifact["refs"] == 0 and not artifact.get("undeletable")
+
+    def _evict_expired(self):
+        if not self.max_age_seconds:
+            return
+        cutoff = time.time() - self.max_age_seconds
+        expired = [
+            name for name, artifact in self._artifacts.items()
+            if self._evictable(artifact) and artifact["lastUsed"] < cutoff
+        ]
+        for name in expired:
+            self._evict(name, "age")
+
+    def _evict(self, name: str, reason: str):
+        artifact = self._artifacts[name]
+        try:
+            _delete(self.root / name)
+        except OSError as e:
+            # Still on disk, so keep counting it, but stop picking it as a victim.
+            artifact["undeletable"] = True
+            logger.warning(f"Could not delete evicted output {name}: {str(e)}")
+            return
+        del self._artifacts[name]
+        self._used_bytes -= artifact["size"]
+        self.evictions += 1
+        self.evicted_bytes += artifact["size"]
+        metrics.OUTPUT_STORE_EVICTIONS.labels(reason=reason).inc()
+        logger.info(f"Evicted output {name} ({artifact['size']} bytes, {reason})")
+
+    def _scan(self):
+        # Index files left by an earlier run the first time the store is used.
+        if self._scanned:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.root):
+            if entry.is_file() or entry.is_dir():
+                path = Path(entry.path)
+                found.append((entry.stat().st_mtime, entry.name, _disk_size(path)))
+        for mtime, name, size in sorted(found):
+            self._artifacts[name] = {"size": size, "uploaded": True, "refs": 0, "lastUsed": mtime}
+            self._used_bytes += size
+        self._scanned = True
+        if found:
+            logger.info(f"Output store indexed {len(found)} existing outputs in {self.root}")
+
+
+output_store = OutputStoreService(
+    root=settings.OUTPUT_STORE_DIR or str(Path(settings.DATA_OUTPUT_DIR) / "generated"),
+    max_bytes=settings.OUTPUT_STORE_MAX_BYTES,
+    min_free_bytes=settings.OUTPUT_STORE_MIN_FREE_BYTES,
+    max_age_seconds=settings.OUTPUT_STORE_MAX_AGE_HOURS * 3600
+)
@@ -0,0 +1,181 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+from urllib.parse import quote
+import numpy as np
+import pandas as pd
+from app.core.logger import logger
+from app.core.config import settings
+from app.core import metrics
+from app.services.storage_service import storage_service
+from app.services.task_scheduler import CancellationToken
+
+MANIFEST_NAME = "_manifest.json"
+# Hive's directory name for rows whose partition value is null.
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+# A partition column with more distinct values than this is almost certainly a mistake (an id, a float).
+MAX_PARTITION_VALUES = 1000
+
+
+class PartitionedWriter:
+    """
+    Writes a generated frame as a dataset of part files plus a manifest.
+
+    The rows are split into ``partitions`` contiguous ranges, one part per
+    range, and the parts are written by a pool of writer threads. With a
+    ``partition_by`` column each range is further split by that column's
+    value into Hive-style directories (``region=North/part-00003.parquet``);
+    the column itself is then carried by the path, not the file, as Hive
+    readers such as ``pyarrow.dataset`` expect.
+
+    Each part is hashed and uploaded as soon as it is written, so uploads
+    overlap the remaining writes. ``_manifest.json`` lists every part's
+    path, row count, byte size, SHA-256 digest and storage link, so
+    consumers can fetch and read the parts in parallel.
+
+    PyArrow releases the GIL while encoding Parquet, so Parquet parts are
+    written truly concurrently; pandas' CSV encoder holds it, so CSV parts
+    only overlap their hashing and uploads.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+
+    def write(
+        self,
+        data: pd.DataFrame,
+        directory: Path,
+        output_format: str,
+        partitions: int,
+        write_part: Callable[[pd.DataFrame, Path, str], None],
+        partition_by: Optional[str] = None,
+        token: Optional[CancellationToken] = None,
+        storage_type: str = "ipfs"
+    ) -> Dict[str, Any]:
+        """
+        Write ``data`` under ``directory`` and upload it part by part.
+
+        Args:
+            data: The generated rows
+            directory: Dataset directory to create; parts are written below it
+            output_format: csv or parquet
+            partitions: Number of row ranges (and writer tasks) to split the rows into
+            write_part: Serializes one frame to a path in ``output_format``
+            partition_by: Column to Hive-partition each range by
+            token: Checked before each part, so a cancelled task stops writing
+            storage_type: Where to upload the parts and the manifest
+
+        Returns:
+            The manifest; its ``storageLink`` points at the uploaded manifest
+
+        Raises:
+            ValueError: If ``partition_by`` is not a column or has too many distinct values
+        """
+        token = token or CancellationToken()
+        if partition_by is not None:
+            if partition_by not in data.columns:
+                raise ValueError(f"Cannot partition by unknown column '{partition_by}'")
+            distinct = data[partition_by].nunique(dropna=False)
+            if distinct > MAX_PARTITION_VALUES:
+                raise ValueError(
+                    f"Column '{partition_by}' has {distinct} distinct values; "
+                    f"partition by a column with at most {MAX_PARTITION_VALUES}"
+                )
+
+        if output_format == "parquet":
+            # PyArrow sets up its pandas support lazily, and a thread that races the first call
+            # sees it half-initialized and fails; do it here, before the writers start.
+            import pyarrow
+            pyarrow.Schema.from_pandas(data.iloc[:0], preserve_index=False)
+
+        directory.mkdir(parents=True, exist_ok=True)
+        partitions = max(1, min(partitions, len(data)))
+        bounds = np.linspace(0, len(data), partitions + 1).astype(int)
+        workers = min(self.max_workers, partitions)
+        logger.info(f"Writing {len(data)} rows as {partitions} {output_format} parts with {workers} writers")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="part-writer") as pool:
+            futures = [
+                pool.submit(
+                    self._write_range, data.iloc[bounds[index]:bounds[index + 1]], index, directory,
+                    output_format, write_part, partition_by, token, storage_type
+                )
+                for index in range(partitions)
+            ]
+            try:
+                parts = [part for future in futures for part in future.result()]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        manifest = {
+            "format": output_format,
+            "totalRows": int(len(data)),
+            "totalBytes": sum(part["bytes"] for part in parts),
+            "columns": [column for column in data.columns if column != partition_by],
+            "partitionBy": [partition_by] if partition_by else [],
+            "parts": sorted(parts, key=lambda part: part["path"]),
+            "createdAt": datetime.utcnow().isoformat(),
+        }
+        manifest_path = directory / MANIFEST_NAME
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+        manifest["storageLink"] = storage_service.upload_file(str(manifest_path), storage_type=storage_type)
+        return manifest
+
+    def _write_range(
+        self,
+        rows: pd.DataFrame,
+        index: int,
+        directory: Path,
+        output_format: str,
+        write_part: Callable[[pd.DataFrame, Path, str], None],
+        partition_by: Optional[str],
+        token: CancellationToken,
+        storage_type: str
+    ) -> List[Dict[str, Any]]:
+        token.check()
+        name = f"part-{index:05d}.{output_format}"
+        if partition_by is None:
+            return [self._write_part(rows, directory, name, {}, output_format, write_part, storage_type)]
+
+        parts = []
+        for value, group in rows.groupby(partition_by, sort=True, dropna=False, observed=True):
+            token.check()
+            value = None if pd.isna(value) else value
+            segment = f"{partition_by}={NULL_PARTITION if value is None else quote(str(value), safe='')}"
+            parts.append(self._write_part(
+                group.drop(columns=[partition_by]), directory, f"{segment}/{name}",
+                {partition_by: None if value is None else str(value)}, output_format, write_part, storage_type
+            ))
+        return parts
+
+    def _write_part(
+        self,
+        frame: pd.DataFrame,
+        directory: Path,
+        relative_path: str,
+        partition: Dict[str, Optional[str]],
+        output_format: str,
+        write_part: Callable[[pd.DataFrame, Path, str], None],
+        storage_type: str
+    ) -> Dict[str, Any]:
+        path = directory / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with metrics.timed(metrics.SERIALIZATION_SECONDS, format=output_format):
+            write_part(frame, path, output_format)
+        metadata = storage_service.get_file_metadata(str(path))
+        metrics.SERIALIZED_BYTES.labels(format=output_format).inc(metadata["size_bytes"])
+        return {
+            "path": relative_path,
+            "rows": int(len(frame)),
+            "bytes": metadata["size_bytes"],
+            "sha256": metadata["hash"],
+            "partition": partition,
+            "storageLink": storage_service.upload_file(str(path), storage_type=storage_type),
+        }
+
+
+partitioned_writer = PartitionedWriter(settings.OUTPUT_WRITER_WORKERS)
@@ -0,0 +1,240 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+from app.services.column_statistics import ColumnStatistics
+from app.services.column_codec import CONTINUOUS_TYPES
+from app.services.constraints import normalize_constraints, numeric_bounds
+
+# Candidate datetime resolutions in nanoseconds, coarsest first.
+DATETIME_RESOLUTIONS = [
+    86400 * 10**9,
+    3600 * 10**9,
+    60 * 10**9,
+    10**9,
+    10**6,
+]
+MAX_DECIMALS = 6
+
+
+class PreprocessingPipeline:
+    """
+    Fitted preprocessing applied before training and inverted on generated data.
+
+    Fitting records, per column, the imputation value (median for numeric and
+    datetime columns, mode otherwise), the observed null rate, the value
+    range, the float precision or datetime resolution, and the original
+    dtype. ``transform`` imputes a frame in place for training;
+    ``inverse_transform`` clips, rounds and casts generated columns back to
+    the training data's shape and re-inserts nulls at the observed rate, all
+    as whole-column operations. The pipeline is saved with the model
+    artifact, so generation reuses it instead of refitting.
+    """
+
+    def __init__(self, reservoir_size: int = 100000):
+        self.reservoir_size = reservoir_size
+        self.columns: List[Dict[str, Any]] = []
+
+    def fit(self, df: pd.DataFrame, column_types: Dict[str, str], seed: Optional[int] = None) -> "PreprocessingPipeline":
+        return self.fit_chunks([df], column_types, seed)
+
+    def fit_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        column_types: Dict[str, str],
+        seed: Optional[int] = None
+    ) -> "PreprocessingPipeline":
+        """Fit from a sequence of chunks in one pass with bounded memory."""
+        statistics = ColumnStatistics(column_types, reservoir_size=self.reservoir_size, seed=seed)
+        for chunk in chunks:
+            statistics.update(chunk)
+        self.columns = [self._fit_column(summary) for summary in statistics.summaries()]
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Impute missing values in place."""
+        for spec in self.columns:
+            name = spec["name"]
+            fill = spec.get("fill")
+            if fill is None or name not in df.columns or not df[name].hasnans:
+                continue
+
+            column = df[name]
+            if spec["type"] == "datetime":
+                fill = pd.Timestamp(fill)
+            if isinstance(column.dtype, pd.CategoricalDtype) and fill not in column.cat.categories:
+                column = column.cat.add_categories([fill])
+            df[name] = column.fillna(fill)
+
+        return df
+
+    def transform_chunks(self, chunks: Iterable[pd.DataFrame]) -> "TransformedChunks":
+        """Re-iterable view of ``chunks`` with ``transform`` applied to each."""
+        return TransformedChunks(self, chunks)
+
+    def inverse_transform(
+        self,
+        df: pd.DataFrame,
+        rng: Optional[np.random.Generator] = None,
+        constraints: Optional[List[Dict[str, Any]]] = None
+    ) -> pd.DataFrame:
+        """
+        Restore ranges, precision, dtypes and nulls of generated data, in place.
+
+        Constrained columns get no nulls, and their values are kept inside the
+        constraint range after rounding to the column's precision.
+        """
+        rng = rng or np.random.default_rng()
+        num_rows = len(df)
+        constraints = normalize_constraints(constraints)
+
+        for spec in self.columns:
+            name = spec["name"]
+            if name not in df.columns:
+                continue
+
+            if spec["type"] in CONTINUOUS_TYPES and spec.get("min") is not None:
+                bounds = numeric_bounds(name, constraints[name], spec["type"]) if name in constraints else None
+                df[name] = self._restore_continuous(df[name], spec, bounds)
+
+            if name in constraints:
+                continue
+            if spec.get("fill") is not None and spec["nullRate"] > 0:
+                df[name] = self._with_nulls(df[name], rng.random(num_rows) < spec["nullRate"])
+
+        return df
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"reservoirSize": self.reservoir_size, "columns": self.columns}
+
+    @classmethod
+    def from_dict(cls, params: Dict[str, Any]) -> "PreprocessingPipeline":
+        pipeline = cls(reservoir_size=params["reservoirSize"])
+        pipeline.columns = params["columns"]
+        return pipeline
+
+    def _fit_column(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        spec = {
+            "name": summary["name"],
+            "type": summary["type"],
+            "dtype": summary["dtype"],
+            "nullRate": summary["nullRate"],
+            "fill": None,
+        }
+
+        if summary["type"] in CONTINUOUS_TYPES:
+            values = summary["values"]
+            if len(values) == 0:
+                return spec
+            spec["min"], spec["max"] = summary["min"], summary["max"]
+            median = float(np.median(values))
+            if summary["type"] == "datetime":
+                spec["fill"] = int(median)
+                spec["resolution"] = self._datetime_resolution(values)
+            elif summary["type"] == "integer":
+                spec["fill"] = int(round(median))
+            else:
+                spec["fill"] = median
+                spec["decimals"] = self._decimals(values)
+            return spec
+
+        counts = summary["counts"]
+        if counts:
+            spec["fill"] = max(counts.items(), key=lambda item: item[1])[0]
+        return spec
+
+    def _restore_continuous(
+        self,
+        series: pd.Series,
+        spec: Dict[str, Any],
+        bounds: Optional[tuple] = None
+    ) -> pd.Series:
+        if spec["type"] == "datetime":
+            stamps = series.to_numpy(dtype="datetime64[ns]")
+            nanos = stamps.view(np.int64)
+            valid = ~np.isnat(stamps)
+            resolution = spec.get("resolution", 1)
+            restored = np.clip(nanos, int(spec["min"]), int(spec["max"]))
+            if resolution > 1:
+                restored = (restored + resolution // 2) // resolution * resolution
+            if bounds is not None:
+                low, high = self._snapped_bounds(bounds, resolution)
+                if np.isfinite(low):
+                    restored = np.maximum(restored, int(low))
+                if np.isfinite(high):
+                    restored = np.minimum(restored, int(high))
+            restored = np.where(valid, restored, nanos).view("datetime64[ns]")
+            return pd.Series(restored, index=series.index, name=series.name)
+
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        np.clip(values, spec["min"], spec["max"], out=values)
+
+        if spec["type"] == "integer":
+            values = np.rint(values)
+            if bounds is not None:
+                np.clip(values, *self._snapped_bounds(bounds, 1), out=values)
+            if np.isnan(values).any():
+                return pd.Series(pd.array(values, dtype="Int64"), index=series.index, name=series.name)
+            return pd.Series(values.astype(self._integer_dtype(spec["dtype"])), index=series.index, name=series.name)
+
+        if spec.get("decimals") is not None:
+            np.round(values, spec["decimals"], out=values)
+            if bounds is not None:
+                np.clip(values, *self._snapped_bounds(bounds, 10.0 ** -spec["decimals"]), out=values)
+        elif bounds is not None:
+            np.clip(values, *bounds, out=values)
+        dtype = np.float32 if spec["dtype"] == "float32" else np.float64
+        return pd.Series(values.astype(dtype, copy=False), index=series.index, name=series.name)
+
+    def _snapped_bounds(self, bounds: tuple, step: float) -> tuple:
+        """Tightest range of multiples of ``step`` inside inclusive ``bounds``."""
+        low, high = bounds
+        if np.isfinite(low):
+            low = np.ceil(low / step - 1e-9) * step
+        if np.isfinite(high):
+            high = np.floor(high / step + 1e-9) * step
+        return low, high
+
+    def _with_nulls(self, series: pd.Series, mask: np.ndarray) -> pd.Series:
+        if not mask.any():
+            return series
+        if pd.api.types.is_integer_dtype(series.dtype) and not pd.api.types.is_extension_array_dtype(series.dtype):
+            values = pd.arrays.IntegerArray(series.to_numpy(dtype=np.int64), mask)
+            return pd.Series(values, index=series.index, name=series.name)
+        if pd.api.types.is_bool_dtype(series.dtype) and not pd.api.types.is_extension_array_dtype(series.dtype):
+            values = pd.arrays.BooleanArray(series.to_numpy(dtype=bool), mask)
+            return pd.Series(values, index=series.index, name=series.name)
+        return series.mask(mask)
+
+    def _integer_dtype(self, dtype: str):
+        """Original numpy integer width; nullable or unknown dtypes fall back to int64."""
+        try:
+            np_dtype = np.dtype(dtype)
+        except TypeError:
+            return np.int64
+        return np_dtype if np_dtype.kind in "iu" else np.int64
+
+    def _decimals(self, values: np.ndarray) -> Optional[int]:
+        """Fewest decimals that represent every sampled value; None for full precision."""
+        for decimals in range(MAX_DECIMALS + 1):
+            if np.allclose(np.round(values, decimals), values, rtol=0, atol=1e-9):
+                return decimals
+        return None
+
+    def _datetime_resolution(self, values: np.ndarray) -> int:
+        nanos = values.astype(np.int64)
+        for resolution in DATETIME_RESOLUTIONS:
+            if not np.any(nanos % resolution):
+                return resolution
+        return 1
+
+
+class TransformedChunks:
+    """Re-iterable chunk sequence with a fitted pipeline's ``transform`` applied."""
+
+    def __init__(self, pipeline: PreprocessingPipeline, chunks: Iterable[pd.DataFrame]):
+        self.pipeline = pipeline
+        self.chunks = chunks
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        for chunk in self.chunks:
+            yield self.pipeline.transform(chunk)
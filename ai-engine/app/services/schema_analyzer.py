@@ -1,76 +1,97 @@
+import time
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 from app.core.logger import logger
+from app.core.config import settings
+from app.core import metrics
+from app.services.analysis_cache import analysis_cache_service
+from app.services.dataset_ingestion import dataset_ingestion_service
+from app.services.type_inference import type_inference_service
+from app.services.dataframe_compactor import dataframe_compactor
+
+# Bump whenever analysis output changes so cached results are invalidated.
+ANALYZER_VERSION = 5
 
 
 class SchemaAnalyzerService:
     def __init__(self):
         self.pii_keywords = ['email', 'phone', 'ssn', 'address', 'name', 'password']
 
-    def analyze_file(self, file_path: str) -> Dict[str, Any]:
+    def analysis_options(self, sheet_name: Optional[str] = None) -> Dict[str, Any]:
+        """Options that affect analysis output; part of the analysis cache key."""
+        return {
+            "version": ANALYZER_VERSION,
+            "piiKeywords": self.pii_keywords,
+            "typeInference": type_inference_service.options(),
+            "sheetName": sheet_name,
+            "excelMaxRows": settings.EXCEL_MAX_ROWS,
+            "compact": settings.COMPACT_DATAFRAMES,
+            "compactFloat32": settings.COMPACT_FLOAT32
+        }
+
+    def analyze_file(self, file_path: str, sheet_name: Optional[str] = None) -> Dict[str, Any]:
         try:
             file_path_obj = Path(file_path)
 
             if not file_path_obj.exists():
                 raise FileNotFoundError(f"File does not exist: {file_path}")
 
-            if file_path_obj.suffix.lower() == '.csv':
-                df = pd.read_csv(file_path)
-            elif file_path_obj.suffix.lower() in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path)
+            options = self.analysis_options(sheet_name)
+            cached = analysis_cache_service.get(file_path, options)
+            if cached is not None:
+                return cached
+
+            dataset = dataset_ingestion_service.ingest(file_path, sheet_name)
+            if settings.COMPACT_DATAFRAMES:
+                df, _ = dataframe_compactor.compact_table(dataset.table, dataset.column_types)
             else:
-                raise ValueError(f"Unsupported file format: {file_path_obj.suffix}")
+                df = dataset.to_pandas()
 
-            column_types = self._detect_column_types(df)
-            data_distribution = self._calculate_distribution(df, column_types)
+            column_types = dataset.column_types or self._detect_column_types(df)
+            data_distribution = self._calculate_distribution(df, column_types, dataset.table)
             recommendations = self._generate_recommendations(df, column_types)
 
-            return {
+            result = {
                 "columnTypes": column_types,
                 "dataDistribution": data_distribution,
                 "rowCount": len(df),
                 "recommendations": recommendations
             }
+
+            failed = [col for col, summary in data_distribution.items() if "error" in summary]
+            if failed:
+                # A failed column is a bug or a transient error, not a property of the file; don't pin it in the cache.
+                logger.warning(f"Not caching analysis of {file_path}: no distribution for {', '.join(failed)}")
+            else:
+                analysis_cache_service.put(file_path, options, result)
+
+            return result
         except Exception as e:
             logger.error(f"Error analyzing file {file_path}: {str(e)}")
             raise
 
     def _detect_column_types(self, df: pd.DataFrame) -> Dict[str, str]:
-        column_types = {}
-
-        for col in df.columns:
-            dtype = df[col].dtype
-
-            if pd.api.types.is_numeric_dtype(dtype):
-                if pd.api.types.is_integer_dtype(dtype):
-                    column_types[col] = "integer"
-                else:
-                    column_types[col] = "numeric"
-            elif pd.api.types.is_datetime64_any_dtype(dtype):
-                column_types[col] = "datetime"
-            elif pd.api.types.is_bool_dtype(dtype):
-                column_types[col] = "boolean"
-            else:
-                unique_ratio = df[col].nunique() / len(df)
-                if unique_ratio < 0.05:
-                    column_types[col] = "categorical"
-                else:
-                    column_types[col] = "text"
-
-        return column_types
+        inference = type_inference_service.infer(df)
+        return {col: info["type"] for col, info in inference.items()}
 
     def _calculate_distribution(
         self,
         df: pd.DataFrame,
-        column_types: Dict[str, str]
+        column_types: Dict[str, str],
+        table: Optional[pa.Table] = None
     ) -> Dict[str, Any]:
         distribution = {}
 
         for col, col_type in column_types.items():
+            column_started = time.perf_counter()
             try:
-                if col_type in ["integer", "numeric"]:
+                if col_type in ["integer", "numeric"] and table is not None:
+                    distribution[col] = self._numeric_summary(table.column(col), col_type)
+                elif col_type in ["integer", "numeric"]:
                     distribution[col] = {
                         "type": col_type,
                         "mean": float(df[col].mean()) if not df[col].isnull().all() else None,
@@ -118,9 +139,45 @@ class SchemaAnalyzerService:
                     "type": col_type,
                     "error": "Could not calculate distribution"
                 }
+            metrics.ANALYZER_COLUMN_SECONDS.labels(type=col_type).observe(time.perf_counter() - column_started)
 
         return distribution
 
+    def _numeric_summary(self, column: pa.ChunkedArray, col_type: str) -> Dict[str, Any]:
+        """
+        Summarize a numeric column with Arrow compute kernels.
+
+        The ingested table is memory-mapped, so pandas views of null-free
+        columns are read-only and ``Series.median()``, which partitions its
+        input in place, fails on them. The kernels only read the buffers.
+        Matches the pandas summary: NaN counts as missing and ``std`` uses
+        ``ddof=1``.
+        """
+        if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+            column = pc.cast(column, pa.float64())
+        if pa.types.is_floating(column.type):
+            is_nan = pc.is_nan(column)
+            if pc.any(is_nan).as_py():
+                column = pc.if_else(is_nan, pa.scalar(None, column.type), column)
+
+        def as_float(scalar):
+            value = scalar.as_py()
+            return float(value) if value is not None else None
+
+        missing = column.null_count
+        present = len(column) - missing
+        bounds = pc.min_max(column)
+        return {
+            "type": col_type,
+            "mean": as_float(pc.mean(column)) if present else None,
+            "std": as_float(pc.stddev(column, ddof=1)) if present else None,
+            "min": as_float(bounds["min"]) if present else None,
+            "max": as_float(bounds["max"]) if present else None,
+            "median": as_float(pc.quantile(column, q=0.5)[0]) if present else None,
+            "missing": missing,
+            "missingPercent": missing / len(column) * 100 if len(column) else 0.0
+        }
+
     def _generate_recommendations(
         self,
         df: pd.DataFrame,
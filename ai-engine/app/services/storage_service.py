@@ -1,9 +1,10 @@
 import os
 import hashlib
 import json
-from pathlib import Path
 from typing import Optional
 from app.core.logger import logger
+from app.core import metrics
+from app.services.output_store import output_store
 
 
 class StorageService:
@@ -19,8 +20,7 @@ class StorageService:
     """
 
     def __init__(self):
-        self.storage_dir = Path("/tmp/generated_data")
-        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.storage_dir = output_store.root
 
     def upload_to_ipfs(self, file_path: str) -> str:
         """
@@ -93,19 +93,23 @@ class StorageService:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        if storage_type.lower() == "ipfs":
-            return self.upload_to_ipfs(file_path)
-        elif storage_type.lower() == "arweave":
-            return self.upload_to_arweave(file_path)
-        else:
+        storage_type = storage_type.lower()
+        if storage_type not in ("ipfs", "arweave"):
             raise ValueError(f"Unsupported storage type: {storage_type}")
 
+        with metrics.timed(metrics.UPLOAD_SECONDS, storage=storage_type):
+            if storage_type == "ipfs":
+                return self.upload_to_ipfs(file_path)
+            return self.upload_to_arweave(file_path)
+
     def _calculate_file_hash(self, file_path: str) -> str:
         """Calculate SHA-256 hash of file."""
         sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
+        with metrics.timed(metrics.HASH_SECONDS):
+            with open(file_path, "rb") as f:
+                for byte_block in iter(lambda: f.read(4096), b""):
+                    sha256_hash.update(byte_block)
+                metrics.HASHED_BYTES.inc(f.tell())
         return sha256_hash.hexdigest()
 
     def get_file_metadata(self, file_path: str) -> dict:
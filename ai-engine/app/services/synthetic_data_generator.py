@@ -1,14 +1,66 @@
+import io
 import uuid
-import threading
 import time
+import errno
+import functools
 import pandas as pd
 import numpy as np
-from pathlib import Path
-from typing import Dict, Any, Optional
+from scipy import stats
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from app.core.logger import logger
 from app.core.config import settings
+from app.core import metrics
 from app.services.storage_service import storage_service
+from app.services.output_store import OutputStoreFull, output_store
+from app.services.partitioned_writer import partitioned_writer
+from app.services.compressed_csv import COMPRESSED_CSV_FORMATS, compressed_csv_writer
+from app.services.model_registry import model_registry_service
+from app.services.task_scheduler import CancellationToken, TaskCancelled, task_scheduler
+from app.services.task_profiler import task_profiler
+from app.services.constraints import (
+    normalize_constraints,
+    numeric_bounds,
+    allowed_categories,
+    check_constraints,
+    no_match_error
+)
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+OUTPUT_FORMATS = ("csv", "parquet") + COMPRESSED_CSV_FORMATS
+# Output space is reserved from the serialized size of a sample this large, plus a margin.
+OUTPUT_SAMPLE_ROWS = 1000
+OUTPUT_SIZE_MARGIN = 1.2
+# Rough CSV bytes per cell by inferred column type, and each format's size relative to CSV,
+# for sizing a trained model's output before the model is loaded.
+CSV_BYTES_PER_CELL = {"boolean": 5, "integer": 6, "numeric": 12, "datetime": 20, "categorical": 8, "text": 24}
+DEFAULT_BYTES_PER_CELL = 12
+FORMAT_SIZE_RATIO = {"csv": 1.0, "parquet": 0.6, "csv.gz": 0.45, "csv.zst": 0.45}
+
+# Demo columns drawn from distributions rather than raw rng calls, so a
+# constrained request can sample numeric columns by inverse CDF over the
+# allowed range and categorical ones from their renormalized probabilities.
+# Numeric entries are (distribution, decimals); None decimals means integers.
+DEMO_NUMERIC = {
+    "age": (stats.randint(18, 80), None),
+    "income": (stats.lognorm(s=0.5, scale=np.exp(10.5)), None),
+    "credit_score": (stats.truncnorm((300 - 700) / 80, (850 - 700) / 80, loc=700, scale=80), None),
+    "account_balance": (stats.expon(scale=5000), 2),
+    "transaction_count": (stats.poisson(20), None),
+    "lifetime_value": (stats.gamma(2, scale=1000), 2),
+    "engagement_score": (stats.beta(2, 5), 3),
+}
+DEMO_CATEGORICAL = {
+    "is_active": ([True, False], [0.7, 0.3]),
+    "risk_category": (["low", "medium", "high"], [0.6, 0.3, 0.1]),
+    "region": (["North", "South", "East", "West", "Central"], [0.2] * 5),
+    "device_type": (["mobile", "desktop", "tablet"], [0.6, 0.3, 0.1]),
+    "subscription_tier": (["free", "basic", "premium"], [0.5, 0.3, 0.2]),
+}
+DEMO_COLUMNS = [
+    "id", "user_id", "age", "income", "credit_score", "account_balance", "transaction_count", "signup_date",
+    "is_active", "risk_category", "lifetime_value", "engagement_score", "region", "device_type", "subscription_tier"
+]
 
 
 class SyntheticDataGenerator:
@@ -18,20 +70,25 @@ class SyntheticDataGenerator:
 
     def __init__(self):
         self.tasks = {}
-        self.generation_threads = {}
-        self.output_dir = Path("/tmp/generated_data")
-        self.output_dir.mkdir(parents=True, exist_ok=True)
 
         # Chunk size configuration for scalability
         self.chunk_size = 10000
 
+        # (model path, version, format) -> serialized bytes per row, measured from a sample
+        self._bytes_per_row: Dict[tuple, float] = {}
+
     def start_generation(
         self,
         task_id: str,
         job_id: str,
         model_id: str,
         num_rows: int,
-        output_format: str
+        output_format: str,
+        priority: int = 0,
+        constraints: Optional[List[Dict[str, Any]]] = None,
+        profile: bool = False,
+        partitions: int = 1,
+        partition_by: Optional[str] = None
     ) -> Dict[str, str]:
         """
         Start asynchronous data generation.
@@ -41,12 +98,21 @@ class SyntheticDataGenerator:
             job_id: Job identifier from backend
             model_id: Model to use for generation
             num_rows: Total number of rows to generate
-            output_format: Output format (csv or parquet)
+            output_format: Output format (csv, csv.gz, csv.zst or parquet)
+            priority: Scheduling priority; higher runs first and may preempt lower
+            constraints: Column constraints every generated row must satisfy
+            profile: Capture a CPU and allocation profile of the task (see ``task_profiler``)
+            partitions: Write the output as this many part files plus a manifest (see ``partitioned_writer``)
+            partition_by: Also split the parts into Hive-style directories by this column
 
         Returns:
             Task information
+
+        Raises:
+            OutputStoreFull: If the output store cannot hold the estimated output
         """
         estimated_time = self._estimate_generation_time(num_rows)
+        output_store.reserve(task_id, self._estimate_output_bytes(model_id, num_rows, output_format))
 
         self.tasks[task_id] = {
             "taskId": task_id,
@@ -58,17 +124,28 @@ class SyntheticDataGenerator:
             "totalRows": num_rows,
             "outputFormat": output_format,
             "estimatedTime": estimated_time,
+            "priority": priority,
+            "constraints": constraints or [],
+            "profile": profile,
+            "partitions": partitions,
+            "partitionBy": partition_by,
+            "preemptions": 0,
             "createdAt": datetime.utcnow().isoformat(),
         }
 
-        thread = threading.Thread(
-            target=self._generate_data_background,
-            args=(task_id, job_id, model_id, num_rows, output_format)
+        target = functools.partial(
+            self._generate_data_background, task_id, job_id, model_id, num_rows, output_format, constraints,
+            partitions, partition_by
+        )
+        if profile:
+            target = task_profiler.wrap(task_id, "generation", target)
+
+        task_scheduler.submit(
+            task_id,
+            target,
+            priority=priority,
+            on_cancel=functools.partial(self._on_cancel, task_id)
         )
-        thread.daemon = True
-        thread.start()
-
-        self.generation_threads[task_id] = thread
 
         logger.info(f"Generation task {task_id} queued for {num_rows} rows")
 
@@ -80,9 +157,15 @@ class SyntheticDataGenerator:
         job_id: str,
         model_id: str,
         num_rows: int,
-        output_format: str
+        output_format: str,
+        constraints: Optional[List[Dict[str, Any]]] = None,
+        partitions: int = 1,
+        partition_by: Optional[str] = None,
+        token: Optional[CancellationToken] = None
     ):
-        """Background thread for data generation."""
+        """Background task for data generation; cancellation is checked between chunks."""
+        token = token or CancellationToken()
+        file_path = None
         try:
             self._update_task(task_id, {"status": "processing", "progress": 5})
 
@@ -92,11 +175,18 @@ class SyntheticDataGenerator:
             num_chunks = (num_rows + self.chunk_size - 1) // self.chunk_size
             logger.info(f"Processing in {num_chunks} chunks of max {self.chunk_size} rows")
 
+            # Resolved once, so every chunk comes from the same model version even if it is retrained mid-task
+            synthesizer = self._load_synthesizer(model_id)
+            if synthesizer is None:
+                logger.warning(f"No trained model found for {model_id}; generating demo data")
+
+            rng = np.random.default_rng()
             all_chunks = []
             rows_generated = 0
 
             # Generate data in chunks
             for chunk_idx in range(num_chunks):
+                token.check()
                 chunk_start = chunk_idx * self.chunk_size
                 chunk_end = min((chunk_idx + 1) * self.chunk_size, num_rows)
                 chunk_size = chunk_end - chunk_start
@@ -104,8 +194,10 @@ class SyntheticDataGenerator:
                 logger.info(f"Generating chunk {chunk_idx + 1}/{num_chunks}: rows {chunk_start}-{chunk_end}")
 
                 # Generate synthetic data chunk
-                chunk_data = self._generate_chunk(model_id, chunk_size)
+                chunk_started = time.perf_counter()
+                chunk_data = self._sample_chunk(synthesizer, chunk_size, rng, constraints)
                 all_chunks.append(chunk_data)
+                self._observe_chunk(chunk_size, time.perf_counter() - chunk_started)
 
                 rows_generated += chunk_size
                 progress = 5 + int((rows_generated / num_rows) * 70)
@@ -115,29 +207,57 @@ class SyntheticDataGenerator:
                     "currentRows": rows_generated
                 })
 
-                # Simulate processing time
-                time.sleep(0.5)
-
             # Combine all chunks
             logger.info(f"Combining {len(all_chunks)} chunks")
             self._update_task(task_id, {"progress": 75})
 
+            token.check()
             final_data = pd.concat(all_chunks, ignore_index=True)
 
-            # Save to file
-            logger.info(f"Saving {len(final_data)} rows to {output_format}")
-            self._update_task(task_id, {"progress": 80})
-
-            file_path = self._save_data(task_id, final_data, output_format)
-
-            # Upload to decentralized storage
-            logger.info(f"Uploading to decentralized storage")
-            self._update_task(task_id, {"progress": 85})
-
-            storage_link = storage_service.upload_file(file_path, storage_type="ipfs")
-
-            # Get file metadata
-            metadata = storage_service.get_file_metadata(file_path)
+            # The profile describes the unconditioned training data, so
+            # constrained output would be scored against the wrong target.
+            profile = getattr(synthesizer, "profile", None)
+            if profile is not None and settings.FIDELITY_EVALUATION and not constraints:
+                fidelity = profile.evaluate(final_data)
+                logger.info(f"Task {task_id}: fidelity score {fidelity['score']} in {fidelity['elapsedSeconds']}s")
+                self._update_task(task_id, {"fidelity": fidelity})
+                token.check()
+
+            if partitions > 1 or partition_by:
+                # Parts are uploaded as they are written; the manifest's link stands for the dataset.
+                logger.info(f"Saving {len(final_data)} rows as a partitioned {output_format} dataset")
+                self._update_task(task_id, {"progress": 80})
+
+                file_path = self._dataset_path(task_id)
+                manifest = self._save_partitioned(file_path, final_data, output_format, partitions, partition_by, token)
+                output_store.add(file_path, key=task_id)
+                output_store.mark_uploaded(file_path)
+
+                storage_link = manifest["storageLink"]
+                outputs = {
+                    "fileSize": round(manifest["totalBytes"] / (1024 * 1024), 2),
+                    "parts": len(manifest["parts"]),
+                }
+            else:
+                # Save to file
+                logger.info(f"Saving {len(final_data)} rows to {output_format}")
+                self._update_task(task_id, {"progress": 80})
+
+                file_path = self._save_data(task_id, final_data, output_format)
+                token.check()
+
+                # Upload to decentralized storage
+                logger.info(f"Uploading to decentralized storage")
+                self._update_task(task_id, {"progress": 85})
+
+                output_store.add(file_path, key=task_id)
+                with output_store.reference(file_path):
+                    storage_link = storage_service.upload_file(file_path, storage_type="ipfs")
+                    output_store.mark_uploaded(file_path)
+
+                    # Get file metadata
+                    metadata = storage_service.get_file_metadata(file_path)
+                outputs = {"fileSize": metadata["size_mb"]}
 
             # Mark as completed
             self._update_task(task_id, {
@@ -145,69 +265,241 @@ class SyntheticDataGenerator:
                 "progress": 100,
                 "currentRows": num_rows,
                 "storageLink": storage_link,
-                "fileSize": metadata["size_mb"],
+                **outputs,
                 "completedAt": datetime.utcnow().isoformat()
             })
 
             logger.info(f"Generation completed for task {task_id}: {storage_link}")
 
+        except TaskCancelled:
+            # A preempted task runs again, so it keeps its reservation; _on_cancel releases the others.
+            if file_path is not None:
+                output_store.remove(file_path)
+            raise
         except Exception as e:
             logger.error(f"Generation failed for task {task_id}: {str(e)}")
+            if file_path is not None:
+                output_store.remove(file_path, key=task_id)
+            else:
+                output_store.release(task_id)
             self._update_task(task_id, {
                 "status": "failed",
                 "error": str(e),
                 "failedAt": datetime.utcnow().isoformat()
             })
 
-    def _generate_chunk(self, model_id: str, num_rows: int) -> pd.DataFrame:
+    def _generate_chunk(
+        self,
+        model_id: str,
+        num_rows: int,
+        rng: Optional[np.random.Generator] = None,
+        constraints: Optional[List[Dict[str, Any]]] = None
+    ) -> pd.DataFrame:
         """
         Generate a chunk of synthetic data.
 
-        This is where you'd integrate with actual ML models (GANs, VAEs, SDV, etc.)
-        For demonstration, we generate realistic-looking synthetic data.
+        Samples from the trained model for ``model_id``. When no trained model
+        exists (e.g. the frontend's ``default-model``), demo data is returned.
+        Every row satisfies ``constraints``.
         """
-        # Simulate model-based generation
-        np.random.seed(int(time.time() * 1000) % (2**32))
+        return self._sample_chunk(self._load_synthesizer(model_id), num_rows, rng, constraints)
+
+    def _sample_chunk(
+        self,
+        synthesizer,
+        num_rows: int,
+        rng: Optional[np.random.Generator] = None,
+        constraints: Optional[List[Dict[str, Any]]] = None
+    ) -> pd.DataFrame:
+        """Sample a chunk from an already-resolved synthesizer, or demo data when there is none."""
+        rng = rng or np.random.default_rng()
+
+        if synthesizer is not None:
+            return synthesizer.sample(num_rows, rng, constraints)
+
+        return self._generate_demo_chunk(num_rows, rng, constraints)
+
+    def validate_partition_column(self, model_id: str, partition_by: Optional[str]):
+        """
+        Check that the model's output has the column a partitioned dataset is split by.
+
+        The columns come from the artifact header in the model registry, so
+        the check does not load the model; without a trained model the demo
+        columns are used. Artifacts that predate column metadata are checked
+        by the partitioned writer once rows exist.
+
+        Raises:
+            ValueError: If the column is unknown
+        """
+        if not partition_by:
+            return
+        info = model_registry_service.get_model_info(model_id)
+        columns = info["columns"] if info is not None else DEMO_COLUMNS
+        if columns and partition_by not in columns:
+            raise ValueError(f"Cannot partition by unknown column '{partition_by}'")
+
+    def validate_constraints(self, model_id: str, constraints: Optional[List[Dict[str, Any]]]):
+        """
+        Check that ``constraints`` fit the model and can be satisfied.
+
+        Raises:
+            ValueError: If a constraint is malformed, names an unknown column or matches no data
+        """
+        if constraints:
+            self._generate_chunk(model_id, 1, np.random.default_rng(), constraints)
+
+    def _generate_demo_chunk(
+        self,
+        num_rows: int,
+        rng: np.random.Generator,
+        constraints: Optional[List[Dict[str, Any]]] = None
+    ) -> pd.DataFrame:
+        """Generate realistic-looking demo data for requests without a trained model."""
+        constraints = normalize_constraints(constraints)
+        check_constraints(constraints, DEMO_COLUMNS)
+        for name in constraints:
+            if name not in DEMO_NUMERIC and name not in DEMO_CATEGORICAL:
+                raise ValueError(f"Column '{name}' cannot be constrained")
 
-        # Generate diverse synthetic columns
         data = {
             "id": np.arange(num_rows),
             "user_id": [f"user_{uuid.uuid4().hex[:8]}" for _ in range(num_rows)],
-            "age": np.random.randint(18, 80, num_rows),
-            "income": np.random.lognormal(10.5, 0.5, num_rows).astype(int),
-            "credit_score": np.clip(np.random.normal(700, 80, num_rows), 300, 850).astype(int),
-            "account_balance": np.random.exponential(5000, num_rows).round(2),
-            "transaction_count": np.random.poisson(20, num_rows),
             "signup_date": pd.date_range(start="2020-01-01", periods=num_rows, freq="H"),
-            "is_active": np.random.choice([True, False], num_rows, p=[0.7, 0.3]),
-            "risk_category": np.random.choice(["low", "medium", "high"], num_rows, p=[0.6, 0.3, 0.1]),
-            "lifetime_value": np.random.gamma(2, 1000, num_rows).round(2),
-            "engagement_score": np.random.beta(2, 5, num_rows).round(3),
-            "region": np.random.choice(["North", "South", "East", "West", "Central"], num_rows),
-            "device_type": np.random.choice(["mobile", "desktop", "tablet"], num_rows, p=[0.6, 0.3, 0.1]),
-            "subscription_tier": np.random.choice(["free", "basic", "premium"], num_rows, p=[0.5, 0.3, 0.2])
         }
-
-        df = pd.DataFrame(data)
+        for name, (distribution, decimals) in DEMO_NUMERIC.items():
+            data[name] = self._sample_demo_numeric(name, distribution, decimals, num_rows, rng, constraints.get(name))
+        for name, (categories, probabilities) in DEMO_CATEGORICAL.items():
+            probabilities = np.asarray(probabilities)
+            if name in constraints:
+                probabilities = probabilities * allowed_categories(name, constraints[name], categories)
+                if probabilities.sum() == 0:
+                    raise no_match_error(name)
+            data[name] = rng.choice(np.array(categories, dtype=object), num_rows, p=probabilities / probabilities.sum())
+
+        df = pd.DataFrame({name: data[name] for name in DEMO_COLUMNS})
+        df["is_active"] = df["is_active"].astype(bool)
 
         return df
 
+    def _sample_demo_numeric(self, name, distribution, decimals, num_rows, rng, constraint) -> np.ndarray:
+        """Inverse-CDF sample of a demo distribution, restricted to the constraint range."""
+        u_low, u_high = 0.0, 1.0
+        if constraint is not None:
+            low, high = numeric_bounds(name, constraint, "numeric")
+            if decimals is None:
+                low, high = np.ceil(low), np.floor(high)
+            discrete = hasattr(distribution.dist, "pmf")
+            u_low = float(distribution.cdf(low - 1 if discrete else low))
+            u_high = float(distribution.cdf(high))
+            if u_high <= u_low:
+                raise no_match_error(name)
+
+        # Draw u in (u_low, u_high]: a discrete ppf maps u_low itself to low - 1.
+        values = distribution.ppf(u_low + (1.0 - rng.random(num_rows)) * (u_high - u_low))
+        values = np.clip(values, *distribution.support())
+        values = np.floor(values) if decimals is None else values.round(decimals)
+        if constraint is not None:
+            values = np.clip(values, low, high)
+        return values.astype(np.int64) if decimals is None else values
+
+    def _observe_chunk(self, num_rows: int, elapsed: float):
+        metrics.GENERATION_CHUNK_SECONDS.observe(elapsed)
+        metrics.GENERATION_ROWS.inc(num_rows)
+        if elapsed > 0:
+            metrics.GENERATION_ROWS_PER_SECOND.observe(num_rows / elapsed)
+
+    def _load_synthesizer(self, model_id: str):
+        """Resolve a model id to its fitted synthesizer through the model registry."""
+        return model_registry_service.get(model_id)
+
     def _save_data(self, task_id: str, data: pd.DataFrame, output_format: str) -> str:
-        """Save data to file."""
+        """Save data to a file in the output store."""
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-
-        if output_format.lower() == "csv":
-            file_path = self.output_dir / f"synthetic_data_{task_id}_{timestamp}.csv"
-            data.to_csv(file_path, index=False)
-        elif output_format.lower() == "parquet":
-            file_path = self.output_dir / f"synthetic_data_{task_id}_{timestamp}.parquet"
-            data.to_parquet(file_path, index=False, engine='pyarrow')
-        else:
+        output_format = output_format.lower()
+        if output_format not in OUTPUT_FORMATS:
             raise ValueError(f"Unsupported format: {output_format}")
+        file_path = output_store.path_for(f"synthetic_data_{task_id}_{timestamp}.{output_format}")
+
+        with metrics.timed(metrics.SERIALIZATION_SECONDS, format=output_format):
+            try:
+                self._write(data, file_path, output_format)
+            except OSError as e:
+                file_path.unlink(missing_ok=True)
+                if e.errno == errno.ENOSPC:
+                    raise OutputStoreFull(f"Disk full while writing {file_path.name}") from e
+                raise
+        metrics.SERIALIZED_BYTES.labels(format=output_format).inc(file_path.stat().st_size)
 
         logger.info(f"Data saved to: {file_path}")
         return str(file_path)
 
+    def _dataset_path(self, task_id: str):
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        return output_store.path_for(f"synthetic_data_{task_id}_{timestamp}")
+
+    def _save_partitioned(
+        self,
+        directory,
+        data: pd.DataFrame,
+        output_format: str,
+        partitions: int,
+        partition_by: Optional[str],
+        token: CancellationToken
+    ) -> Dict[str, Any]:
+        """Write and upload data as a partitioned dataset in the output store; returns its manifest."""
+        output_format = output_format.lower()
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported format: {output_format}")
+        try:
+            manifest = partitioned_writer.write(
+                data, directory, output_format, partitions, self._write, partition_by=partition_by, token=token
+            )
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                raise OutputStoreFull(f"Disk full while writing {directory.name}") from e
+            raise
+        logger.info(f"Dataset saved to: {directory} ({len(manifest['parts'])} parts)")
+        return manifest
+
+    def _write(self, data: pd.DataFrame, target, output_format: str):
+        if output_format == "csv":
+            data.to_csv(target, index=False)
+        elif output_format in COMPRESSED_CSV_FORMATS:
+            compressed_csv_writer.write(data, target, output_format)
+        else:
+            data.to_parquet(target, index=False, engine='pyarrow')
+
+    def _estimate_output_bytes(self, model_id: str, num_rows: int, output_format: str) -> int:
+        """
+        Size of the finished output, from the model's serialized bytes per row.
+
+        Bytes per row are measured on a sample once per model version and
+        format. A trained model that is not loaded yet is sized from the
+        column types in its artifact header instead, so a request never
+        loads a model just to reserve space.
+        """
+        output_format = output_format.lower()
+        info = model_registry_service.get_model_info(model_id)
+        key = (info["path"], info["version"], output_format) if info else (None, None, output_format)
+
+        bytes_per_row = self._bytes_per_row.get(key)
+        if bytes_per_row is None and info is not None and not info["loaded"] and info["columns"]:
+            bytes_per_row = self._typed_bytes_per_row(info, output_format)
+        elif bytes_per_row is None:
+            sample = self._sample_chunk(self._load_synthesizer(model_id), OUTPUT_SAMPLE_ROWS, np.random.default_rng())
+            buffer = io.BytesIO()
+            self._write(sample, buffer, output_format)
+            bytes_per_row = self._bytes_per_row[key] = buffer.tell() / OUTPUT_SAMPLE_ROWS
+        return int(bytes_per_row * num_rows * OUTPUT_SIZE_MARGIN)
+
+    def _typed_bytes_per_row(self, info: Dict[str, Any], output_format: str) -> float:
+        column_types = info.get("column_types") or {}
+        csv_bytes = sum(
+            CSV_BYTES_PER_CELL.get(column_types.get(column), DEFAULT_BYTES_PER_CELL) + 1
+            for column in info["columns"]
+        )
+        return csv_bytes * FORMAT_SIZE_RATIO.get(output_format, 1.0)
+
     def _estimate_generation_time(self, num_rows: int) -> int:
         """Estimate generation time in seconds."""
         # Roughly 10,000 rows per second
@@ -216,6 +508,38 @@ class SyntheticDataGenerator:
         total_time = int(base_time + 10)
         return max(total_time, 5)
 
+    def cancel_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Request cancellation of a queued or running generation task.
+
+        Running tasks are marked ``cancelling`` and stop before their next
+        chunk; any output file already written is removed.
+
+        Returns:
+            The task's state, or None for an unknown task
+        """
+        task = self.tasks.get(task_id)
+        if task is None or task["status"] in TERMINAL_STATUSES:
+            return task
+
+        if task["status"] != "queued":
+            self._update_task(task_id, {"status": "cancelling"})
+        task_scheduler.cancel(task_id)
+        return task
+
+    def _on_cancel(self, task_id: str, reason: str):
+        task = self.tasks.get(task_id, {})
+        if reason == "preempted":
+            self._update_task(task_id, {
+                "status": "queued",
+                "progress": 0,
+                "currentRows": 0,
+                "preemptions": task.get("preemptions", 0) + 1
+            })
+        else:
+            output_store.release(task_id)
+            self._update_task(task_id, {"status": "cancelled", "cancelledAt": datetime.utcnow().isoformat()})
+
     def _update_task(self, task_id: str, updates: Dict[str, Any]):
         """Update task status."""
         if task_id in self.tasks:
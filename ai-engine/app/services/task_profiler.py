@@ -0,0 +1,239 @@
+import os
+import re
+import sys
+import json
+import time
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Callable, Optional
+from app.core.logger import logger
+from app.core.config import settings
+
+ARTIFACTS = {
+    "profile.json": "application/json",
+    "cpu.folded": "text/plain",
+    "cpu.txt": "text/plain",
+    "allocations.txt": "text/plain",
+    "allocations.snapshot": "application/octet-stream",
+}
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 40
+TASK_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+# Traced memory must grow by this factor before the peak snapshot is retaken.
+PEAK_SNAPSHOT_GROWTH = 1.25
+
+
+def profiling_requested(header: Optional[str]) -> bool:
+    """Whether an ``X-Profile`` header value asks for profiling."""
+    return (header or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class ThreadSampler:
+    """
+    Sampling CPU profiler for a single thread.
+
+    A daemon thread reads the target thread's current frame every
+    ``interval`` seconds and counts whole stacks, so only the profiled task
+    is observed and its code runs unmodified (no tracing hooks). With
+    ``watch_memory`` it also snapshots ``tracemalloc`` whenever traced memory
+    reaches a new high, keeping the snapshot closest to the peak.
+    """
+
+    def __init__(self, thread_id: int, interval: float, watch_memory: bool = False):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.watch_memory = watch_memory
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.peak_snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak_snapshot_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"sampler-{thread_id}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+            if self.watch_memory:
+                current = tracemalloc.get_traced_memory()[0]
+                if current > self.peak_snapshot_bytes * PEAK_SNAPSHOT_GROWTH:
+                    self.peak_snapshot = tracemalloc.take_snapshot()
+                    self.peak_snapshot_bytes = current
+
+    def folded(self) -> str:
+        """Collapsed stacks (``root;...;leaf count``), the input format of flame graph tools."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> str:
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                total[function] += count
+
+        samples = max(self.samples, 1)
+        lines = [f"{self.samples} samples at {self.interval * 1000:g} ms", "", "Self time:"]
+        lines += [f"{100 * count / samples:6.1f}%  {function}" for function, count in own.most_common(TOP_FUNCTIONS)]
+        lines += ["", "Total time (including callees):"]
+        lines += [f"{100 * count / samples:6.1f}%  {function}" for function, count in total.most_common(TOP_FUNCTIONS)]
+        return "\n".join(lines) + "\n"
+
+
+class TaskProfilerService:
+    """
+    Opt-in per-task profiling.
+
+    A profiled task gets a sampling CPU profile of the thread running it and
+    ``tracemalloc`` snapshots near its memory peak and at its end, written
+    to ``DATA_OUTPUT_DIR/profiles/<task id>``. Tasks that are not profiled
+    run without hooks. ``tracemalloc`` is process-wide, so it runs only
+    while a profiled task is active, slows every allocation in the process
+    meanwhile, and its snapshots can include other tasks' allocations;
+    isolated training profiles inside its own worker process instead, and
+    ``PROFILING_TRACEMALLOC=false`` keeps profiling to CPU sampling.
+    """
+
+    def __init__(self):
+        self.output_dir = Path(settings.DATA_OUTPUT_DIR) / "profiles"
+        self._lock = threading.Lock()
+        self._tracing = 0
+        self._owns_tracemalloc = False
+
+    def wrap(self, task_id: str, kind: str, target: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a task callable so each run of it is profiled."""
+        def profiled(*args, **kwargs):
+            with self.capture(task_id, kind):
+                return target(*args, **kwargs)
+        return profiled
+
+    @contextmanager
+    def capture(self, task_id: str, kind: str, enabled: bool = True):
+        """Profile the ``with`` block on the current thread and write its artifacts on exit."""
+        if not enabled:
+            yield
+            return
+
+        allocations = settings.PROFILING_TRACEMALLOC
+        if allocations:
+            self._start_tracemalloc()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.take_snapshot()
+
+        sampler = ThreadSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000, watch_memory=allocations)
+        started_at = datetime.utcnow().isoformat()
+        started = time.perf_counter()
+        sampler.start()
+        logger.info(f"Profiling {kind} task {task_id}")
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            sampler.stop()
+            elapsed = time.perf_counter() - started
+            snapshot, peak = None, None
+            if allocations:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                self._stop_tracemalloc()
+            try:
+                self._write(task_id, {
+                    "taskId": task_id,
+                    "kind": kind,
+                    "pid": os.getpid(),
+                    "startedAt": started_at,
+                    "elapsedSeconds": round(elapsed, 3),
+                    "samples": sampler.samples,
+                    "intervalMs": settings.PROFILING_INTERVAL_MS,
+                    "peakTracedBytes": peak,
+                    "error": error,
+                }, sampler, baseline if allocations else None, snapshot)
+            except Exception as e:
+                logger.error(f"Failed to write profile for task {task_id}: {str(e)}")
+
+    def get_profile(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """A task's profile metadata with its artifact names, or None when it has none."""
+        directory = self._task_dir(task_id)
+        if directory is None or not (directory / "profile.json").exists():
+            return None
+        profile = json.loads((directory / "profile.json").read_text())
+        profile["artifacts"] = [name for name in ARTIFACTS if (directory / name).exists()]
+        return profile
+
+    def artifact_path(self, task_id: str, name: str) -> Optional[Path]:
+        directory = self._task_dir(task_id)
+        if directory is None or name not in ARTIFACTS or not (directory / name).exists():
+            return None
+        return directory / name
+
+    def _task_dir(self, task_id: str) -> Optional[Path]:
+        if not TASK_ID_PATTERN.match(task_id):
+            return None
+        return self.output_dir / task_id
+
+    def _write(self, task_id, meta, sampler, baseline, snapshot):
+        directory = self.output_dir / task_id
+        directory.mkdir(parents=True, exist_ok=True)
+
+        (directory / "cpu.folded").write_text(sampler.folded())
+        (directory / "cpu.txt").write_text(sampler.summary())
+        if snapshot is not None:
+            peak_snapshot = sampler.peak_snapshot or snapshot
+            peak_snapshot.dump(str(directory / "allocations.snapshot"))
+            (directory / "allocations.txt").write_text(
+                self._allocation_report(meta, baseline, peak_snapshot, sampler.peak_snapshot_bytes, snapshot)
+            )
+        # Metadata last: its presence marks the profile as complete.
+        (directory / "profile.json").write_text(json.dumps(meta, indent=2))
+        logger.info(f"Profile for task {task_id} written to {directory}")
+
+    def _allocation_report(self, meta, baseline, peak_snapshot, peak_snapshot_bytes, end_snapshot) -> str:
+        lines = [
+            f"Peak traced memory: {meta['peakTracedBytes']} bytes",
+            f"Peak snapshot taken at: {peak_snapshot_bytes} bytes traced",
+            "",
+            "Growth from task start to the peak snapshot:",
+        ]
+        lines += [str(stat) for stat in peak_snapshot.compare_to(baseline, "lineno")[:TOP_ALLOCATIONS]]
+        lines += ["", "Retained at task end (growth since task start):"]
+        lines += [str(stat) for stat in end_snapshot.compare_to(baseline, "lineno")[:TOP_ALLOCATIONS]]
+        return "\n".join(lines) + "\n"
+
+    def _start_tracemalloc(self):
+        with self._lock:
+            if self._tracing == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+                self._owns_tracemalloc = True
+            self._tracing += 1
+
+    def _stop_tracemalloc(self):
+        with self._lock:
+            self._tracing -= 1
+            if self._tracing == 0 and self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+
+
+task_profiler = TaskProfilerService()
@@ -0,0 +1,210 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional
+from app.core.logger import logger
+from app.core.config import settings
+from app.core import metrics
+
+CANCELLED = "cancelled"
+PREEMPTED = "preempted"
+
+
+class TaskCancelled(Exception):
+    """Raised at a cancellation check once a task has been asked to stop."""
+
+    def __init__(self, reason: str = CANCELLED):
+        super().__init__(f"Task {reason}")
+        self.reason = reason
+
+    @property
+    def preempted(self) -> bool:
+        return self.reason == PREEMPTED
+
+
+class CancellationToken:
+    """
+    Cooperative stop signal handed to a running task.
+
+    Tasks call ``check`` between units of work (chunks, batches, epochs);
+    it raises ``TaskCancelled`` once ``cancel`` has been called. A user
+    cancellation overrides a pending preemption, never the other way round.
+    """
+
+    def __init__(self):
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    def cancel(self, reason: str = CANCELLED):
+        if self.reason != CANCELLED:
+            self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise TaskCancelled(self.reason)
+
+    def checked(self, chunks: Iterable[Any]) -> "CheckedChunks":
+        """Re-iterable view of ``chunks`` that checks for cancellation before each chunk."""
+        return CheckedChunks(chunks, self)
+
+
+class CheckedChunks:
+    def __init__(self, chunks: Iterable[Any], token: CancellationToken):
+        self.chunks = chunks
+        self.token = token
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self.chunks:
+            self.token.check()
+            yield chunk
+
+
+class TaskScheduler:
+    """
+    Runs background tasks on worker threads with a bounded number in flight.
+
+    Queued tasks start in priority order (higher first, then submission
+    order). When every slot is busy and a queued task outranks the lowest
+    priority running one, that task is preempted: its token is cancelled
+    with reason ``preempted``, and once it reaches a cancellation check it
+    goes back on the queue to be run again later. Only one preemption is
+    outstanding at a time, so a burst of urgent submissions does not stop
+    more running work than it can use.
+
+    Tasks are callables taking a ``CancellationToken``. ``on_cancel`` is
+    called with the reason when a task is cancelled while queued or stops at
+    a check, and with ``preempted`` when it is sent back to the queue.
+    """
+
+    def __init__(self, max_running: int):
+        self.max_running = max(1, max_running)
+
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._queue = []
+        self._running = set()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        self.preemptions = 0
+
+    def submit(
+        self,
+        task_id: str,
+        target: Callable[[CancellationToken], None],
+        priority: int = 0,
+        on_cancel: Optional[Callable[[str], None]] = None
+    ):
+        with self._lock:
+            self._jobs[task_id] = {
+                "target": target,
+                "priority": priority,
+                "onCancel": on_cancel,
+                "token": CancellationToken(),
+            }
+            self._enqueue(task_id)
+            self._dispatch()
+
+    def cancel(self, task_id: str) -> bool:
+        """
+        Cancel a queued task immediately or signal a running one.
+
+        Returns:
+            False when the scheduler does not know the task (it already finished)
+        """
+        with self._lock:
+            job = self._jobs.get(task_id)
+            if job is None:
+                return False
+            if task_id in self._running:
+                job["token"].cancel(CANCELLED)
+                return True
+
+            self._queue = [entry for entry in self._queue if entry[2] != task_id]
+            heapq.heapify(self._queue)
+            del self._jobs[task_id]
+
+        logger.info(f"Task {task_id} cancelled before it started")
+        self._notify(job, CANCELLED)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "maxRunning": self.max_running,
+                "running": len(self._running),
+                "queued": len(self._queue),
+                "preemptions": self.preemptions,
+            }
+
+    def _enqueue(self, task_id: str):
+        self._jobs[task_id]["queuedAt"] = time.perf_counter()
+        heapq.heappush(self._queue, (-self._jobs[task_id]["priority"], next(self._sequence), task_id))
+
+    def _dispatch(self):
+        """Start queued tasks while slots are free; otherwise consider a preemption. Caller holds the lock."""
+        while self._queue:
+            if len(self._running) < self.max_running:
+                _, _, task_id = heapq.heappop(self._queue)
+                self._running.add(task_id)
+                metrics.SCHEDULER_WAIT_SECONDS.observe(time.perf_counter() - self._jobs[task_id]["queuedAt"])
+                threading.Thread(target=self._run, args=(task_id,), daemon=True).start()
+                continue
+
+            if any(self._jobs[task_id]["token"].reason == PREEMPTED for task_id in self._running):
+                return
+
+            waiting = self._jobs[self._queue[0][2]]
+            candidates = [task_id for task_id in self._running if not self._jobs[task_id]["token"].cancelled]
+            if not candidates:
+                return
+            victim = min(candidates, key=lambda task_id: self._jobs[task_id]["priority"])
+            if self._jobs[victim]["priority"] < waiting["priority"]:
+                logger.info(f"Preempting task {victim} (priority {self._jobs[victim]['priority']}) for priority {waiting['priority']}")
+                self._jobs[victim]["token"].cancel(PREEMPTED)
+                self.preemptions += 1
+                metrics.SCHEDULER_PREEMPTIONS.inc()
+            return
+
+    def _run(self, task_id: str):
+        job = self._jobs[task_id]
+        reason = None
+        try:
+            job["target"](job["token"])
+        except TaskCancelled as e:
+            reason = e.reason
+        except Exception as e:
+            # Tasks report their own failures; this only keeps the slot accounting intact.
+            logger.error(f"Task {task_id} raised: {str(e)}")
+
+        with self._lock:
+            self._running.discard(task_id)
+            requeue = reason == PREEMPTED and job["token"].reason == PREEMPTED
+            if reason is not None:
+                reason = PREEMPTED if requeue else CANCELLED
+                logger.info(f"Task {task_id} {reason}")
+                # Report before the task can be restarted, so a requeued
+                # task's status never overwrites its next run's.
+                self._notify(job, reason)
+
+            if requeue:
+                job["token"] = CancellationToken()
+                self._enqueue(task_id)
+            else:
+                self._jobs.pop(task_id, None)
+            self._dispatch()
+
+    def _notify(self, job: Dict[str, Any], reason: str):
+        if job["onCancel"] is not None:
+            try:
+                job["onCancel"](reason)
+            except Exception as e:
+                logger.error(f"Cancellation callback failed: {str(e)}")
+
+
+task_scheduler = TaskScheduler(settings.MAX_CONCURRENT_TASKS)
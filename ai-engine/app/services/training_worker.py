@@ -0,0 +1,188 @@
+import os
+import signal
+from multiprocessing import get_context
+from typing import Dict, Any, Callable, List, Optional
+from app.core.logger import logger
+from app.core.config import settings
+from app.core import metrics
+from app.services.task_scheduler import CancellationToken
+from app.services.task_profiler import task_profiler
+
+POLL_INTERVAL = 0.2
+TERMINATE_TIMEOUT = 5
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class TrainingWorkerError(RuntimeError):
+    """A training worker process failed or exited without a result."""
+
+
+def parse_cpu_list(value: str) -> List[int]:
+    """Parse a CPU list such as ``"0-3,6"`` into ``[0, 1, 2, 3, 6]``."""
+    cpus = set()
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            low, high = part.split("-", 1)
+            cpus.update(range(int(low), int(high) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def resident_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process, or None where ``/proc`` is unavailable."""
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def worker_limits(model_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve a job's memory cap, CPU set and thread count from its config and the settings."""
+    cpus = model_config.get("cpuAffinity") or parse_cpu_list(settings.TRAINING_CPU_AFFINITY)
+    return {
+        "memoryLimitMb": model_config.get("memoryLimitMb") or settings.TRAINING_MEMORY_LIMIT_MB or None,
+        "cpus": cpus or None,
+        "threads": model_config.get("threads") or settings.TRAINING_THREADS or (len(cpus) if cpus else None),
+    }
+
+
+def run_training_process(
+    task_id: str,
+    job_id: str,
+    file_path: str,
+    model_config: Dict[str, Any],
+    sheet_name: Optional[str],
+    token: CancellationToken,
+    on_update: Callable[[Dict[str, Any]], None]
+) -> str:
+    """
+    Train in a spawned worker process and relay its progress.
+
+    The worker runs the same training code as the in-process path under a
+    CPU affinity mask and a thread cap. Task updates come back as small
+    messages over a one-way pipe and are applied with ``on_update`` on this
+    thread, so the API process only waits on the pipe. Cancelling the token
+    terminates the worker; checkpoints are written atomically, so a
+    preempted job can resume from its last one.
+
+    The memory limit caps the worker's resident set size, checked on every
+    poll, rather than its address space: CUDA builds of torch map far more
+    virtual memory than they use and cannot even load under a tight
+    RLIMIT_AS. A worker over the limit is terminated. The limit is not
+    enforced where ``/proc`` is unavailable.
+
+    Returns:
+        The saved model path
+    """
+    limits = worker_limits(model_config)
+    memory_limit = int(limits["memoryLimitMb"]) * 1024 * 1024 if limits["memoryLimitMb"] else None
+    context = get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_worker_main,
+        args=(sender, task_id, job_id, file_path, model_config, sheet_name, limits),
+        name=f"train-{task_id[:8]}",
+        daemon=True
+    )
+    process.start()
+    sender.close()
+    logger.info(f"Task {task_id}: training in worker process {process.pid} with limits {limits}")
+
+    try:
+        while True:
+            if token.cancelled:
+                _stop(process)
+                token.check()
+
+            if memory_limit:
+                resident = resident_bytes(process.pid)
+                if resident is not None and resident > memory_limit:
+                    _stop(process)
+                    raise TrainingWorkerError(
+                        f"Training exceeded the worker memory limit of {limits['memoryLimitMb']} MB "
+                        f"({resident // (1024 * 1024)} MB resident)"
+                    )
+
+            if receiver.poll(POLL_INTERVAL):
+                try:
+                    kind, payload = receiver.recv()
+                except EOFError:
+                    break
+                if kind == "update":
+                    on_update(payload)
+                elif kind == "metric":
+                    metrics.record_relayed(*payload)
+                elif kind == "done":
+                    process.join()
+                    return payload
+                elif kind == "error":
+                    process.join()
+                    raise TrainingWorkerError(payload)
+            elif not process.is_alive():
+                break
+    finally:
+        if process.is_alive():
+            _stop(process)
+        receiver.close()
+
+    process.join()
+    message = f"Training worker exited with code {process.exitcode}"
+    if process.exitcode == -signal.SIGKILL:
+        message += " (killed, likely out of memory)"
+    raise TrainingWorkerError(message)
+
+
+def _stop(process):
+    process.terminate()
+    process.join(TERMINATE_TIMEOUT)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+def _apply_limits(limits: Dict[str, Any]):
+    if limits.get("cpus") and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, limits["cpus"])
+
+    if limits.get("threads"):
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=limits["threads"])
+
+
+class _PipeReporter:
+    """Sends task updates to the parent, skipping ones that change nothing."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.last: Dict[str, Any] = {}
+
+    def __call__(self, task_id: str, updates: Dict[str, Any]):
+        changed = {key: value for key, value in updates.items() if self.last.get(key, object()) != value}
+        if changed:
+            self.last.update(changed)
+            self.conn.send(("update", changed))
+
+
+def _worker_main(conn, task_id, job_id, file_path, model_config, sheet_name, limits):
+    try:
+        _apply_limits(limits)
+        metrics.set_relay(lambda name, labels, value: conn.send(("metric", (name, labels, value))))
+        if limits.get("threads") and not model_config.get("threads"):
+            model_config = {**model_config, "threads": limits["threads"]}
+
+        from app.services.model_trainer_v2 import ModelTrainerV2Service
+        service = ModelTrainerV2Service(on_update=_PipeReporter(conn))
+        with task_profiler.capture(task_id, "training", enabled=bool(model_config.get("profile"))):
+            model_path = service.run_training(task_id, job_id, file_path, model_config, sheet_name)
+        conn.send(("done", model_path))
+    except MemoryError:
+        conn.send(("error", "Training ran out of memory"))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
@@ -0,0 +1,201 @@
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import Dict, Any, List, Optional
+from app.core.logger import logger
+
+# Bump whenever inference rules change so stored results are recomputed.
+TYPE_INFERENCE_VERSION = 2
+
+DATETIME_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y",
+    "%d.%m.%Y",
+    "ISO8601",
+]
+
+BOOLEAN_VALUES = {"true": True, "false": False, "t": True, "f": False}
+
+
+class TypeInferenceService:
+    """
+    Infers semantic column types from a small sample of each column.
+
+    String columns are probed for booleans, numbers and datetime formats on a
+    sample; only when a probe succeeds is the full column converted. The
+    categorical/text split compares the column's distinct-value count with
+    ``categorical_threshold`` of its length; a bounded sample settles clearly
+    high-cardinality columns and the rest are counted in full with Arrow.
+    Column types use the analyzer's vocabulary: integer, numeric, datetime,
+    boolean, categorical and text.
+    """
+
+    def __init__(
+        self,
+        probe_size: int = 1000,
+        cardinality_sample_size: int = 10000,
+        categorical_threshold: float = 0.05
+    ):
+        self.probe_size = probe_size
+        self.cardinality_sample_size = cardinality_sample_size
+        self.categorical_threshold = categorical_threshold
+
+    def options(self) -> Dict[str, Any]:
+        """Settings that affect inference results."""
+        return {
+            "version": TYPE_INFERENCE_VERSION,
+            "probeSize": self.probe_size,
+            "cardinalitySampleSize": self.cardinality_sample_size,
+            "categoricalThreshold": self.categorical_threshold
+        }
+
+    def infer(self, df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """
+        Infer a type for every column without modifying the DataFrame.
+
+        Returns:
+            Mapping of column name to ``{"type": ..., "conversion": ..., "format": ...}``
+            where ``conversion`` names the full-column conversion to apply, if any.
+        """
+        return {col: self._infer_column(df[col]) for col in df.columns}
+
+    def apply(self, df: pd.DataFrame, inference: Dict[str, Dict[str, Any]]) -> List[str]:
+        """
+        Convert columns whose probe succeeded, in place.
+
+        A conversion that turns existing values into nulls is reverted and the
+        column is re-labelled as categorical or text.
+
+        Returns:
+            Names of the columns that were converted
+        """
+        converted_cols = []
+
+        for col, info in inference.items():
+            conversion = info.get("conversion")
+            if conversion is None or col not in df.columns:
+                continue
+
+            original = df[col]
+            converted = self._convert(original, conversion, info.get("format"))
+
+            if converted.isna().sum() > original.isna().sum():
+                logger.debug(f"Probe for column {col} did not hold on the full column; keeping strings")
+                info["type"] = self._cardinality_type(original)
+                info["conversion"] = None
+                continue
+
+            df[col] = converted
+            converted_cols.append(col)
+
+        return converted_cols
+
+    def infer_and_apply(self, df: pd.DataFrame) -> Dict[str, str]:
+        """Infer column types, convert the DataFrame in place and return the types."""
+        inference = self.infer(df)
+        self.apply(df, inference)
+        return {col: info["type"] for col, info in inference.items()}
+
+    def _infer_column(self, series: pd.Series) -> Dict[str, Any]:
+        dtype = series.dtype
+
+        if pd.api.types.is_bool_dtype(dtype):
+            return {"type": "boolean", "conversion": None}
+        if pd.api.types.is_numeric_dtype(dtype):
+            kind = "integer" if pd.api.types.is_integer_dtype(dtype) else "numeric"
+            return {"type": kind, "conversion": None}
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return {"type": "datetime", "conversion": None}
+        if isinstance(dtype, pd.CategoricalDtype):
+            return {"type": "categorical", "conversion": None}
+
+        probe = self._probe_values(series)
+        if len(probe) == 0:
+            return {"type": self._cardinality_type(series), "conversion": None}
+
+        lowered = probe.str.lower()
+        if lowered.isin(BOOLEAN_VALUES.keys()).all():
+            return {"type": "boolean", "conversion": "boolean"}
+
+        numbers = pd.to_numeric(probe, errors="coerce")
+        if numbers.notna().all():
+            is_integral = bool(np.all(np.mod(numbers.to_numpy(dtype=float), 1) == 0))
+            return {"type": "integer" if is_integral else "numeric", "conversion": "numeric"}
+
+        if probe.str.contains(r"\d", regex=True).all():
+            datetime_format = self._probe_datetime_format(probe)
+            if datetime_format is not None:
+                return {"type": "datetime", "conversion": "datetime", "format": datetime_format}
+
+        return {"type": self._cardinality_type(series), "conversion": None}
+
+    def _probe_values(self, series: pd.Series) -> pd.Series:
+        """Up to ``probe_size`` non-null values as stripped strings."""
+        non_null = series.dropna()
+        if len(non_null) > self.probe_size:
+            non_null = non_null.sample(n=self.probe_size, random_state=0)
+        return non_null.astype(str).str.strip()
+
+    def _probe_datetime_format(self, probe: pd.Series) -> Optional[str]:
+        for datetime_format in DATETIME_FORMATS:
+            parsed = pd.to_datetime(probe, format=datetime_format, errors="coerce")
+            if parsed.notna().all():
+                return datetime_format
+        return None
+
+    def _cardinality_type(self, series: pd.Series) -> str:
+        """Categorical when the column's distinct values are fewer than ``categorical_threshold`` of its rows."""
+        if len(series) == 0:
+            return "text"
+
+        limit = self.categorical_threshold * len(series)
+
+        # A sample never has more distinct values than the column, so it can only prove "text";
+        # its ratio says nothing about the column's, which would call a long 800-value column text.
+        if len(series) > self.cardinality_sample_size:
+            sample = series.sample(n=self.cardinality_sample_size, random_state=0)
+            if sample.nunique() >= limit:
+                return "text"
+
+        return "categorical" if self._count_distinct(series) < limit else "text"
+
+    def _count_distinct(self, series: pd.Series) -> int:
+        try:
+            return pc.count_distinct(pa.array(series, from_pandas=True)).as_py()
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            # Mixed-type object columns have no Arrow type.
+            return int(series.nunique())
+
+    def _convert(self, series: pd.Series, conversion: str, datetime_format: Optional[str]) -> pd.Series:
+        if conversion == "numeric":
+            return pd.to_numeric(series, errors="coerce")
+        if conversion == "datetime":
+            return self._parse_datetimes(series, datetime_format)
+        if conversion == "boolean":
+            return series.astype(str).str.strip().str.lower().map(BOOLEAN_VALUES).astype("boolean")
+        raise ValueError(f"Unsupported conversion: {conversion}")
+
+    def _parse_datetimes(self, series: pd.Series, datetime_format: str) -> pd.Series:
+        """Parse with Arrow's vectorized strptime where possible, else pandas."""
+        if datetime_format != "ISO8601":
+            try:
+                parsed = pc.strptime(
+                    pa.array(series, type=pa.string(), from_pandas=True),
+                    format=datetime_format,
+                    unit="ns",
+                    error_is_null=True
+                )
+                return pd.Series(parsed.to_pandas(), index=series.index, name=series.name)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                pass
+        return pd.to_datetime(series, format=datetime_format, errors="coerce")
+
+
+type_inference_service = TypeInferenceService()
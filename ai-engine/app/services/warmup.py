@@ -0,0 +1,127 @@
+import time
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from app.core.logger import logger
+from app.core.config import settings
+from app.core import metrics
+from app.core.lazy import registered_services
+
+STEPS = ("services", "models", "generation", "torch")
+SAMPLE_ROWS = 16
+SEED = 0
+
+
+class WarmupService:
+    """
+    Startup warm-up that gates readiness.
+
+    Imports and services are lazy, so a fresh process answers liveness
+    checks within a second but pays for pandas, scipy and model loading on
+    its first requests. Warm-up pays those costs ahead of traffic, running
+    the steps named in ``WARMUP_STEPS`` on a background thread:
+
+    - ``services``: import every service the routers use and build its singleton
+    - ``models``: load the models in ``MODEL_REGISTRY_PREWARM`` and sample a
+      few rows from each
+    - ``generation``: run the demo generation and type inference paths once
+    - ``torch``: import torch and fit a one-epoch CTGAN on a small frame, so
+      kernels and thread pools are initialized before the first GAN job
+
+    A failed step is logged and reported but does not hold readiness back;
+    the lazy paths still work, only slower.
+    """
+
+    def __init__(self, steps: str):
+        self.steps = [step.strip() for step in steps.split(",") if step.strip()]
+        self.state = "pending"
+        self.results: List[Dict[str, Any]] = []
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.startup_seconds: Optional[float] = None
+        self._ready = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self):
+        """Run the warm-up on a daemon thread; readiness flips when it finishes."""
+        unknown = [step for step in self.steps if step not in STEPS]
+        if unknown:
+            logger.warning(f"Ignoring unknown warm-up steps: {', '.join(unknown)}")
+            self.steps = [step for step in self.steps if step in STEPS]
+        threading.Thread(target=self.run, name="warmup", daemon=True).start()
+
+    def run(self):
+        self.state = "warming"
+        self.started_at = datetime.utcnow().isoformat()
+        started = time.perf_counter()
+
+        for step in self.steps:
+            step_started = time.perf_counter()
+            error = None
+            try:
+                getattr(self, f"_warm_{step}")()
+            except Exception as e:
+                error = str(e)
+                logger.error(f"Warm-up step '{step}' failed: {error}")
+            seconds = time.perf_counter() - step_started
+            metrics.WARMUP_STEP_SECONDS.labels(step=step).set(seconds)
+            self.results.append({"step": step, "seconds": round(seconds, 3), "error": error})
+
+        self.state = "ready"
+        self.finished_at = datetime.utcnow().isoformat()
+        self.startup_seconds = metrics.seconds_since_process_start()
+        if self.startup_seconds is not None:
+            metrics.STARTUP_SECONDS.labels(phase="ready").set(self.startup_seconds)
+        metrics.READY.set(1)
+        self._ready.set()
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s; ready")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": self.state,
+            "steps": self.steps,
+            "results": list(self.results),
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "startupSeconds": round(self.startup_seconds, 3) if self.startup_seconds is not None else None,
+        }
+
+    def _warm_services(self):
+        for service in registered_services():
+            service.resolve()
+
+    def _warm_models(self):
+        import numpy as np
+        from app.services.model_registry import model_registry_service
+
+        rng = np.random.default_rng(SEED)
+        for model_id in model_registry_service.prewarm():
+            model = model_registry_service.get(model_id)
+            if model is not None:
+                model.sample(SAMPLE_ROWS, rng)
+
+    def _warm_generation(self):
+        import numpy as np
+        from app.services.synthetic_data_generator import synthetic_data_generator
+        from app.services.type_inference import type_inference_service
+
+        frame = synthetic_data_generator._generate_demo_chunk(settings.WARMUP_ROWS, np.random.default_rng(SEED))
+        type_inference_service.infer_and_apply(frame)
+
+    def _warm_torch(self):
+        import numpy as np
+        from app.services.ctgan import CTGANSynthesizer
+        from app.services.synthetic_data_generator import synthetic_data_generator
+        from app.services.type_inference import type_inference_service
+
+        rng = np.random.default_rng(SEED)
+        frame = synthetic_data_generator._generate_demo_chunk(settings.WARMUP_ROWS, rng)
+        column_types = type_inference_service.infer_and_apply(frame)
+        synthesizer = CTGANSynthesizer(epochs=1, batch_size=min(500, settings.WARMUP_ROWS))
+        synthesizer.fit(frame, column_types, seed=SEED).sample(SAMPLE_ROWS, rng)
+
+
+warmup_service = WarmupService(settings.WARMUP_STEPS)
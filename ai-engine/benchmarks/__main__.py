@@ -0,0 +1,205 @@
+"""
+Benchmark runner for the ai-engine hot paths.
+
+Run from ``ai-engine/`` (CPU only, no network)::
+
+    python -m benchmarks list
+    python -m benchmarks run --suite quick --output results.json
+    python -m benchmarks compare results.json
+    python -m benchmarks run --suite quick --output benchmarks/baselines/quick.json   # refresh the baseline
+    python -m benchmarks load --duration 60 --concurrency 20 --mix analyze=1,train=0.2,generate=1
+
+Each case runs in its own interpreter, so ``peakRssMb`` is that case's high
+water mark, and reports the median of ``--repeat`` timed repetitions after
+``--warmup`` untimed ones. ``compare`` exits with status 1 when any case's
+throughput drops, or its peak RSS grows, beyond the thresholds. Baselines
+are machine-specific: refresh them on the box that runs the comparison.
+``load`` replays the backend's traffic in-process; see ``benchmarks.load``.
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from benchmarks import cases  # noqa: F401  (registers the cases)
+from benchmarks.harness import REGISTRY, SUITES, compare, machine_info, run_case, run_isolated, select
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+def _scratch_directories(work_dir: str):
+    return {
+        "BENCHMARK_WORK_DIR": work_dir,
+        "MODEL_CACHE_DIR": f"{work_dir}/models",
+        "DATA_OUTPUT_DIR": f"{work_dir}/output",
+        "ANALYSIS_CACHE_DIR": f"{work_dir}/cache/analysis",
+        "INGEST_CACHE_DIR": f"{work_dir}/cache/datasets",
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+def _environment(work_dir: str):
+    """Settings for the child processes: scratch directories and no analysis cache."""
+    return {
+        **_scratch_directories(work_dir),
+        "ANALYSIS_CACHE_ENABLED": "false",
+        "FIDELITY_EVALUATION": "false",
+    }
+
+
+def command_run(args) -> int:
+    selected = select(args.suite, args.filter)
+    if not selected:
+        print("No benchmark cases selected", file=sys.stderr)
+        return 2
+
+    with tempfile.TemporaryDirectory(prefix="deai-bench-") as work_dir:
+        environment = _environment(args.work_dir or work_dir)
+        results = []
+        for case in selected:
+            result = run_isolated(case.name, args.repeat, args.warmup, environment)
+            results.append(result)
+            if "error" in result:
+                print(f"{case.name:<40} ERROR {result['error']}", file=sys.stderr)
+            else:
+                print(
+                    f"{case.name:<40} {result['seconds']:>9.4f}s {result['rowsPerSecond']:>14,.0f} rows/s "
+                    f"{result['peakRssMb']:>8.1f} MB",
+                    file=sys.stderr
+                )
+
+    report = {
+        "suite": args.suite,
+        "createdAt": datetime.utcnow().isoformat(),
+        "machine": machine_info(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    return 1 if any("error" in result for result in results) else 0
+
+
+def command_compare(args) -> int:
+    current = json.loads(Path(args.current).read_text())
+    baseline_path = Path(args.baseline or BASELINE_DIR / f"{current['suite']}.json")
+    baseline = json.loads(baseline_path.read_text())
+
+    rows = compare(baseline, current, args.threshold, args.rss_threshold)
+    print(f"{'case':<40} {'status':<12} {'speedup':>8} {'rss':>6}")
+    for row in rows:
+        speedup = f"{row['speedup']:.2f}x" if row.get("speedup") is not None else "-"
+        rss = f"{row['rssRatio']:.2f}x" if row.get("rssRatio") is not None else "-"
+        print(f"{row['name']:<40} {row['status']:<12} {speedup:>8} {rss:>6}")
+
+    if baseline.get("machine") != current.get("machine"):
+        print("\nWarning: baseline was recorded on a different machine or library versions", file=sys.stderr)
+
+    regressions = [row for row in rows if row["status"] in ("slower", "more-memory", "error")]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond the thresholds", file=sys.stderr)
+        return 1
+    return 0
+
+
+def command_load(args) -> int:
+    from benchmarks.load import LoadConfig, format_report, parse_mix, run_load
+
+    with tempfile.TemporaryDirectory(prefix="deai-load-") as work_dir:
+        # Settings are read when the app is imported, so point them at scratch space first.
+        for key, value in _scratch_directories(args.work_dir or work_dir).items():
+            os.environ.setdefault(key, value)
+        from app.main import app
+        from app.services.warmup import warmup_service
+
+        # The transport skips startup events; warm up as a started instance would before taking traffic.
+        warmup_service.run()
+        config = LoadConfig(
+            dataset_path=args.dataset or cases.dataset_file(args.dataset_rows, 12),
+            duration=args.duration,
+            concurrency=args.concurrency,
+            mix=parse_mix(args.mix),
+            time_scale=args.time_scale,
+            generate_rows=args.rows,
+            model_id=args.model_id,
+            model_config=json.loads(args.model_config),
+            seed=args.seed,
+        )
+        report = asyncio.run(run_load(app, config))
+
+    print(format_report(report), file=sys.stderr)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+def command_list(args) -> int:
+    for case in select(args.suite) if args.suite else REGISTRY.values():
+        print(f"{case.name:<40} {case.rows:>10,} rows  suites: {', '.join(case.suites)}")
+    return 0
+
+
+def command_case(args) -> int:
+    # Internal: time one case in this (child) process and print its result.
+    result = run_case(REGISTRY[args.name], args.repeat, args.warmup)
+    print(json.dumps(result))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="ai-engine benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run a benchmark suite")
+    run.add_argument("--suite", choices=SUITES, default="quick")
+    run.add_argument("--filter", help="Only cases whose name contains this text")
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--warmup", type=int, default=1)
+    run.add_argument("--output", help="Write results JSON here instead of stdout")
+    run.add_argument("--work-dir", help="Keep generated inputs here between runs (default: a temporary directory)")
+    run.set_defaults(handler=command_run)
+
+    comparison = commands.add_parser("compare", help="Compare results with a baseline")
+    comparison.add_argument("current", help="Results JSON from `run`")
+    comparison.add_argument("--baseline", help="Baseline JSON (default: baselines/<suite>.json)")
+    comparison.add_argument("--threshold", type=float, default=0.2, help="Allowed throughput drop (fraction)")
+    comparison.add_argument("--rss-threshold", type=float, default=0.25, help="Allowed peak RSS growth (fraction)")
+    comparison.set_defaults(handler=command_compare)
+
+    load = commands.add_parser("load", help="Replay the backend's traffic against the app in-process")
+    load.add_argument("--duration", type=float, default=60, help="Seconds to keep starting flows")
+    load.add_argument("--concurrency", type=int, default=10, help="Concurrent virtual users")
+    load.add_argument("--mix", default="analyze=1,train=0.2,generate=1", help="Flow weights")
+    load.add_argument("--time-scale", type=float, default=1.0, help="Multiplier for poll and retry delays")
+    load.add_argument("--rows", type=int, default=10000, help="numberOfRows per generation request")
+    load.add_argument("--model-id", default="default-model")
+    load.add_argument("--model-config", default='{"modelType": "sdv"}', help="modelConfig JSON for training")
+    load.add_argument("--dataset", help="Dataset for analysis and training (default: a generated CSV)")
+    load.add_argument("--dataset-rows", type=int, default=20000, help="Rows in the generated dataset")
+    load.add_argument("--seed", type=int)
+    load.add_argument("--output", help="Also write the report JSON here")
+    load.add_argument("--work-dir", help="Scratch directory (default: a temporary directory)")
+    load.set_defaults(handler=command_load)
+
+    listing = commands.add_parser("list", help="List benchmark cases")
+    listing.add_argument("--suite", choices=SUITES)
+    listing.set_defaults(handler=command_list)
+
+    case = commands.add_parser("_case")
+    case.add_argument("name")
+    case.add_argument("--repeat", type=int, default=3)
+    case.add_argument("--warmup", type=int, default=1)
+    case.set_defaults(handler=command_case)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
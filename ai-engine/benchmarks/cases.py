@@ -0,0 +1,300 @@
+"""
+Benchmark cases for the ai-engine hot paths.
+
+Inputs are synthesized from fixed seeds into ``BENCHMARK_WORK_DIR`` the
+first time a case needs them, so every run times the same data. Cases are
+named ``<area>/<variant>/<rows>``; the quick suite stops at 100k rows and
+the full suite adds the 1M-row and large-file cases.
+"""
+import os
+import functools
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from benchmarks.harness import Case, register
+
+SEED = 1234
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+FULL_ONLY = ("full",)
+
+
+def work_dir() -> Path:
+    path = Path(os.environ["BENCHMARK_WORK_DIR"])
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def make_frame(rows: int, columns: int, seed: int = SEED) -> pd.DataFrame:
+    """A mixed-type frame cycling through the column types the analyzer infers."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for idx in range(columns):
+        kind = idx % 6
+        if kind == 0:
+            data[f"int_{idx}"] = rng.integers(18, 90, rows)
+        elif kind == 1:
+            values = rng.lognormal(10, 0.7, rows)
+            # Every other float column is null-free; in a file small enough to parse as one
+            # block, pandas then sees its memory-mapped ingested copy as read-only.
+            if idx // 6 % 2 == 1:
+                values[rng.random(rows) < 0.05] = np.nan
+            data[f"num_{idx}"] = values
+        elif kind == 2:
+            data[f"cat_{idx}"] = rng.choice(["north", "south", "east", "west", "central"], rows)
+        elif kind == 3:
+            data[f"text_{idx}"] = [f"user{n}@example.com" for n in rng.integers(0, 10 * rows, rows)]
+        elif kind == 4:
+            data[f"date_{idx}"] = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 10**8, rows), unit="s")
+        else:
+            data[f"flag_{idx}"] = rng.random(rows) < 0.3
+    return pd.DataFrame(data)
+
+
+@functools.lru_cache(maxsize=None)
+def dataset_file(rows: int, columns: int) -> str:
+    path = work_dir() / f"dataset_{rows}x{columns}.csv"
+    if not path.exists():
+        make_frame(rows, columns).to_csv(path, index=False)
+    return str(path)
+
+
+def clear_ingest_copies(file_path: str):
+    """Remove the Arrow copies ingestion caches next to an upload, so each repetition parses cold."""
+    source = Path(file_path)
+    for copy in source.parent.glob(f"{source.name}*.arrow"):
+        copy.unlink()
+
+
+def demo_frame(rows: int) -> pd.DataFrame:
+    from app.services.synthetic_data_generator import synthetic_data_generator
+    return synthetic_data_generator._generate_demo_chunk(rows, np.random.default_rng(SEED))
+
+
+@functools.lru_cache(maxsize=None)
+def copula_model():
+    from app.services.gaussian_copula import GaussianCopulaSynthesizer
+    from app.services.model_registry import TrainedModel
+    from app.services.type_inference import type_inference_service
+
+    frame = make_frame(50_000, 12)
+    column_types = type_inference_service.infer_and_apply(frame)
+    return TrainedModel(GaussianCopulaSynthesizer().fit(frame, column_types, seed=SEED))
+
+
+# Generation: SyntheticDataGenerator._generate_chunk with demo data and with a fitted copula.
+
+def _generate_chunk_setup(model: str):
+    from app.services.synthetic_data_generator import synthetic_data_generator
+    if model == "copula":
+        trained = copula_model()
+        synthetic_data_generator._load_synthesizer = lambda model_id: trained
+    return synthetic_data_generator
+
+
+def _generate_chunk_run(rows: int, generator):
+    generator._generate_chunk("benchmark-model", rows, np.random.default_rng(SEED))
+
+
+# Serialization: SyntheticDataGenerator._save_data.
+
+def _save_data_setup(rows: int):
+    from app.services.output_store import output_store
+    from app.services.synthetic_data_generator import synthetic_data_generator
+    output_store.root = work_dir() / "saved"
+    return synthetic_data_generator, demo_frame(rows)
+
+
+def _save_data_run(output_format: str, state):
+    generator, frame = state
+    path = Path(generator._save_data("benchmark", frame, output_format))
+    size = path.stat().st_size
+    path.unlink()
+    return size
+
+
+# Partitioned output: SyntheticDataGenerator._save_partitioned (parts are hashed and uploaded too).
+
+def _save_partitioned_run(output_format: str, partitions: int, state):
+    import shutil
+    from app.services.task_scheduler import CancellationToken
+    generator, frame = state
+    directory = generator._dataset_path("benchmark")
+    manifest = generator._save_partitioned(directory, frame, output_format, partitions, None, CancellationToken())
+    shutil.rmtree(directory)
+    return manifest["totalBytes"]
+
+
+# Hashing: StorageService._calculate_file_hash over a generated CSV.
+
+def _hash_setup(rows: int):
+    from app.services.storage_service import storage_service
+    return storage_service, dataset_file(rows, 12)
+
+
+def _hash_run(state):
+    storage_service, path = state
+    storage_service._calculate_file_hash(path)
+    return os.path.getsize(path)
+
+
+# Analysis: SchemaAnalyzerService.analyze_file, parsed cold each repetition.
+
+def _analyze_setup(rows: int, columns: int):
+    from app.services.schema_analyzer import schema_analyzer_service
+    path = dataset_file(rows, columns)
+    clear_ingest_copies(path)
+    return schema_analyzer_service, path
+
+
+def _analyze_run(state):
+    analyzer, path = state
+    result = analyzer.analyze_file(path)
+    failed = [col for col, summary in result["dataDistribution"].items() if "error" in summary]
+    if failed:
+        raise AssertionError(f"No distribution for {failed}")
+    return os.path.getsize(path)
+
+
+# Preprocessing: ModelTrainerV2Service._preprocess_data on an owned frame.
+
+def _preprocess_setup(rows: int):
+    from app.services.model_trainer_v2 import model_trainer_v2_service
+    from app.services.type_inference import type_inference_service
+    frame = make_frame(rows, 12)
+    return model_trainer_v2_service, frame, type_inference_service.infer_and_apply(frame)
+
+
+def _preprocess_run(state):
+    trainer, frame, column_types = state
+    trainer._preprocess_data(frame, column_types)
+
+
+# Legacy generation: DataGeneratorService per DataType.
+
+def _data_generator_setup():
+    from app.services.data_generator import data_generator_service
+    np.random.seed(SEED)
+    data_generator_service.tasks.clear()
+    return data_generator_service
+
+
+def _data_generator_run(data_type: str, rows: int, service):
+    from app.schemas.data_generation import DataType
+    service.generate_synthetic_data(DataType(data_type), rows)
+
+
+# Responses: one request through the ASGI app per Accept-Encoding, on prepared payloads.
+
+@functools.lru_cache(maxsize=None)
+def test_client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
+
+
+@functools.lru_cache(maxsize=None)
+def wide_analysis(rows: int):
+    from app.services.schema_analyzer import schema_analyzer_service
+    return schema_analyzer_service.analyze_file(dataset_file(rows, 240))
+
+
+def _response_setup(endpoint: str, rows: int):
+    client = test_client()
+    if endpoint == "analyze-wide":
+        from app.services.schema_analyzer import schema_analyzer_service
+        analysis = wide_analysis(rows)
+        schema_analyzer_service.analyze_file = lambda file_path, sheet_name=None: analysis
+        return client, "POST", "/api/analyze_schema", {"json": {"filePath": dataset_file(rows, 240)}}
+
+    data_type = endpoint.split("-", 1)[1].replace("-", "_")
+    task = client.post("/api/data-generation/generate", json={"data_type": data_type, "num_samples": rows}).json()
+    return client, "GET", f"/api/data-generation/task/{task['task_id']}", {}
+
+
+def _response_run(encoding: str, state):
+    client, method, url, kwargs = state
+    response = client.request(method, url, headers={"Accept-Encoding": encoding}, **kwargs)
+    response.raise_for_status()
+    return response.num_bytes_downloaded
+
+
+for label, rows in SIZES.items():
+    suites = FULL_ONLY if rows > 100_000 else ("quick", "full")
+
+    for model in ("demo", "copula"):
+        register(Case(
+            name=f"generate_chunk/{model}/{label}",
+            rows=rows,
+            setup=functools.partial(_generate_chunk_setup, model),
+            run=functools.partial(_generate_chunk_run, rows),
+            suites=suites,
+        ))
+
+    for output_format in ("csv", "csv.gz", "csv.zst", "parquet"):
+        register(Case(
+            name=f"save_data/{output_format}/{label}",
+            rows=rows,
+            setup=functools.partial(_save_data_setup, rows),
+            run=functools.partial(_save_data_run, output_format),
+            suites=suites,
+        ))
+
+    for output_format in ("csv", "parquet"):
+        register(Case(
+            name=f"save_partitioned/{output_format}-8/{label}",
+            rows=rows,
+            setup=functools.partial(_save_data_setup, rows),
+            run=functools.partial(_save_partitioned_run, output_format, 8),
+            suites=suites,
+        ))
+
+    register(Case(
+        name=f"file_hash/csv/{label}",
+        rows=rows,
+        setup=functools.partial(_hash_setup, rows),
+        run=_hash_run,
+        suites=suites,
+    ))
+
+    register(Case(
+        name=f"preprocess_data/mixed/{label}",
+        rows=rows,
+        setup=functools.partial(_preprocess_setup, rows),
+        run=_preprocess_run,
+        suites=suites,
+    ))
+
+    for data_type in ("tabular", "text", "time_series"):
+        register(Case(
+            name=f"data_generator/{data_type}/{label}",
+            rows=rows,
+            setup=_data_generator_setup,
+            run=functools.partial(_data_generator_run, data_type, rows),
+            suites=suites,
+        ))
+
+for label, size, columns, suites in (
+    ("narrow", "10k", 6, ("quick", "full")),
+    ("narrow", "100k", 6, ("quick", "full")),
+    ("wide", "10k", 240, ("quick", "full")),
+    ("large", "1m", 12, FULL_ONLY),
+):
+    rows = SIZES[size]
+    register(Case(
+        name=f"analyze_file/{label}/{size}",
+        rows=rows,
+        setup=functools.partial(_analyze_setup, rows, columns),
+        run=_analyze_run,
+        suites=suites,
+        tags={"columns": columns},
+    ))
+
+for endpoint in ("task-tabular", "task-time-series", "analyze-wide"):
+    for encoding in ("identity", "gzip", "zstd"):
+        register(Case(
+            name=f"response/{endpoint}-{encoding}/10k",
+            rows=SIZES["10k"],
+            setup=functools.partial(_response_setup, endpoint, SIZES["10k"]),
+            run=functools.partial(_response_run, encoding),
+            tags={"encoding": encoding},
+        ))
@@ -0,0 +1,154 @@
+import gc
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import statistics
+import subprocess
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, List, Optional
+
+SUITES = ("quick", "full")
+
+
+@dataclass
+class Case:
+    """
+    One benchmark case.
+
+    ``setup`` runs untimed before every repetition and returns the state
+    handed to ``run``; ``run`` returns the bytes it processed, or None when
+    only rows are meaningful.
+    """
+
+    name: str
+    rows: int
+    setup: Callable[[], Any]
+    run: Callable[[Any], Optional[int]]
+    suites: tuple = SUITES
+    tags: Dict[str, Any] = field(default_factory=dict)
+
+
+REGISTRY: Dict[str, Case] = {}
+
+
+def register(case: Case) -> Case:
+    if case.name in REGISTRY:
+        raise ValueError(f"Duplicate benchmark case: {case.name}")
+    REGISTRY[case.name] = case
+    return case
+
+
+def select(suite: str, pattern: Optional[str] = None) -> List[Case]:
+    return [
+        case for case in REGISTRY.values()
+        if suite in case.suites and (not pattern or pattern in case.name)
+    ]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(case: Case, repeat: int, warmup: int) -> Dict[str, Any]:
+    """Time ``case`` in this process; meant to run in a fresh child per case."""
+    timings, processed = [], None
+    for iteration in range(warmup + repeat):
+        state = case.setup()
+        gc.collect()
+        started = time.perf_counter()
+        processed = case.run(state)
+        elapsed = time.perf_counter() - started
+        del state
+        if iteration >= warmup:
+            timings.append(elapsed)
+
+    median = statistics.median(timings)
+    result = {
+        "name": case.name,
+        "rows": case.rows,
+        "repeat": repeat,
+        "seconds": round(median, 6),
+        "minSeconds": round(min(timings), 6),
+        "rowsPerSecond": round(case.rows / median, 1) if median > 0 else None,
+        "peakRssMb": peak_rss_mb(),
+        **case.tags,
+    }
+    if processed is not None:
+        result["bytes"] = processed
+        result["bytesPerSecond"] = round(processed / median, 1) if median > 0 else None
+    return result
+
+
+def run_isolated(name: str, repeat: int, warmup: int, env: Dict[str, str]) -> Dict[str, Any]:
+    """Run one case in a child interpreter so its peak RSS is its own."""
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks", "_case", name, "--repeat", str(repeat), "--warmup", str(warmup)],
+        capture_output=True,
+        text=True,
+        env={**os.environ, **env},
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if completed.returncode != 0:
+        return {"name": name, "error": completed.stderr.strip().splitlines()[-1] if completed.stderr else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def machine_info() -> Dict[str, Any]:
+    import numpy
+    import pandas
+    import pyarrow
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "pyarrow": pyarrow.__version__,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float,
+    rss_threshold: float
+) -> List[Dict[str, Any]]:
+    """
+    Compare two result files case by case.
+
+    A case regresses when its throughput falls more than ``threshold``
+    below the baseline's, or its peak RSS rises more than ``rss_threshold``
+    above it.
+    """
+    previous = {result["name"]: result for result in baseline["results"] if "error" not in result}
+    rows = []
+    for result in current["results"]:
+        before = previous.get(result["name"])
+        if before is None or "error" in result:
+            rows.append({"name": result["name"], "status": "error" if "error" in result else "new"})
+            continue
+
+        speed = result["rowsPerSecond"] / before["rowsPerSecond"] if before["rowsPerSecond"] else None
+        memory = result["peakRssMb"] / before["peakRssMb"] if before["peakRssMb"] else None
+        status = "ok"
+        if speed is not None and speed < 1 - threshold:
+            status = "slower"
+        elif memory is not None and memory > 1 + rss_threshold:
+            status = "more-memory"
+        elif speed is not None and speed > 1 + threshold:
+            status = "faster"
+        rows.append({
+            "name": result["name"],
+            "status": status,
+            "speedup": round(speed, 3) if speed is not None else None,
+            "rssRatio": round(memory, 3) if memory is not None else None,
+            "rowsPerSecond": result["rowsPerSecond"],
+            "baselineRowsPerSecond": before["rowsPerSecond"],
+        })
+    return rows
@@ -0,0 +1,271 @@
+"""
+In-process load test that replays the backend's traffic against the FastAPI app.
+
+Virtual users run the same flows as ``backend/src/services/ai-engine.service.ts``:
+POST calls retried up to three times with a linear back-off, and the
+training and generation flows poll their status endpoints until the task
+finishes, generation every 5 s like ``pollGenerationStatus``. Requests go
+through ``httpx.ASGITransport``, so the app runs on this process's event
+loop. A monitor coroutine measures how late that loop wakes up; large lag
+means an endpoint blocks the loop. ``time_scale`` shrinks every delay, so a
+run can compress many minutes of polling.
+"""
+import time
+import random
+import asyncio
+import statistics
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+
+MAX_RETRIES = 3
+RETRY_DELAY = 2.0
+POLL_INTERVAL = 5.0
+MAX_POLLS = 720
+LAG_PROBE_INTERVAL = 0.01
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+FLOWS = ("analyze", "train", "generate")
+
+
+@dataclass
+class LoadConfig:
+    dataset_path: str
+    duration: float = 60.0
+    concurrency: int = 10
+    mix: Dict[str, float] = field(default_factory=lambda: {"analyze": 1.0, "train": 0.2, "generate": 1.0})
+    time_scale: float = 1.0
+    generate_rows: int = 10000
+    model_id: str = "default-model"
+    model_config: Dict[str, Any] = field(default_factory=lambda: {"modelType": "sdv"})
+    request_timeout: float = 120.0
+    seed: Optional[int] = None
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse ``analyze=1,train=0.2,generate=1`` into flow weights."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in FLOWS:
+            raise ValueError(f"Unknown flow '{name}'; expected one of {', '.join(FLOWS)}")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("The request mix needs a positive weight")
+    return mix
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.flows: Dict[str, Dict[str, int]] = {}
+        self.retries = 0
+        self.loop_lag: List[float] = []
+
+    def record(self, endpoint: str, seconds: float, status: Optional[int]):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        key = str(status) if status is not None else "exception"
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[key] = counts.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def flow(self, name: str, outcome: str):
+        counts = self.flows.setdefault(name, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors.get(endpoint, 0),
+                "errorRate": round(self.errors.get(endpoint, 0) / len(samples), 4),
+                "throughput": round(len(samples) / elapsed, 2),
+                **latency_summary(samples),
+                "statuses": self.statuses.get(endpoint, {}),
+            }
+        total = sum(len(samples) for samples in self.latencies.values())
+        return {
+            "elapsedSeconds": round(elapsed, 2),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput": round(total / elapsed, 2) if elapsed else None,
+            "retries": self.retries,
+            "endpoints": endpoints,
+            "flows": self.flows,
+            "eventLoopLag": latency_summary(self.loop_lag),
+        }
+
+
+def latency_summary(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50Ms": None, "p95Ms": None, "p99Ms": None, "maxMs": None}
+    if len(samples) == 1:
+        p50 = p95 = p99 = samples[0]
+    else:
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    return {
+        "p50Ms": round(p50 * 1000, 2),
+        "p95Ms": round(p95 * 1000, 2),
+        "p99Ms": round(p99 * 1000, 2),
+        "maxMs": round(max(samples) * 1000, 2),
+    }
+
+
+class VirtualUser:
+    """One backend worker repeatedly picking a flow from the mix."""
+
+    def __init__(self, client, config: LoadConfig, stats: LoadStats, deadline: float, rng: random.Random):
+        self.client = client
+        self.config = config
+        self.stats = stats
+        self.deadline = deadline
+        self.rng = rng
+
+    async def run(self):
+        flows = list(self.config.mix)
+        weights = [self.config.mix[name] for name in flows]
+        while time.monotonic() < self.deadline:
+            flow = self.rng.choices(flows, weights)[0]
+            try:
+                outcome = await getattr(self, f"_{flow}")()
+            except Exception as e:
+                outcome = f"error:{type(e).__name__}"
+            self.stats.flow(flow, outcome)
+
+    async def _request(self, method: str, url: str, endpoint: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, timeout=self.config.request_timeout, **kwargs)
+        except Exception:
+            self.stats.record(endpoint, time.perf_counter() - started, None)
+            raise
+        self.stats.record(endpoint, time.perf_counter() - started, response.status_code)
+        return response
+
+    async def _post_with_retries(self, url: str, payload: Dict[str, Any]):
+        """POST like the backend: any failure is retried after ``RETRY_DELAY * attempt``."""
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                response = await self._request("POST", url, f"POST {url}", json=payload)
+                if response.status_code < 400:
+                    return response.json()
+            except Exception:
+                pass
+            if attempt < MAX_RETRIES:
+                self.stats.retries += 1
+                await self._sleep(RETRY_DELAY * attempt)
+        return None
+
+    async def _poll(self, url: str, endpoint: str) -> str:
+        for _ in range(MAX_POLLS):
+            await self._sleep(POLL_INTERVAL)
+            try:
+                response = await self._request("GET", url, endpoint)
+            except Exception:
+                continue
+            if response.status_code == 200 and response.json().get("status") in TERMINAL_STATUSES:
+                return response.json()["status"]
+        return "timeout"
+
+    async def _sleep(self, seconds: float):
+        await asyncio.sleep(seconds * self.config.time_scale)
+
+    async def _analyze(self) -> str:
+        result = await self._post_with_retries("/api/analyze_schema", {"filePath": self.config.dataset_path})
+        return "completed" if result is not None else "failed"
+
+    async def _train(self) -> str:
+        result = await self._post_with_retries("/api/train_model", {
+            "jobId": f"load-{self.rng.getrandbits(48):012x}",
+            "filePath": self.config.dataset_path,
+            "modelConfig": self.config.model_config,
+        })
+        if result is None:
+            return "failed"
+        return await self._poll(f"/api/job_status/{result['taskId']}", "GET /api/job_status/{id}")
+
+    async def _generate(self) -> str:
+        result = await self._post_with_retries("/api/generate_data", {
+            "jobId": f"load-{self.rng.getrandbits(48):012x}",
+            "modelId": self.config.model_id,
+            "numberOfRows": self.config.generate_rows,
+            "outputFormat": "csv",
+        })
+        if result is None:
+            return "failed"
+        return await self._poll(f"/api/generation_status/{result['taskId']}", "GET /api/generation_status/{id}")
+
+
+async def _monitor_loop_lag(stats: LoadStats, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        stats.loop_lag.append(max(0.0, time.perf_counter() - started - LAG_PROBE_INTERVAL))
+
+
+async def run_load(app, config: LoadConfig) -> Dict[str, Any]:
+    """
+    Drive ``app`` with ``config.concurrency`` virtual users for ``config.duration`` seconds.
+
+    Users start their last flow before the deadline and finish it, so the
+    run can overrun ``duration`` by one flow.
+
+    Returns:
+        Per-endpoint latency percentiles, error rates and throughput, flow
+        outcomes and event-loop lag
+    """
+    import httpx
+
+    stats = LoadStats()
+    rng = random.Random(config.seed)
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_loop_lag(stats, stop))
+
+    started = time.monotonic()
+    deadline = started + config.duration
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://ai-engine") as client:
+        users = [
+            VirtualUser(client, config, stats, deadline, random.Random(rng.getrandbits(64)))
+            for _ in range(config.concurrency)
+        ]
+        await asyncio.gather(*(user.run() for user in users))
+
+    stop.set()
+    await monitor
+    report = stats.report(time.monotonic() - started)
+    report["config"] = {
+        "duration": config.duration,
+        "concurrency": config.concurrency,
+        "mix": config.mix,
+        "timeScale": config.time_scale,
+        "generateRows": config.generate_rows,
+        "modelId": config.model_id,
+        "modelConfig": config.model_config,
+    }
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['requests']} requests in {report['elapsedSeconds']}s "
+        f"({report['throughput']} req/s), {report['errors']} errors, {report['retries']} retries",
+        "",
+        f"{'endpoint':<38} {'reqs':>6} {'err%':>6} {'req/s':>7} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'maxms':>9}",
+    ]
+    for endpoint, row in report["endpoints"].items():
+        lines.append(
+            f"{endpoint:<38} {row['requests']:>6} {100 * row['errorRate']:>6.1f} {row['throughput']:>7.2f} "
+            f"{row['p50Ms']:>9.1f} {row['p95Ms']:>9.1f} {row['p99Ms']:>9.1f} {row['maxMs']:>9.1f}"
+        )
+    lag = report["eventLoopLag"]
+    if lag["p50Ms"] is not None:
+        lines += ["", f"event loop lag: p50 {lag['p50Ms']}ms  p99 {lag['p99Ms']}ms  max {lag['maxMs']}ms"]
+    lines += ["", "flows: " + ", ".join(
+        f"{name} {counts}" for name, counts in sorted(report["flows"].items())
+    )]
+    return "\n".join(lines)